@@ -0,0 +1,55 @@
+import asyncio
+import concurrent.futures
+
+from benchmarks.harness import benchmark
+from benchmarks.workloads import NULL_CONFIGS, REQUEST_SIZES, log_request
+from escalite.escalite import Escalite
+
+GROUP = "concurrency"
+
+# Requests handled per operation
+CONCURRENT_REQUESTS = 100
+THREADS = 8
+
+
+async def _handle_request(entries: int):
+    async with Escalite().alogging_context(NULL_CONFIGS, log_level="error"):
+        log_request(entries)
+        # let the other requests run between logging and escalation
+        await asyncio.sleep(0)
+
+
+def _handle_request_sync(entries: int):
+    with Escalite().logging_context(NULL_CONFIGS, log_level="error"):
+        log_request(entries)
+
+
+def _register(size: str, entries: int):
+    async def gather_requests():
+        await asyncio.gather(
+            *(_handle_request(entries) for _ in range(CONCURRENT_REQUESTS))
+        )
+
+    benchmark(f"asyncio_tasks_{size}", GROUP)(lambda: asyncio.run(gather_requests()))
+
+    def setup():
+        return concurrent.futures.ThreadPoolExecutor(max_workers=THREADS)
+
+    def threaded_requests(executor):
+        futures = [
+            executor.submit(_handle_request_sync, entries)
+            for _ in range(CONCURRENT_REQUESTS)
+        ]
+        for future in futures:
+            future.result()
+
+    benchmark(
+        f"threads_{size}",
+        GROUP,
+        setup=setup,
+        teardown=lambda executor: executor.shutdown(),
+    )(threaded_requests)
+
+
+for _size in ("small", "medium"):
+    _register(_size, REQUEST_SIZES[_size])
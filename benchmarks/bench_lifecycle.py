@@ -0,0 +1,64 @@
+from benchmarks.harness import benchmark
+from benchmarks.workloads import (
+    REQUEST_SIZES,
+    full_request,
+    log_request,
+    use_null_notifiers,
+)
+from escalite.escalite import Escalite
+from escalite.formatters.dict_table_formatter import DictTableFormatter
+
+GROUP = "lifecycle"
+
+
+@benchmark("start_end_logging", GROUP)
+def start_end_logging():
+    Escalite.start_logging()
+    Escalite.end_logging()
+
+
+def _start_logging():
+    Escalite.start_logging()
+
+
+@benchmark("add_to_log", GROUP, setup=_start_logging)
+def add_to_log():
+    Escalite.add_to_log("status", 200, tag="api_logs", code=200)
+
+
+@benchmark("add_service_log", GROUP, setup=_start_logging)
+def add_service_log():
+    Escalite.add_service_log("payments", "charged", code=200)
+
+
+@benchmark("start_stop_service_log", GROUP, setup=_start_logging)
+def start_stop_service_log():
+    Escalite.start_service_log("payments", "charging")
+    Escalite.stop_service_log("payments", "charged", code=200)
+
+
+def _register_request_benchmarks(size: str, entries: int):
+    benchmark(f"request_{size}", GROUP)(lambda: full_request(entries))
+
+    def setup():
+        use_null_notifiers()
+        return entries
+
+    def escalate(n):
+        Escalite.start_logging()
+        log_request(n)
+        Escalite.end_logging()
+        Escalite.escalate(from_level="info")
+
+    benchmark(f"escalate_{size}", GROUP, setup=setup)(escalate)
+
+    def format_setup():
+        return DictTableFormatter(), full_request(entries)
+
+    benchmark(f"format_{size}", GROUP, setup=format_setup)(
+        lambda state: state[0].format(state[1])
+    )
+
+
+for _size, _entries in REQUEST_SIZES.items():
+    _register_request_benchmarks(_size, _entries)
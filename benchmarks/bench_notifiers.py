@@ -0,0 +1,74 @@
+from benchmarks.harness import benchmark
+from benchmarks.stub_server import StubServer
+from benchmarks.workloads import full_request
+from escalite.notifiers.http_transport import HttpTransport
+from escalite.notifiers.notifier_factory import NotifierFactory
+
+GROUP = "notifiers"
+
+FAN_OUT = 4
+# Simulated provider response time for the fan-out benchmarks, in seconds
+PROVIDER_LATENCY = 0.005
+
+
+def _notifier_configs(url: str, count: int) -> dict:
+    notifiers = []
+    for i in range(count):
+        if i % 2:
+            notifiers.append(
+                {
+                    "type": "whatsapp",
+                    "config": {"api_url": f"{url}/whatsapp", "token": "t", "to": "+1"},
+                }
+            )
+        else:
+            notifiers.append(
+                {"type": "slack", "config": {"webhook_url": f"{url}/slack/{i}"}}
+            )
+    return {"notifiers": notifiers}
+
+
+def _setup(count: int, delay: float):
+    def setup():
+        server = StubServer(delay=delay).start()
+        notifiers = NotifierFactory.create_notifiers(
+            _notifier_configs(server.url, count)
+        )
+        return server, notifiers, full_request(20)
+
+    return setup
+
+
+def _teardown(state):
+    state[0].stop()
+    HttpTransport.close_all()
+
+
+@benchmark("slack_single", GROUP, setup=_setup(1, 0.0), teardown=_teardown)
+def slack_single(state):
+    _, notifiers, data = state
+    NotifierFactory.notify(notifiers, "Benchmark alert", data)
+
+
+@benchmark(
+    "fan_out_serial",
+    GROUP,
+    setup=_setup(FAN_OUT, PROVIDER_LATENCY),
+    teardown=_teardown,
+    memory=False,
+)
+def fan_out_serial(state):
+    _, notifiers, data = state
+    NotifierFactory.notify(notifiers, "Benchmark alert", data)
+
+
+@benchmark(
+    "fan_out_parallel",
+    GROUP,
+    setup=_setup(FAN_OUT, PROVIDER_LATENCY),
+    teardown=_teardown,
+    memory=False,
+)
+def fan_out_parallel(state):
+    _, notifiers, data = state
+    NotifierFactory.notify(notifiers, "Benchmark alert", data, parallel=True)
@@ -0,0 +1,96 @@
+"""
+Compares two benchmark result files, e.g. from two releases.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Exits with status 1 when a benchmark got slower (or, with --memory, used
+more memory) by more than the threshold percentage.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _change(old: float, new: float) -> float:
+    if not old:
+        return 0.0
+    return (new - old) / old * 100
+
+
+def compare(baseline: dict, candidate: dict, metric: str = "median_ns") -> list:
+    """
+    Returns (name, old, new, change %, kind) rows for the benchmarks present
+    in both results; kind is "time" or "memory".
+    """
+    rows = []
+    old_results = baseline["benchmarks"]
+    new_results = candidate["benchmarks"]
+    for name in old_results:
+        if name not in new_results:
+            continue
+        old, new = old_results[name], new_results[name]
+        old_time, new_time = old["time"][metric], new["time"][metric]
+        rows.append((name, old_time, new_time, _change(old_time, new_time), "time"))
+        if "memory" in old and "memory" in new:
+            old_peak = old["memory"]["peak_bytes"]
+            new_peak = new["memory"]["peak_bytes"]
+            rows.append(
+                (name, old_peak, new_peak, _change(old_peak, new_peak), "memory")
+            )
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark results.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="percentage change reported as a regression",
+    )
+    parser.add_argument(
+        "--metric",
+        default="median_ns",
+        choices=("min_ns", "median_ns", "mean_ns"),
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="also fail on peak memory regressions",
+    )
+    args = parser.parse_args(argv)
+
+    baseline, candidate = _load(args.baseline), _load(args.candidate)
+    for label, report in (("baseline", baseline), ("candidate", candidate)):
+        env = report.get("environment", {})
+        print(
+            f"{label}: escalite {env.get('escalite_version')} "
+            f"on Python {env.get('python')} ({env.get('platform')})"
+        )
+    print()
+
+    regressions = 0
+    for name, old, new, change, kind in compare(baseline, candidate, args.metric):
+        regressed = change > args.threshold and (kind == "time" or args.memory)
+        regressions += regressed
+        unit = "ns" if kind == "time" else "B"
+        print(
+            f"{name:40} {kind:6} {old:>14.0f} {unit} -> {new:>14.0f} {unit} "
+            f"{change:+7.1f}%{'  REGRESSION' if regressed else ''}"
+        )
+    missing = set(baseline["benchmarks"]) ^ set(candidate["benchmarks"])
+    for name in sorted(missing):
+        print(f"{name:40} only in one of the results")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
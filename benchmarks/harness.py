@@ -0,0 +1,139 @@
+import gc
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Callable, List, Optional
+
+RESULT_FORMAT_VERSION = 1
+
+_benchmarks = []
+
+
+class Benchmark:
+    """
+    A registered benchmark.
+
+    ``func`` is timed as one operation. ``setup`` runs once before the timings;
+    when it returns something other than None, that is passed to ``func``.
+    ``teardown`` gets the same value after the timings.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        group: str,
+        func: Callable,
+        setup: Optional[Callable] = None,
+        teardown: Optional[Callable] = None,
+        memory: bool = True,
+    ):
+        self.name = name
+        self.group = group
+        self.func = func
+        self.setup = setup
+        self.teardown = teardown
+        self.memory = memory
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.group}.{self.name}"
+
+
+def benchmark(name: str, group: str, setup=None, teardown=None, memory=True):
+    """
+    Registers the decorated function as a benchmark.
+    """
+
+    def decorator(func):
+        _benchmarks.append(Benchmark(name, group, func, setup, teardown, memory))
+        return func
+
+    return decorator
+
+
+def registered_benchmarks() -> List[Benchmark]:
+    return list(_benchmarks)
+
+
+def measure_time(
+    func: Callable, repeat: int = 5, number: int = None, min_time: float = 0.2
+) -> dict:
+    """
+    Times func with timeit. Without ``number`` the loop count is chosen so one
+    repeat takes at least ``min_time`` seconds. Times are per call, in ns.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number = 1
+        while True:
+            if timer.timeit(number) >= min_time:
+                break
+            number *= 2
+    gc.collect()
+    timings = [t / number * 1e9 for t in timer.repeat(repeat, number)]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_ns": min(timings),
+        "median_ns": statistics.median(timings),
+        "mean_ns": statistics.fmean(timings),
+        "stdev_ns": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def measure_memory(func: Callable) -> dict:
+    """
+    Runs func once under tracemalloc and reports the peak traced memory and
+    the memory still allocated afterwards, in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak - before, "retained_bytes": current - before}
+
+
+def run_benchmark(bench: Benchmark, repeat: int, min_time: float) -> dict:
+    state = bench.setup() if bench.setup is not None else None
+    try:
+        if state is None:
+            func = bench.func
+        else:
+            func = lambda: bench.func(state)  # noqa: E731
+        func()  # warm up caches, connection pools and lazy imports
+        result = {
+            "group": bench.group,
+            "time": measure_time(func, repeat, None, min_time),
+        }
+        if bench.memory:
+            result["memory"] = measure_memory(func)
+    finally:
+        if bench.teardown is not None:
+            bench.teardown(state)
+    return result
+
+
+def environment() -> dict:
+    try:
+        from importlib.metadata import version
+
+        escalite_version = version("escalite")
+    except Exception:
+        escalite_version = None
+    return {
+        "escalite_version": escalite_version,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
@@ -0,0 +1,103 @@
+"""
+Runs the benchmark suite and writes the results as JSON.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --filter lifecycle.request --quick
+"""
+
+import argparse
+import fnmatch
+import json
+import logging
+import sys
+
+# Importing the modules registers their benchmarks, in this order
+from benchmarks import bench_lifecycle  # noqa: F401
+from benchmarks import bench_concurrency  # noqa: F401
+from benchmarks import bench_notifiers  # noqa: F401
+from benchmarks.harness import (
+    RESULT_FORMAT_VERSION,
+    environment,
+    registered_benchmarks,
+    run_benchmark,
+)
+
+
+def _format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the escalite benchmarks.")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument(
+        "-f",
+        "--filter",
+        action="append",
+        help="only run benchmarks whose group.name matches this glob "
+        "(a plain prefix also matches); can be given more than once",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimum seconds per timing repeat",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="3 short repeats, for smoke testing"
+    )
+    parser.add_argument("--list", action="store_true", help="list the benchmarks")
+    args = parser.parse_args(argv)
+
+    # Escalation logs every collected request at INFO
+    logging.disable(logging.CRITICAL)
+
+    benchmarks = registered_benchmarks()
+    if args.filter:
+        benchmarks = [
+            b
+            for b in benchmarks
+            if any(
+                fnmatch.fnmatch(b.full_name, f) or b.full_name.startswith(f)
+                for f in args.filter
+            )
+        ]
+    if args.list:
+        for bench in benchmarks:
+            print(bench.full_name)
+        return 0
+
+    repeat, min_time = args.repeat, args.min_time
+    if args.quick:
+        repeat, min_time = 3, 0.02
+
+    results = {}
+    for bench in benchmarks:
+        result = run_benchmark(bench, repeat, min_time)
+        results[bench.full_name] = result
+        line = f"{bench.full_name:40} {_format_ns(result['time']['median_ns']):>12}"
+        if "memory" in result:
+            line += f" {result['memory']['peak_bytes'] / 1024:>10.1f} KiB peak"
+        print(line, file=sys.stderr)
+
+    report = {
+        "version": RESULT_FORMAT_VERSION,
+        "environment": environment(),
+        "settings": {"repeat": repeat, "min_time": min_time},
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
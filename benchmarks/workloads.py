@@ -0,0 +1,79 @@
+from escalite.escalite import Escalite
+from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.notifier_factory import NotifierFactory
+
+# Entries logged by a typical request of each size
+REQUEST_SIZES = {"small": 10, "medium": 100, "large": 1000}
+
+NULL_NOTIFIER = "benchmark_null"
+
+
+class NullNotifier(BaseNotifier):
+    """
+    Accepts every notification without doing any I/O, so escalation can be
+    measured without the cost of a transport.
+    """
+
+    def __init__(self, config: dict = None):
+        self.config = config
+        self.sent = 0
+
+    def set_config(self, config: dict):
+        self.config = config
+
+    def notify(self, message: str, data: dict):
+        self.sent += 1
+
+
+NotifierFactory.add_notifier_map(NULL_NOTIFIER, NullNotifier)
+
+NULL_CONFIGS = {"notifiers": [{"type": NULL_NOTIFIER, "config": {}}]}
+
+
+def log_request(entries: int):
+    """
+    Logs a request with the given number of entries: the API request and
+    response, service calls with start/stop timing, and the occasional
+    warning and error.
+    """
+    Escalite.add_to_log("request_path", "/api/v1/orders", tag="api_logs")
+    Escalite.add_to_log("request_method", "POST", tag="api_logs")
+    for i in range(entries - 3):
+        kind = i % 4
+        if kind == 0:
+            Escalite.start_service_log(f"service_{i}", f"calling service {i}")
+        elif kind == 1:
+            Escalite.stop_service_log(
+                f"service_{i - 1}", f"service {i - 1} returned", code=200
+            )
+        elif kind == 2:
+            Escalite.add_to_log(
+                f"field_{i}",
+                {"id": i, "status": "ok", "items": [1, 2, 3]},
+                tag="api_logs",
+                extras={"attempt": 1},
+            )
+        elif i % 40 == 3:
+            Escalite.add_to_log(
+                f"error_{i}",
+                "upstream failure",
+                tag="error_logs",
+                code=502,
+                message="Bad gateway",
+                level="error",
+            )
+        else:
+            Escalite.add_to_log(
+                f"debug_{i}", "cache miss", tag="api_logs", level="warning"
+            )
+    Escalite.add_to_log("response_status", 200, tag="api_logs", code=200)
+
+
+def full_request(entries: int) -> dict:
+    Escalite.start_logging()
+    log_request(entries)
+    return Escalite.end_logging()
+
+
+def use_null_notifiers():
+    Escalite.set_notifiers_from_configs(NULL_CONFIGS)
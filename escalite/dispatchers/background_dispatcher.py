@@ -0,0 +1,282 @@
+import atexit
+import copy
+import functools
+import logging
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.utils.background import mark_background
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+_STOP = object()
+
+
+class EscalationDropped(RuntimeError):
+    """
+    An escalation was dropped because the dispatch queue was full.
+    """
+
+
+class BackgroundDispatcher:
+    """
+    Delivers escalations on background worker threads so the caller never
+    waits on notifier I/O.
+
+    Escalations are snapshotted and put on a bounded queue. When the queue is
+    full the overflow policy decides what happens:
+        - "drop_oldest": discard the oldest queued escalation.
+        - "drop_newest": discard the escalation being submitted.
+        - "block": wait for a free slot (up to ``block_timeout`` seconds).
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        overflow: str = DROP_OLDEST,
+        workers: int = 1,
+        block_timeout: float = None,
+        shutdown_timeout: float = 5.0,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy: {overflow}. "
+                f"Expected one of: {', '.join(OVERFLOW_POLICIES)}"
+            )
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.shutdown_timeout = shutdown_timeout
+
+        self.submitted = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(
+                target=self._run, name=f"escalite-dispatcher-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        atexit.register(self._shutdown_at_exit)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(
+        self,
+        notifiers: List[BaseNotifier],
+        message: str,
+        data: dict,
+        parallel: bool = False,
+        timeout: float = None,
+        on_done: Optional[Callable[[bool, Optional[BaseException]], None]] = None,
+    ) -> bool:
+        """
+        Queues an escalation for background delivery.
+        ``parallel`` and ``timeout`` are passed on to NotifierFactory.notify.
+        ``on_done`` is called after the delivery, with whether it succeeded
+        and the error if it did not; usually on the worker thread, or on the
+        thread that completes a delivery a notifier handed on. A dropped
+        escalation is reported with an EscalationDropped error.
+        Returns False if the escalation was dropped.
+        """
+        if self._closed:
+            raise RuntimeError("Dispatcher has been shut down.")
+
+        item = (
+            list(notifiers),
+            message,
+            self._snapshot(data),
+            parallel,
+            timeout,
+            on_done,
+        )
+
+        if self.overflow == BLOCK:
+            try:
+                self._queue.put(item, timeout=self.block_timeout)
+            except queue.Full:
+                return self._record_drop(on_done)
+            return self._record_submit()
+
+        dropped = None
+        with self._lock:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                if self.overflow == DROP_NEWEST:
+                    item = None
+                else:
+                    dropped = self._drop_oldest()
+                    self._queue.put_nowait(item)
+        if dropped is not None:
+            self._report_drop(dropped)
+        if item is None:
+            return self._record_drop(on_done)
+        return self._record_submit()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until every queued escalation has been processed; deliveries a
+        notifier handed on (see NotifierResult.pending) are not waited for.
+        Returns False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if deadline is None:
+                    self._queue.all_tasks_done.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float = None) -> bool:
+        """
+        Stops accepting escalations, delivers what is queued and stops the workers.
+        Returns False if pending escalations could not be delivered in time.
+        """
+        if self._closed:
+            return self.pending == 0
+        self._closed = True
+        flushed = self.flush(timeout)
+        dropped = []
+        with self._lock:
+            for _ in self._threads:
+                dropped.extend(self._put_stop())
+        for item in dropped:
+            self._report_drop(item)
+        for thread in self._threads:
+            thread.join(timeout)
+        atexit.unregister(self._shutdown_at_exit)
+        return flushed
+
+    def _run(self):
+        mark_background()
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                notifiers, message, data, parallel, timeout, on_done = item
+                try:
+                    result = NotifierFactory.notify(
+                        notifiers, message, data, parallel=parallel, timeout=timeout
+                    )
+                except Exception as e:
+                    logger.exception("Background escalation delivery failed.")
+                    self._finish(on_done, False, e)
+                    continue
+                if result is None:
+                    self._finish(on_done, True, None)
+                else:
+                    # deliveries handed on (see NotifierResult.pending) are
+                    # counted once they complete
+                    result.when_done(functools.partial(self._finish, on_done))
+            finally:
+                self._queue.task_done()
+
+    def _finish(
+        self,
+        on_done: Optional[Callable[[bool, Optional[BaseException]], None]],
+        delivered: bool,
+        error: Optional[BaseException],
+    ):
+        with self._lock:
+            if delivered:
+                self.delivered += 1
+            else:
+                self.failed += 1
+        self._call(on_done, delivered, error)
+
+    @staticmethod
+    def _call(
+        on_done: Optional[Callable[[bool, Optional[BaseException]], None]],
+        delivered: bool,
+        error: Optional[BaseException],
+    ):
+        if on_done is not None:
+            try:
+                on_done(delivered, error)
+            except Exception:
+                logger.exception("Escalation delivery callback failed.")
+
+    def _drop_oldest(self) -> Optional[tuple]:
+        # called with self._lock held; the caller reports the dropped item
+        # once the lock is released
+        try:
+            item = self._queue.get_nowait()
+        except queue.Empty:
+            return None
+        self._queue.task_done()
+        if item is _STOP:
+            return None
+        self.dropped += 1
+        logger.warning("Dispatch queue full, dropped the oldest escalation.")
+        return item
+
+    def _put_stop(self) -> List[tuple]:
+        dropped = []
+        while True:
+            try:
+                self._queue.put_nowait(_STOP)
+                return dropped
+            except queue.Full:
+                item = self._drop_oldest()
+                if item is not None:
+                    dropped.append(item)
+
+    def _record_submit(self) -> bool:
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _record_drop(self, on_done) -> bool:
+        with self._lock:
+            self.dropped += 1
+        logger.warning("Dispatch queue full, dropped the escalation.")
+        self._call(on_done, False, EscalationDropped("Dispatch queue full."))
+        return False
+
+    def _report_drop(self, item: tuple):
+        self._call(item[-1], False, EscalationDropped("Dispatch queue full."))
+
+    def _shutdown_at_exit(self):
+        self.shutdown(self.shutdown_timeout)
+
+    @staticmethod
+    def _snapshot(data: dict) -> dict:
+        try:
+            return copy.deepcopy(data)
+        except Exception:
+            # Values that cannot be deep-copied (locks, sockets, ...) fall back
+            # to a shallow copy of the top-level dict.
+            logger.warning("Could not deep-copy log data, using a shallow copy.")
+            return copy.copy(data)
@@ -1,30 +1,48 @@
 import functools
+import inspect
 import logging
 import time
+import traceback
 import contextvars
-import uuid
-from contextlib import contextmanager
-from typing import Any
+import copy
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Iterable, Optional, Tuple, Union
 
+from escalite.dispatchers.background_dispatcher import BackgroundDispatcher
+from escalite.formatters.render_cache import VersionedLogs
+from escalite.metrics.aggregator import MetricsAggregator
+from escalite.models.log_entry import LogEntry
+from escalite.models.request_log import RequestLog
+from escalite.notifiers.batching_notifier import BatchingNotifier
 from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.notifiers.notifier_registry import NotifierRegistry
+from escalite.notifiers.notify_result import NotifyResult
+from escalite.outbox.sqlite_outbox import SqliteOutbox
+from escalite.utils.alert_id import get_alert_id_generator
 from escalite.utils.constants import (
     LOG_LEVEL,
     LOG_LEVELS,
-    API_LOGS,
-    START_TIME,
-    END_TIME,
     SERVICE_LOGS,
-    ERROR_LOGS,
-    TIME_ELAPSED,
-    LOG_DATE,
     ALERT_ID,
+    SUPPRESSED_COUNT,
+    AGGREGATE_ALERTS,
+    ESCALATION_LEVEL,
 )
+from escalite.utils.fingerprint import fingerprint
+from escalite.utils.aggregate_policy import AggregatePolicy
+from escalite.utils.escalation_rules import RuleSet
+from escalite.utils.log_limits import LogLimits
+from escalite.utils.sampling_policy import SamplingPolicy
+from escalite.utils.suppression_cache import SuppressionCache
 
 # Context variable for per-request logs
 _request_logs = contextvars.ContextVar("_request_logs", default=None)
 
 logger = logging.getLogger(__name__)
 
+_LEVEL_NAMES = {value: name for name, value in LOG_LEVELS.items()}
+
 
 class Escalite:
     """
@@ -32,37 +50,67 @@ class Escalite:
     """
 
     notifiers = None
+    notifier_registry = NotifierRegistry()
+    notify_options = {}
+    dispatcher = None
+    suppression_cache = None
+    _dedup_settings = None
+    sampling_policy = None
+    _sampling_settings = None
+    log_limits = None
+    outbox = None
+    _limits_settings = None
+    metrics = None
+    _metrics_settings = None
+    escalation_rules = None
+    aggregate_policy = None
+    _aggregate_settings = None
+    _rules_settings = None
 
     @staticmethod
-    def start_logging():
+    def start_logging(sampling: SamplingPolicy = None):
         """
         Starts per-request logging by initializing the context variable.
+        Without a sampling policy, Escalite.sampling_policy (if set) decides
+        whether the request is captured in full, see SamplingPolicy.
         """
-        logs = {
-            ALERT_ID: str(uuid.uuid4()),
-            API_LOGS: {},
-            SERVICE_LOGS: {},
-            ERROR_LOGS: {},
-            "log_level": "info",
-            START_TIME: time.time(),
-            END_TIME: None,
-            LOG_DATE: time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-        }
+        logs = RequestLog()
+        logs.limits = Escalite.log_limits
+        logs.rules = Escalite.escalation_rules
+        sampling = sampling or Escalite.sampling_policy
+        if sampling is not None and not sampling.sample():
+            logs.buffer = deque(maxlen=sampling.buffer_size)
+            logs.keep_level = LOG_LEVELS[sampling.keep_level]
         _request_logs.set(logs)
 
     @staticmethod
-    def end_logging():
+    def _current_logs() -> Optional[RequestLog]:
+        # Reading the logs of an unsampled request captures its buffered entries
+        logs = _request_logs.get()
+        if logs is not None and logs.buffer is not None:
+            Escalite._capture_buffer(logs)
+        return logs
+
+    @staticmethod
+    def end_logging() -> dict:
         """
         Ends per-request logging and returns the collected logs.
+        The logs of a request that was not sampled hold no entries while they
+        are still buffered, see SamplingPolicy; get_all_logs() captures them.
         """
+        # The buffer of an unsampled request is only replayed once it is read
+        # or escalated, so the happy path never pays for it
         logs = _request_logs.get()
         if logs is None:
             raise RuntimeError(
                 "Logging has not been started. Call start_logging() first."
             )
-        logs[END_TIME] = time.time()
-        logs[TIME_ELAPSED] = logs[END_TIME] - logs[START_TIME]
-        return logs
+        logs.end()
+        if logs.rules is not None:
+            logs.rules.on_end(logs)
+        if Escalite.metrics is not None:
+            Escalite.metrics.observe(logs)
+        return logs.to_dict()
 
     @staticmethod
     def add_to_log(
@@ -90,109 +138,214 @@ class Escalite:
             raise RuntimeError(
                 "Logging has not been started. Call start_logging() first."
             )
-        if tag:
-            current_time = time.time()
-            # check if the key already exists in the logs for the given tag
-            # if it does, we will update the existing log entry
-            # otherwise, we will create a new one
-            if tag not in logs:
-                logs[tag] = {}
-            if key in logs[tag]:
-                # If the key already exists, we update the existing log entry
-                logs[tag][key]["value"] = (
-                    value if value is not None else logs[tag][key].get("value")
-                )
-                logs[tag][key]["code"] = (
-                    code if code is not None else logs[tag][key].get("code")
-                )
-                logs[tag][key]["message"] = (
-                    message if message is not None else logs[tag][key].get("message")
+        Escalite._record(
+            logs, key, value, tag, code, message, level, extras, time.perf_counter_ns()
+        )
+
+    @staticmethod
+    def add_many_to_log(entries: Iterable[dict]) -> None:
+        """
+        Adds several log entries to the current request's logs at once.
+        Each entry is a dict of add_to_log arguments, e.g.
+        {"key": "status", "value": 200, "tag": "api_logs", "level": "info"}.
+        All entries share the same log time.
+        """
+        logs = _request_logs.get()
+        if logs is None:
+            raise RuntimeError(
+                "Logging has not been started. Call start_logging() first."
+            )
+        now_ns = time.perf_counter_ns()
+        for entry in entries:
+            Escalite._record(
+                logs,
+                entry["key"],
+                entry.get("value"),
+                entry.get("tag"),
+                entry.get("code"),
+                entry.get("message"),
+                entry.get("level", "info"),
+                entry.get("extras"),
+                now_ns,
+            )
+
+    @staticmethod
+    def _record(
+        logs: RequestLog,
+        key: str,
+        value: Any,
+        tag: Optional[str],
+        code: Optional[int],
+        message: Optional[str],
+        level: LOG_LEVEL,
+        extras: Optional[dict],
+        now_ns: int,
+    ) -> None:
+        # now_ns is a time.perf_counter_ns() reading; durations are measured
+        # on that monotonic clock and shown as wall-clock times derived from
+        # the wall-clock time the request started at
+        logs.version += 1
+        if logs.buffer is not None:
+            # entries that can meet an escalation rule switch to full capture,
+            # so the rules see every entry they depend on
+            if LOG_LEVELS[level] < logs.keep_level and (
+                logs.rules is None or not logs.rules.watches(tag, key, code, level)
+            ):
+                logs.buffer.append(
+                    (key, value, tag, code, message, level, extras, now_ns)
                 )
-                logs[tag][key]["log_level"] = Escalite.update_log_level(level, tag=tag)
-                logs[tag][key]["log_time"] = current_time
-                logs[tag][key].setdefault(START_TIME, current_time)
-                logs[tag][key].setdefault(END_TIME, current_time)
-                logs[tag][key].setdefault(
-                    TIME_ELAPSED, logs[tag][key][END_TIME] - logs[tag][key][START_TIME]
+                logs.buffered += 1
+                if LOG_LEVELS[level] > LOG_LEVELS[logs.log_level]:
+                    logs.log_level = level
+                return
+            Escalite._capture_buffer(logs)
+
+        current_time = logs.wall_time(now_ns)
+        limits = logs.limits
+        if limits is not None:
+            value = limits.truncate(logs, value)
+            message = limits.truncate(logs, message)
+            extras = limits.truncate_extras(logs, extras)
+
+        if not tag:
+            Escalite._raise_level(logs, None, level)
+            if (
+                limits is not None
+                and key not in logs.sections
+                and not limits.admit(logs, None)
+            ):
+                return
+            previous = logs.sections.get(key)
+            entry = logs.sections[key] = LogEntry(
+                value, code, message, level, current_time, extras
+            )
+            if logs.rules is not None:
+                logs.rules.on_entry(
+                    logs,
+                    None,
+                    key,
+                    entry,
+                    code,
+                    previous.log_level if previous.__class__ is LogEntry else None,
                 )
-                reserved_keys = {START_TIME, END_TIME, TIME_ELAPSED}
-                filtered_extras = {
-                    k: v for k, v in (extras or {}).items() if k not in reserved_keys
-                }
-                logs[tag][key].update(filtered_extras)
+            return
+
+        section = logs.sections.get(tag)
+        if section is None:
+            section = logs.sections[tag] = {}
+        Escalite._raise_level(logs, section, level)
+
+        # check if the key already exists in the logs for the given tag
+        # if it does, we will update the existing log entry
+        # otherwise, we will create a new one
+        entry = section.get(key)
+        if entry.__class__ is LogEntry:
+            if value is not None:
+                entry.value = value
+            if code is not None:
+                entry.code = code
+            if message is not None:
+                entry.message = message
+            previous_level = entry.log_level
+            entry.log_level = level
+            entry.log_time = current_time
+            if entry.start_time is None:
+                entry.start_time = current_time
+                entry.start_ns = now_ns
+            # every update moves the end of the entry's span
+            entry.end_time = current_time
+            if entry.start_ns is not None:
+                entry.time_elapsed = (now_ns - entry.start_ns) / 1e9
             else:
-                # If the key does not exist, we create a new log entry
-                logs[tag][key] = {
-                    "value": value,
-                    "code": code,
-                    "message": message,
-                    "log_level": Escalite.update_log_level(level, tag=tag),
-                    "log_time": current_time,
-                    **(extras or {}),
-                }
-
-            # If START_TIME is already set, we update END_TIME and TIME_ELAPSED
-            # to reflect the current time
-            # This is useful for cases where the log entry is updated multiple times
-            # during the request lifecycle, and we want to keep track of the latest timing.
-            # If START_TIME is not set, it will be set later when the log entry is created
-            # or updated.
-
-            if START_TIME in logs[tag][key]:
-                logs[tag][key].setdefault(END_TIME, current_time)
-                logs[tag][key].setdefault(
-                    TIME_ELAPSED, logs[tag][key][END_TIME] - logs[tag][key][START_TIME]
-                )
+                entry.time_elapsed = current_time - entry.start_time
+            if extras:
+                entry.update_extras(extras)
+            if logs.rules is not None:
+                logs.rules.on_entry(logs, tag, key, entry, code, previous_level)
+            return
 
-            logs[tag][key].setdefault(START_TIME, current_time)
+        if limits is not None and not limits.admit(logs, section):
+            return
+        entry = section[key] = LogEntry(
+            value, code, message, level, current_time, extras
+        )
+        # A start time passed in the extras also completes the timing
+        if entry.start_time is None:
+            entry.start_time = current_time
+            entry.start_ns = now_ns
+        else:
+            if entry.end_time is None:
+                entry.end_time = current_time
+            if entry.time_elapsed is None:
+                entry.time_elapsed = entry.end_time - entry.start_time
+        if logs.rules is not None:
+            logs.rules.on_entry(logs, tag, key, entry, code, None)
 
+    @staticmethod
+    def _capture_buffer(logs: RequestLog) -> None:
+        """
+        Switches an unsampled request to full capture, replaying the entries
+        still in its buffer.
+        """
+        buffer, max_level = logs.buffer, logs.log_level
+        logs.buffer = None
+        logs.log_level = "info"
+        logs.unsampled_dropped = logs.buffered - len(buffer)
+        for entry in buffer:
+            Escalite._record(logs, *entry)
+        # entries that dropped out of the buffer still count towards the level
+        if LOG_LEVELS[max_level] > LOG_LEVELS[logs.log_level]:
+            logs.log_level = max_level
+
+    @staticmethod
+    def _raise_level(
+        logs: RequestLog, section: Optional[dict], level: LOG_LEVEL, force=False
+    ) -> None:
+        # The request level follows the latest level that is not below the
+        # current level of the tag (or of the request, for untagged logs)
+        if section is not None:
+            current_level = section.get("log_level", "info")
         else:
-            logs[key] = {
-                "value": value,
-                "code": code,
-                "message": message,
-                "log_level": Escalite.update_log_level(level),
-                "log_time": time.time(),
-                **(extras or {}),
-            }
+            current_level = logs.log_level
+        if force or LOG_LEVELS[level] >= LOG_LEVELS[current_level]:
+            logs.log_level = level
+            if section is not None:
+                section["log_level"] = level
 
     @staticmethod
     def get_log_level(tag: str = None) -> str:
-        logs = _request_logs.get()
+        logs = Escalite._current_logs()
         if logs is None:
             return "info"
-        return (
-            logs[tag].get("log_level", "info") if tag else logs.get("log_level", "info")
-        )
+        if tag:
+            return logs.sections.get(tag, {}).get("log_level", "info")
+        return logs.log_level
 
     @staticmethod
     def update_log_level(
         new_level: LOG_LEVEL, tag: str = None, force: bool = False
     ) -> str:
-        logs = _request_logs.get()
+        logs = Escalite._current_logs()
         if logs is None:
             return new_level
-        current_level = (
-            logs[tag].get("log_level", "info") if tag else logs.get("log_level", "info")
-        )
-        if force or LOG_LEVELS[new_level] >= LOG_LEVELS[current_level]:
-            logs["log_level"] = new_level
-            if tag:
-                logs[tag]["log_level"] = new_level
+        section = logs.sections.setdefault(tag, {}) if tag else None
+        Escalite._raise_level(logs, section, new_level, force)
+        logs.version += 1
         return new_level
 
     @staticmethod
     def get_all_logs() -> dict:
-        logs = _request_logs.get()
-        return logs if logs is not None else {}
+        logs = Escalite._current_logs()
+        return logs.to_dict() if logs is not None else {}
 
     @staticmethod
     def get_log_by_key(key: str, tag: str = None) -> Any:
-        logs = _request_logs.get()
+        logs = Escalite._current_logs()
         if not logs:
             return None
-        if tag and tag in logs:
-            return logs[tag].get(key, None)
+        if tag and tag in logs.sections:
+            entry = logs.sections[tag].get(key, None)
+            return entry.to_dict() if isinstance(entry, LogEntry) else entry
         return logs.get(key, None)
 
     @staticmethod
@@ -265,37 +418,332 @@ class Escalite:
         try:
             yield
         finally:
-            self.end_logging()
+            logs = self.end_logging()
             # Here you can process the logs, e.g., save to a file or send to a server
-            logger.info(
-                f"Logs collected:  {Escalite.get_all_logs()}"
-            )  # For demonstration purposes
+            logger.debug("Logs collected:  %s", logs)
             self.escalate(from_level=log_level)
 
+    @asynccontextmanager
+    async def alogging_context(self, configs: dict, log_level: LOG_LEVEL = "info"):
+        """
+        Async context manager to automatically start and end logging.
+        Escalation is awaited instead of blocking the event loop.
+        """
+        self.set_notifiers_from_configs(configs)
+        self.start_logging()
+        try:
+            yield
+        finally:
+            logs = self.end_logging()
+            logger.debug("Logs collected:  %s", logs)
+            await self.aescalate(from_level=log_level)
+
     @staticmethod
     def set_notifiers_from_configs(configs: dict):
         """
         Sets the notifiers based on the provided configuration.
+        Notifiers are cached per configuration, so calling this on every request
+        reuses the same instances.
+        Set "parallel_notify" to notify all notifiers concurrently, and
+        "notify_timeout" to bound how long each notifier may take, also in
+        aescalate().
+        Set "dedup" (e.g. {"ttl": 300, "max_size": 10000}) to suppress repeats
+        of the same failure, see SuppressionCache.
+        Set "alert_id_generator" to "uuid4" (default), "ulid" or "counter" to
+        choose how alert ids are generated.
+        Set "sampling" (e.g. {"rate": 0.1, "keep_level": "error"}) to capture
+        only a fraction of the requests in full, see SamplingPolicy.
+        Set "limits" (e.g. {"max_entries": 1000, "max_value_bytes": 4096})
+        to cap how much a request may log, see LogLimits.
+        Set "rules" to a list of escalation rules (e.g. [{"type":
+        "service_latency", "service": "payments", "over_ms": 500}]) that make
+        a request escalate when met, see RuleSet.
+        Set "aggregate" (e.g. {"error_rate": 0.1, "window": 60,
+        "group_by": "service"}) to escalate on the failure rate across
+        requests instead of on each request's level, see AggregatePolicy.
+        Set "metrics" to True or to MetricsAggregator options (e.g.
+        {"quantiles": [0.5, 0.99]}) to aggregate request and service call
+        durations; configs without the key leave the aggregator as it is.
+        """
+        Escalite.notifiers = Escalite.notifier_registry.get_notifiers(configs)
+        # aescalate() always notifies concurrently, so it honours the timeout
+        # without "parallel_notify"
+        notify_options = {}
+        if configs.get("parallel_notify"):
+            notify_options["parallel"] = True
+        if configs.get("parallel_notify") or configs.get("notify_timeout"):
+            notify_options["timeout"] = configs.get("notify_timeout")
+        Escalite.notify_options = notify_options
+        Escalite._rebuild_if_changed(
+            "suppression_cache",
+            "_dedup_settings",
+            configs.get("dedup"),
+            lambda dedup: SuppressionCache(**dedup),
+        )
+        Escalite._rebuild_if_changed(
+            "sampling_policy",
+            "_sampling_settings",
+            configs.get("sampling"),
+            lambda sampling: SamplingPolicy(**sampling),
+        )
+        Escalite._rebuild_if_changed(
+            "log_limits",
+            "_limits_settings",
+            configs.get("limits"),
+            lambda limits: LogLimits(**limits),
+        )
+        if configs.get("alert_id_generator"):
+            Escalite.set_alert_id_generator(configs["alert_id_generator"])
+        Escalite._rebuild_if_changed(
+            "escalation_rules",
+            "_rules_settings",
+            configs.get("rules"),
+            RuleSet.from_configs,
+        )
+        Escalite._rebuild_if_changed(
+            "aggregate_policy",
+            "_aggregate_settings",
+            configs.get("aggregate"),
+            lambda aggregate: AggregatePolicy(**aggregate),
+        )
+        if "metrics" in configs:
+            Escalite._rebuild_if_changed(
+                "metrics",
+                "_metrics_settings",
+                configs["metrics"],
+                lambda metrics: MetricsAggregator(
+                    **({} if metrics is True else metrics)
+                ),
+            )
+
+    @staticmethod
+    def _rebuild_if_changed(
+        attr: str, settings_attr: str, settings: Any, factory: Callable[[Any], Any]
+    ):
+        # What is built keeps state across requests (e.g. the dedup cache),
+        # so it is only rebuilt when its settings change
+        if not settings:
+            setattr(Escalite, attr, None)
+            setattr(Escalite, settings_attr, None)
+            return
+        if (
+            getattr(Escalite, attr) is None
+            or getattr(Escalite, settings_attr) != settings
+        ):
+            setattr(Escalite, attr, factory(settings))
+            setattr(Escalite, settings_attr, copy.deepcopy(settings))
+
+    @staticmethod
+    def reload_notifiers(configs: dict = None):
+        """
+        Drops cached notifiers so they are rebuilt from the configuration.
+        With configs, the notifiers for it are rebuilt and set right away.
+        """
+        if configs is None:
+            Escalite.notifier_registry.invalidate()
+            return
+        Escalite.notifier_registry.invalidate(configs)
+        Escalite.set_notifiers_from_configs(configs)
+
+    @staticmethod
+    def set_alert_id_generator(generator: Union[str, Callable[[], str]]):
+        """
+        Sets how alert ids are generated: "uuid4", "ulid", "counter" or any
+        callable returning a string. Ids are only generated when first read.
+        """
+        RequestLog.id_generator = staticmethod(get_alert_id_generator(generator))
+
+    @staticmethod
+    def set_dispatcher(dispatcher: Optional[BackgroundDispatcher]):
+        """
+        Sets the dispatcher used to deliver escalations off the request path.
+        Passing None restores inline delivery.
+        """
+        Escalite.dispatcher = dispatcher
+
+    @staticmethod
+    def set_outbox(outbox: Optional[SqliteOutbox], replay_configs: dict = None):
+        """
+        Sets the outbox escalations are stored in until they are delivered.
+        With replay_configs, what is left in the outbox from earlier runs is
+        delivered to those notifiers on a background thread.
+        Passing None stops using an outbox.
+        """
+        Escalite.outbox = outbox
+        if outbox is not None and replay_configs is not None:
+            outbox.start_replay(
+                Escalite.notifier_registry.get_notifiers(replay_configs)
+            )
+
+    @staticmethod
+    def set_metrics(metrics: Optional[MetricsAggregator]):
+        """
+        Sets the aggregator every ended request is recorded in, see
+        MetricsAggregator. Passing None stops collecting metrics.
         """
-        Escalite.notifiers = NotifierFactory.create_notifiers(configs)
+        Escalite.metrics = metrics
+        Escalite._metrics_settings = None
+
+    @staticmethod
+    def flush(timeout: float = None) -> bool:
+        """
+        Waits for queued escalations to be delivered.
+        Returns False if the timeout expired first.
+        """
+        if Escalite.dispatcher is None:
+            return True
+        return Escalite.dispatcher.flush(timeout)
+
+    @staticmethod
+    def shutdown(timeout: float = None) -> bool:
+        """
+        Delivers queued escalations and stops the dispatcher,
+        then sends any pending digests right away.
+        """
+        dispatcher, Escalite.dispatcher = Escalite.dispatcher, None
+        delivered = True if dispatcher is None else dispatcher.shutdown(timeout)
+        for notifier in Escalite.notifiers or []:
+            if isinstance(notifier, BatchingNotifier):
+                notifier.flush()
+        if Escalite.outbox is not None:
+            Escalite.outbox.flush()
+        return delivered
 
     @staticmethod
     def escalate(message: str = None, from_level: LOG_LEVEL = "error"):
         """
         Placeholder for the escalate method.
         This can be used to trigger notifications or other actions based on the logs.
+        With an aggregate policy (the "aggregate" config), the request is
+        counted towards the failure rates instead of checked against
+        from_level, and only rates that start or stop firing are escalated.
         """
-        log_data = Escalite.get_all_logs()
+        escalation = Escalite._prepare_escalation(message, from_level)
+        if escalation is None:
+            return
+        message, log_data = escalation
+        outbox_id, notifiers = Escalite._store_in_outbox(message, log_data)
+        if Escalite.dispatcher is not None:
+            Escalite._submit(outbox_id, notifiers, message, log_data)
+            return
+        try:
+            result = NotifierFactory.notify(
+                notifiers, message, log_data, **Escalite.notify_options
+            )
+        except Exception as e:
+            Escalite._settle_outbox(outbox_id, False, e)
+            raise
+        Escalite._settle_result(outbox_id, result)
+        logger.info("Escalation completed with data: %s", log_data)
 
-        if not log_data:
-            logger.info("No logs to escalate.")
+    @staticmethod
+    async def aescalate(message: str = None, from_level: LOG_LEVEL = "error"):
+        """
+        Async counterpart of escalate, notifying all notifiers concurrently.
+        """
+        escalation = Escalite._prepare_escalation(message, from_level)
+        if escalation is None:
+            return
+        message, log_data = escalation
+        outbox_id, notifiers = Escalite._store_in_outbox(message, log_data)
+        if Escalite.dispatcher is not None:
+            Escalite._submit(outbox_id, notifiers, message, log_data)
             return
+        try:
+            result = await NotifierFactory.anotify(
+                notifiers,
+                message,
+                log_data,
+                timeout=Escalite.notify_options.get("timeout"),
+            )
+        except Exception as e:
+            Escalite._settle_outbox(outbox_id, False, e)
+            raise
+        Escalite._settle_result(outbox_id, result)
+        logger.info("Escalation completed with data: %s", log_data)
 
-        if not (
-            LOG_LEVELS[log_data.get("log_level", "info")] >= LOG_LEVELS[from_level]
-        ):
-            logger.info("No logs to escalate based on the specified level.")
+    @staticmethod
+    def _submit(
+        outbox_id: Optional[str], notifiers: list, message: str, log_data: dict
+    ):
+        # A dropped escalation is settled as failed by the dispatcher, so it
+        # stays in the outbox for replay
+        queued = Escalite.dispatcher.submit(
+            notifiers,
+            message,
+            log_data,
+            on_done=Escalite._outbox_callback(outbox_id),
+            **Escalite.notify_options,
+        )
+        if queued:
+            logger.info("Escalation queued for alert %s", log_data.get(ALERT_ID))
+        else:
+            logger.warning(
+                "Escalation for alert %s was dropped, the dispatch queue is full",
+                log_data.get(ALERT_ID),
+            )
+
+    @staticmethod
+    def _store_in_outbox(message: str, log_data: dict) -> Tuple[Optional[str], list]:
+        # Returns the outbox id and the notifiers to deliver to, tracked so
+        # that a replay only goes to the ones that did not deliver
+        if Escalite.outbox is None:
+            return None, Escalite.notifiers
+        outbox_id = Escalite.outbox.append(message, log_data)
+        return outbox_id, Escalite.outbox.track(outbox_id, Escalite.notifiers)
+
+    @staticmethod
+    def _outbox_callback(outbox_id: Optional[str]):
+        if outbox_id is None:
+            return None
+        return functools.partial(Escalite._settle_outbox, outbox_id)
+
+    @staticmethod
+    def _settle_result(outbox_id: Optional[str], result: Optional[NotifyResult]):
+        # Deliveries a notifier handed on (retried, batched) are only settled
+        # once they complete, and dropped ones stay in the outbox
+        if result is None:
+            Escalite._settle_outbox(outbox_id, True)
+        elif outbox_id is not None:
+            result.when_done(Escalite._outbox_callback(outbox_id))
+
+    @staticmethod
+    def _settle_outbox(
+        outbox_id: Optional[str], delivered: bool, error: BaseException = None
+    ):
+        # Delivered escalations leave the outbox, failed ones stay for replay
+        if outbox_id is None or Escalite.outbox is None:
             return
+        if delivered:
+            Escalite.outbox.ack(outbox_id)
+        else:
+            Escalite.outbox.fail(outbox_id, error)
+
+    @staticmethod
+    def _prepare_escalation(message: Optional[str], from_level: LOG_LEVEL):
+        """
+        Returns the (message, log_data) to escalate, or None if there is nothing to escalate.
+        """
+        logs = _request_logs.get()
+        if logs is None:
+            logger.info("No logs to escalate.")
+            return None
+
+        if Escalite.aggregate_policy is not None:
+            return Escalite._prepare_aggregate_escalation(message)
+
+        # An unsampled request's level is its highest level, so this check
+        # does not need its buffered entries. Escalation rules that were met
+        # raise the level the request escalates at.
+        level = max(LOG_LEVELS[logs.log_level], logs.rule_level)
+        if level < LOG_LEVELS[from_level]:
+            logger.info("No logs to escalate based on the specified level.")
+            return None
+
+        log_data = Escalite.get_all_logs()
+        if logs.rule_level > LOG_LEVELS[logs.log_level]:
+            # lets notifier routes see the level the rules escalated at
+            log_data[ESCALATION_LEVEL] = _LEVEL_NAMES[logs.rule_level]
 
         message = (
             message
@@ -307,16 +755,86 @@ class Escalite:
             raise RuntimeError(
                 "No notifiers set. Call set_notifiers_from_configs() first."
             )
-        NotifierFactory.notify(Escalite.notifiers, message, log_data)
-        logger.info(f"Escalation completed with data: {log_data}")
+        suppressed = 0
+        if Escalite.suppression_cache is not None:
+            suppressed = Escalite.suppression_cache.check(fingerprint(log_data))
+            if suppressed is None:
+                logger.info("Duplicate escalation suppressed.")
+                return None
+            if suppressed:
+                log_data[SUPPRESSED_COUNT] = suppressed
+        # lets the notifiers share one render per formatter
+        return message, VersionedLogs(
+            log_data, (logs.alert_id, logs.version, suppressed)
+        )
+
+    @staticmethod
+    def _prepare_aggregate_escalation(message: Optional[str]):
+        # The request only counts towards the failure rates; it is escalated
+        # when a rate starts or stops firing, without duplicate suppression
+        # since each alert is raised once
+        logs = Escalite._current_logs()
+        alerts = Escalite.aggregate_policy.observe(logs)
+        if not alerts:
+            logger.info("No aggregate alert raised.")
+            return None
+        if Escalite.notifiers is None:
+            raise RuntimeError(
+                "No notifiers set. Call set_notifiers_from_configs() first."
+            )
+        log_data = {
+            **logs.to_dict(),
+            AGGREGATE_ALERTS: alerts,
+            ESCALATION_LEVEL: Escalite.aggregate_policy.error_level,
+        }
+        # each aggregate escalation carries alerts of its own
+        logs.version += 1
+        return message or AggregatePolicy.describe(alerts), VersionedLogs(
+            log_data, (logs.alert_id, logs.version)
+        )
+
+    @staticmethod
+    def service_span(
+        service_name: str, message: str = None, url: str = None
+    ) -> "ServiceSpan":
+        """
+        Times a service call, logging it with start_service_log and
+        stop_service_log. Use it as a context manager (sync or async) or as a
+        decorator of regular and coroutine functions:
+
+            with Escalite.service_span("payments", url="/charge"):
+                ...
+
+            @Escalite.service_span("payments")
+            async def charge(): ...
+
+        A call that raises is logged at "error" level with its traceback.
+        Outside a logging session the span does nothing.
+        """
+        return ServiceSpan(service_name, message, url)
 
     @staticmethod
     def route_logging(configs: dict, log_level: LOG_LEVEL = "error"):
         """
         Decorator for per-route logging and escalation.
+        Works with both regular and coroutine functions.
         """
 
         def decorator(func):
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    Escalite.set_notifiers_from_configs(configs)
+                    Escalite.start_logging()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        Escalite.end_logging()
+                        await Escalite.aescalate(from_level=log_level)
+
+                return async_wrapper
+
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
                 Escalite.set_notifiers_from_configs(configs)
@@ -330,3 +848,65 @@ class Escalite:
             return wrapper
 
         return decorator
+
+
+class ServiceSpan:
+    """
+    Logs the start and stop of a service call, see Escalite.service_span.
+    """
+
+    def __init__(self, service_name: str, message: str = None, url: str = None):
+        self.service_name = service_name
+        self.message = message
+        self.url = url
+
+    def __enter__(self):
+        if _request_logs.get() is not None:
+            Escalite.start_service_log(
+                self.service_name,
+                self.message or f"{self.service_name} started",
+                url=self.url,
+            )
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if _request_logs.get() is None:
+            return False
+        if exc_type is None:
+            Escalite.stop_service_log(
+                self.service_name,
+                self.message or f"{self.service_name} completed",
+                url=self.url,
+            )
+        else:
+            Escalite.stop_service_log(
+                self.service_name,
+                f"{self.service_name} failed: {exc!r}",
+                level="error",
+                url=self.url,
+                error_trace="".join(traceback.format_exception(exc_type, exc, tb)),
+            )
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with self:
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self:
+                return func(*args, **kwargs)
+
+        return wrapper
@@ -1,16 +1,137 @@
+from typing import Iterator, List, Optional
+
 from escalite.formatters.base_formatter import Formatter
 
+WRAP = "wrap"
+TRUNCATE = "truncate"
+OVERFLOW_MODES = (WRAP, TRUNCATE)
+ELLIPSIS = "..."
+
 
 class DictTableFormatter(Formatter):
+    """
+    Formats a dict as a two-column Key | Value table.
+
+    Every key and value is turned into a string only once. Dict values are
+    rendered as indented sub-tables, down to ``max_depth`` levels of nesting;
+    deeper values are shown as strings. With ``max_width``, values wider than
+    that many characters are wrapped onto continuation lines, or cut with
+    "..." when ``overflow`` is "truncate".
+
+    iter_lines() and iter_chunks() produce the table piece by piece, so it can
+    be streamed or split into messages of a provider's maximum size.
+    """
+
+    def __init__(
+        self,
+        max_width: Optional[int] = None,
+        overflow: str = WRAP,
+        max_depth: int = 1,
+        indent: int = 2,
+    ):
+        if overflow not in OVERFLOW_MODES:
+            raise ValueError(
+                f"Unknown overflow mode: {overflow}. "
+                f"Expected one of: {', '.join(OVERFLOW_MODES)}"
+            )
+        if max_width is not None and max_width <= len(ELLIPSIS):
+            raise ValueError(f"max_width must be greater than {len(ELLIPSIS)}")
+        self.max_width = max_width
+        self.overflow = overflow
+        self.max_depth = max_depth
+        self.indent = indent
+
     def format(self, data: dict) -> str:
         if not data:
             return ""
-        key_width = max(len(str(k)) for k in data.keys())
-        val_width = max(len(str(v)) for v in data.values())
-        lines = [
-            f"{'Key'.ljust(key_width)} | {'Value'.ljust(val_width)}",
-            f"{'-' * key_width}-+-{'-' * val_width}",
-        ]
+        return "\n".join(self.iter_lines(data))
+
+    def iter_lines(self, data: dict, depth: int = 0) -> Iterator[str]:
+        """
+        Yields the lines of the table, without line breaks.
+        """
+        if not data:
+            return
+        rows = []
+        key_width = len("Key")
+        val_width = len("Value")
         for k, v in data.items():
-            lines.append(f"{str(k).ljust(key_width)} | {str(v).ljust(val_width)}")
-        return "\n".join(lines)
+            key = str(k)
+            if len(key) > key_width:
+                key_width = len(key)
+            if isinstance(v, dict) and v and depth < self.max_depth:
+                rows.append((key, None, v))
+                continue
+            value = str(v)
+            if self.max_width is None and "\n" not in value and "\r" not in value:
+                lines = (value,)
+                if len(value) > val_width:
+                    val_width = len(value)
+            else:
+                lines = self._value_lines(value)
+                for line in lines:
+                    if len(line) > val_width:
+                        val_width = len(line)
+            rows.append((key, lines, None))
+
+        prefix = " " * (self.indent * depth)
+        blank_key = " " * key_width
+        yield f"{prefix}{'Key'.ljust(key_width)} | {'Value'.ljust(val_width)}"
+        yield f"{prefix}{'-' * key_width}-+-{'-' * val_width}"
+        for key, lines, nested in rows:
+            if nested is not None:
+                yield f"{prefix}{key.ljust(key_width)} |"
+                yield from self.iter_lines(nested, depth + 1)
+                continue
+            yield f"{prefix}{key.ljust(key_width)} | {lines[0].ljust(val_width)}"
+            for line in lines[1:]:
+                yield f"{prefix}{blank_key} | {line.ljust(val_width)}"
+
+    def iter_chunks(self, data: dict, max_length: int) -> Iterator[str]:
+        """
+        Yields the table in pieces of at most max_length characters, broken
+        at line ends where possible.
+        """
+        if max_length < 1:
+            raise ValueError("max_length must be at least 1")
+        chunk: List[str] = []
+        size = 0
+        for line in self.iter_lines(data):
+            while len(line) > max_length:
+                if chunk:
+                    yield "\n".join(chunk)
+                    chunk, size = [], 0
+                yield line[:max_length]
+                line = line[max_length:]
+            # +1 for the line break joining it to the chunk
+            added = len(line) + (1 if chunk else 0)
+            if size + added > max_length:
+                yield "\n".join(chunk)
+                chunk, size = [], 0
+                added = len(line)
+            chunk.append(line)
+            size += added
+        if chunk:
+            yield "\n".join(chunk)
+
+    def _value_lines(self, value: str) -> List[str]:
+        lines = value.splitlines() if "\n" in value or "\r" in value else [value]
+        if not lines:
+            return [""]
+        width = self.max_width
+        if width is None:
+            return lines
+        result = []
+        for line in lines:
+            if len(line) <= width:
+                result.append(line)
+            elif self.overflow == TRUNCATE:
+                result.append(line[: width - len(ELLIPSIS)] + ELLIPSIS)
+            else:
+                result.extend(line[i : i + width] for i in range(0, len(line), width))
+        return result
+
+
+# The formatter the built-in notifiers use by default, shared so that they
+# share its renders of an escalation (see RenderCache)
+default_table_formatter = DictTableFormatter()
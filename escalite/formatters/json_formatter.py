@@ -0,0 +1,34 @@
+import json
+
+from escalite.formatters.base_formatter import Formatter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class JsonFormatter(Formatter):
+    """
+    Formats data as JSON for machine-readable channels.
+
+    Uses orjson when it is installed and the standard json module otherwise.
+    Values that are not JSON types are written as their str().
+    """
+
+    def __init__(self, indent: bool = False):
+        self.indent = indent
+
+    def format(self, data) -> str:
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(data, default=str, option=option).decode()
+            except TypeError:
+                # e.g. integers beyond 64 bits, which the json module handles
+                pass
+        if self.indent:
+            return json.dumps(data, default=str, ensure_ascii=False, indent=2)
+        return json.dumps(data, default=str, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+from escalite.formatters.base_formatter import Formatter
+
+
+class VersionedLogs(dict):
+    """
+    The logs of an escalation, with the ``version`` that identifies their
+    content: two VersionedLogs with the same version hold the same logs.
+    Escalite.escalate hands these to the notifiers so their renders can be
+    shared, see RenderCache.
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, data: dict, version: Hashable):
+        super().__init__(data)
+        self.version = version
+
+
+class _Render:
+    __slots__ = ("formatter", "done", "text", "error")
+
+    def __init__(self, formatter: Formatter):
+        # Holding on to the formatter keeps its id from being reused while cached
+        self.formatter = formatter
+        self.done = threading.Event()
+        self.text = None
+        self.error = None
+
+
+class RenderCache:
+    """
+    Formats the logs of an escalation once per formatter, however many
+    notifiers use that formatter.
+
+    Renders are keyed by the formatter and the version of the logs (see
+    VersionedLogs), which changes whenever the request logs change. When
+    notifiers run in parallel, the first one formats and the others wait
+    for its result. The ``max_entries`` most recent renders are kept.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._renders = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, formatter: Formatter, data: VersionedLogs) -> str:
+        key = (id(formatter), data.version)
+        with self._lock:
+            entry = self._renders.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._renders[key] = _Render(formatter)
+                while len(self._renders) > self.max_entries:
+                    self._renders.popitem(last=False)
+                self.misses += 1
+            else:
+                self._renders.move_to_end(key)
+                self.hits += 1
+        if not owner:
+            entry.done.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.text
+        try:
+            entry.text = formatter.format(data)
+        except Exception as e:
+            entry.error = e
+            with self._lock:
+                if self._renders.get(key) is entry:
+                    del self._renders[key]
+            raise
+        finally:
+            entry.done.set()
+        return entry.text
+
+    def clear(self):
+        with self._lock:
+            self._renders.clear()
+
+    def __len__(self):
+        return len(self._renders)
+
+
+default_render_cache = RenderCache()
+
+
+def render(formatter: Formatter, data) -> str:
+    """
+    Formats data with the formatter, through the shared RenderCache when
+    the data are VersionedLogs and directly otherwise.
+    """
+    if isinstance(data, VersionedLogs):
+        return default_render_cache.render(formatter, data)
+    return formatter.format(data)
@@ -0,0 +1,144 @@
+import threading
+from typing import Dict, Iterable, Optional
+
+from escalite.metrics.histogram import LatencyHistogram
+from escalite.models.log_entry import LogEntry
+from escalite.models.request_log import RequestLog
+from escalite.utils.constants import API_LOGS, SERVICE_LOGS
+
+REQUESTS = "requests"
+SERVICES = "services"
+UNKNOWN_ENDPOINT = ""
+
+
+class MetricsAggregator:
+    """
+    Collects the durations of finished requests and of their service calls
+    into a LatencyHistogram per endpoint and per service.
+
+    observe() is called with each request's logs once it has ended. The
+    endpoint is the value logged under ``endpoint_key`` in the api_logs
+    (the "request_path" of the usage examples); log a route template rather
+    than the raw path when paths contain ids, since every endpoint keeps its
+    own histogram. Service calls are timed by start_service_log and
+    stop_service_log (or service_span).
+
+    The logs of an unsampled request (see SamplingPolicy) are read from its
+    buffer without capturing it; a service call whose start fell out of the
+    buffer is not recorded.
+    """
+
+    def __init__(
+        self,
+        quantiles: Iterable[float] = (0.5, 0.95, 0.99),
+        endpoint_key: str = "request_path",
+        significant_bits: int = 8,
+        shards: int = 8,
+    ):
+        self.quantiles = tuple(quantiles)
+        for q in self.quantiles:
+            if not 0 <= q <= 1:
+                raise ValueError("quantiles must be between 0 and 1")
+        self.endpoint_key = endpoint_key
+        self.significant_bits = significant_bits
+        self.shards = shards
+        self._histograms = {REQUESTS: {}, SERVICES: {}}
+        self._lock = threading.Lock()
+
+    def observe(self, logs: RequestLog):
+        """
+        Records the duration of an ended request and of its service calls.
+        """
+        if logs.buffer is not None:
+            self._observe_buffer(logs)
+            return
+        if logs.time_elapsed is not None:
+            self.record_request(self._endpoint(logs), logs.time_elapsed)
+        services = logs.sections.get(SERVICE_LOGS)
+        if not services:
+            return
+        for name, entry in services.items():
+            if isinstance(entry, LogEntry) and entry.time_elapsed is not None:
+                self.record_service(name, entry.time_elapsed)
+
+    def record_request(self, endpoint: str, seconds: float):
+        self._histogram(REQUESTS, endpoint).record(seconds)
+
+    def record_service(self, service_name: str, seconds: float):
+        self._histogram(SERVICES, service_name).record(seconds)
+
+    def request_stats(self, endpoint: str = None) -> dict:
+        """
+        Returns count, sum, min, max and quantiles of the request durations,
+        per endpoint, or for a single endpoint.
+        """
+        return self._stats(REQUESTS, endpoint)
+
+    def service_stats(self, service_name: str = None) -> dict:
+        """
+        Returns count, sum, min, max and quantiles of the service call
+        durations, per service, or for a single service.
+        """
+        return self._stats(SERVICES, service_name)
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        return {
+            REQUESTS: self.request_stats(),
+            SERVICES: self.service_stats(),
+        }
+
+    def histograms(self, kind: str) -> Dict[str, LatencyHistogram]:
+        """
+        Returns a copy of the histograms of "requests" or "services".
+        """
+        with self._lock:
+            return dict(self._histograms[kind])
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {REQUESTS: {}, SERVICES: {}}
+
+    def _stats(self, kind: str, name: Optional[str]) -> dict:
+        if name is not None:
+            histogram = self._histograms[kind].get(name)
+            if histogram is None:
+                return {}
+            return histogram.summary(self.quantiles)
+        return {
+            key: histogram.summary(self.quantiles)
+            for key, histogram in self.histograms(kind).items()
+        }
+
+    def _histogram(self, kind: str, name: str) -> LatencyHistogram:
+        histogram = self._histograms[kind].get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms[kind].get(name)
+                if histogram is None:
+                    histogram = LatencyHistogram(self.significant_bits, self.shards)
+                    self._histograms[kind][name] = histogram
+        return histogram
+
+    def _endpoint(self, logs: RequestLog) -> str:
+        entry = logs.sections.get(API_LOGS, {}).get(self.endpoint_key)
+        if isinstance(entry, LogEntry) and entry.value is not None:
+            return str(entry.value)
+        return UNKNOWN_ENDPOINT
+
+    def _observe_buffer(self, logs: RequestLog):
+        # Buffered entries are (key, value, tag, code, message, level,
+        # extras, perf_counter_ns) tuples; a service is timed from its first
+        # to its last entry, as a captured entry would be
+        endpoint = UNKNOWN_ENDPOINT
+        spans = {}
+        for key, value, tag, *_, now_ns in logs.buffer:
+            if tag == SERVICE_LOGS:
+                span = spans.get(key)
+                spans[key] = (now_ns, None) if span is None else (span[0], now_ns)
+            elif tag == API_LOGS and key == self.endpoint_key and value is not None:
+                endpoint = str(value)
+        if logs.time_elapsed is not None:
+            self.record_request(endpoint, logs.time_elapsed)
+        for name, (start_ns, end_ns) in spans.items():
+            if end_ns is not None:
+                self.record_service(name, (end_ns - start_ns) / 1e9)
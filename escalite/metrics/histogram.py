@@ -0,0 +1,160 @@
+import itertools
+import threading
+from typing import Dict, Iterable, Optional
+
+_thread_indices = itertools.count()
+_thread_local = threading.local()
+
+
+def _thread_index() -> int:
+    # Thread idents are aligned addresses, so their low bits are useless for
+    # picking a shard; each thread gets the next index on first use instead
+    try:
+        return _thread_local.index
+    except AttributeError:
+        index = _thread_local.index = next(_thread_indices)
+        return index
+
+
+class _Shard:
+    __slots__ = ("lock", "counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+
+class LatencyHistogram:
+    """
+    A histogram of durations with HDR-style buckets.
+
+    Durations are stored as whole microseconds in buckets whose width grows
+    with the value: values below 2**significant_bits get a bucket each, and
+    above that every power of two is split into 2**(significant_bits - 1)
+    buckets, so a quantile is off by less than 1 / 2**(significant_bits - 1)
+    of its value (0.8% with the default 8 bits). Only the buckets in use are
+    stored.
+
+    Recording threads are spread over ``shards`` independently locked
+    shards, so they rarely wait on each other; reads merge the shards.
+    """
+
+    def __init__(self, significant_bits: int = 8, shards: int = 8):
+        if not 2 <= significant_bits <= 16:
+            raise ValueError("significant_bits must be between 2 and 16")
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.significant_bits = significant_bits
+        self._linear = 1 << significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self._shards = tuple(_Shard() for _ in range(shards))
+
+    def record(self, seconds: float):
+        """
+        Adds a duration in seconds; negative durations count as zero.
+        """
+        value = int(seconds * 1_000_000) if seconds > 0 else 0
+        index = self._index(value)
+        shard = self._shards[_thread_index() % len(self._shards)]
+        with shard.lock:
+            shard.counts[index] = shard.counts.get(index, 0) + 1
+            shard.count += 1
+            shard.total += value
+            if shard.min is None or value < shard.min:
+                shard.min = value
+            if shard.max is None or value > shard.max:
+                shard.max = value
+
+    @property
+    def count(self) -> int:
+        return sum(shard.count for shard in self._shards)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns the q-quantile (0 <= q <= 1) in seconds, or None when empty.
+        """
+        return self.quantiles((q,))[q]
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[float, Optional[float]]:
+        """
+        Returns several quantiles, in seconds, from one merge of the shards.
+        """
+        qs = tuple(qs)
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError("quantiles must be between 0 and 1")
+        counts, count, _, _, high = self._merge()
+        if not count:
+            return {q: None for q in qs}
+        buckets = sorted(counts.items())
+        result = {}
+        for q in sorted(qs):
+            # The rank of the quantile, counting from 1
+            rank = max(1, int(q * count + 0.5))
+            seen = 0
+            for index, bucket_count in buckets:
+                seen += bucket_count
+                if seen >= rank:
+                    break
+            result[q] = min(self._upper(index), high) / 1_000_000
+        return result
+
+    def summary(self, qs: Iterable[float] = (0.5, 0.95, 0.99)) -> dict:
+        """
+        Returns count, sum, min, max and the given quantiles, in seconds.
+        """
+        qs = tuple(qs)
+        _, count, total, low, high = self._merge()
+        data = {
+            "count": count,
+            "sum": total / 1_000_000,
+            "min": low / 1_000_000 if low is not None else None,
+            "max": high / 1_000_000 if high is not None else None,
+        }
+        data["quantiles"] = self.quantiles(qs)
+        return data
+
+    def reset(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.counts = {}
+                shard.count = 0
+                shard.total = 0
+                shard.min = None
+                shard.max = None
+
+    def _merge(self):
+        counts: Dict[int, int] = {}
+        count = total = 0
+        low = high = None
+        for shard in self._shards:
+            with shard.lock:
+                if not shard.count:
+                    continue
+                for index, bucket_count in shard.counts.items():
+                    counts[index] = counts.get(index, 0) + bucket_count
+                count += shard.count
+                total += shard.total
+                if low is None or shard.min < low:
+                    low = shard.min
+                if high is None or shard.max > high:
+                    high = shard.max
+        return counts, count, total, low, high
+
+    def _index(self, value: int) -> int:
+        if value < self._linear:
+            return value
+        shift = value.bit_length() - self.significant_bits
+        return self._linear + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def _upper(self, index: int) -> int:
+        # The highest value that falls into the bucket
+        if index < self._linear:
+            return index
+        shift, offset = divmod(index - self._linear, self._half)
+        shift += 1
+        return ((self._half + offset + 1) << shift) - 1
@@ -0,0 +1,48 @@
+from typing import List
+
+from escalite.metrics.aggregator import REQUESTS, SERVICES, MetricsAggregator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_METRICS = (
+    (
+        REQUESTS,
+        "request_duration_seconds",
+        "endpoint",
+        "Duration of the requests logged by escalite.",
+    ),
+    (
+        SERVICES,
+        "service_duration_seconds",
+        "service",
+        "Duration of the service calls logged by escalite.",
+    ),
+)
+
+
+def to_prometheus(aggregator: MetricsAggregator, prefix: str = "escalite") -> str:
+    """
+    Renders the aggregated durations in the Prometheus text exposition format,
+    as one summary per endpoint and per service. Serve it with CONTENT_TYPE.
+    """
+    lines: List[str] = []
+    for kind, suffix, label, help_text in _METRICS:
+        name = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} summary")
+        for key, histogram in sorted(aggregator.histograms(kind).items()):
+            stats = histogram.summary(aggregator.quantiles)
+            labels = f'{label}="{_escape(key)}"'
+            for q, value in stats["quantiles"].items():
+                lines.append(f'{name}{{{labels},quantile="{q}"}} {_number(value)}')
+            lines.append(f"{name}_sum{{{labels}}} {_number(stats['sum'])}")
+            lines.append(f"{name}_count{{{labels}}} {stats['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    return "NaN" if value is None else repr(float(value))
@@ -0,0 +1,98 @@
+from typing import Any, Optional
+
+from escalite.utils.constants import END_TIME, START_TIME, TIME_ELAPSED
+
+RESERVED_KEYS = frozenset((START_TIME, END_TIME, TIME_ELAPSED))
+
+
+class LogEntry:
+    """
+    A single log entry.
+
+    The core fields live in slots instead of a per-entry dict; extra fields
+    are kept in a dict that is only created when an entry has extras.
+    to_dict() returns the entry in the shape used by get_all_logs and the
+    notifiers.
+    """
+
+    __slots__ = (
+        "value",
+        "code",
+        "message",
+        "log_level",
+        "log_time",
+        "start_time",
+        "end_time",
+        "time_elapsed",
+        "start_ns",
+        "extras",
+    )
+
+    def __init__(
+        self,
+        value: Any = None,
+        code: Optional[int] = None,
+        message: Optional[str] = None,
+        log_level: str = "info",
+        log_time: Optional[float] = None,
+        extras: Optional[dict] = None,
+    ):
+        self.value = value
+        self.code = code
+        self.message = message
+        self.log_level = log_level
+        self.log_time = log_time
+        self.start_time = None
+        self.end_time = None
+        self.time_elapsed = None
+        # time.perf_counter_ns() at start_time, when it was measured here
+        self.start_ns = None
+        self.extras = None
+        if extras:
+            # Timing passed as extras goes to the timing fields
+            self.extras = {}
+            for k, v in extras.items():
+                if k == START_TIME:
+                    self.start_time = v
+                elif k == END_TIME:
+                    self.end_time = v
+                elif k == TIME_ELAPSED:
+                    self.time_elapsed = v
+                else:
+                    self.extras[k] = v
+            if not self.extras:
+                self.extras = None
+
+    def update_extras(self, extras: Optional[dict]):
+        """
+        Merges extras into the entry; timing keys are ignored.
+        """
+        if not extras:
+            return
+        for k, v in extras.items():
+            if k in RESERVED_KEYS:
+                continue
+            if self.extras is None:
+                self.extras = {}
+            self.extras[k] = v
+
+    def to_dict(self) -> dict:
+        data = {
+            "value": self.value,
+            "code": self.code,
+            "message": self.message,
+            "log_level": self.log_level,
+            "log_time": self.log_time,
+        }
+        if self.extras:
+            data.update(self.extras)
+        if self.start_time is not None:
+            data[START_TIME] = self.start_time
+        if self.end_time is not None:
+            data[END_TIME] = self.end_time
+        if self.time_elapsed is not None:
+            data[TIME_ELAPSED] = self.time_elapsed
+        return data
+
+    def __repr__(self):
+        return f"LogEntry({self.to_dict()!r})"
@@ -0,0 +1,210 @@
+import time
+from typing import Any
+
+from escalite.models.log_entry import LogEntry
+from escalite.utils.alert_id import uuid4_id
+from escalite.utils.constants import (
+    ALERT_ID,
+    API_LOGS,
+    END_TIME,
+    ERROR_LOGS,
+    LOG_DATE,
+    LOG_OVERFLOW,
+    SERVICE_LOGS,
+    START_TIME,
+    TIME_ELAPSED,
+    TRIGGERED_RULES,
+    UNSAMPLED_DROPPED,
+)
+
+DEFAULT_TAGS = (API_LOGS, SERVICE_LOGS, ERROR_LOGS)
+
+
+class RequestLog:
+    """
+    The logs collected for one request.
+
+    ``sections`` maps a tag to a dict of LogEntry objects, and a key logged
+    without a tag directly to its LogEntry. A tag's dict also holds the tag's
+    own "log_level" once one has been recorded. to_dict() returns the logs in
+    the shape returned by Escalite.get_all_logs.
+
+    Most requests are never escalated, so ``alert_id`` and ``log_date`` are
+    only computed when first read. ``id_generator`` creates the alert ids.
+
+    For a request that was not sampled (see SamplingPolicy), ``buffer`` holds
+    the arguments of the last entries logged instead of ``sections``, and
+    ``log_level`` is the highest level logged so far. ``buffered`` counts the
+    entries that went to the buffer, ``keep_level`` is the level that switches
+    the request to full capture.
+
+    ``limits`` (see LogLimits) caps what the request may log; ``entries``,
+    ``dropped_entries`` and ``truncated_values`` are counted while it is set.
+
+    ``rules`` (see RuleSet) are the escalation rules evaluated as entries are
+    logged. The names of the rules met go to ``triggered_rules`` and the
+    highest of their levels to ``rule_level``; ``rule_counts`` holds the
+    counters of the error-count rules.
+
+    ``version`` is raised by every change to the logs, so together with the
+    alert id it identifies their content (see VersionedLogs).
+    """
+
+    __slots__ = (
+        "_alert_id",
+        "log_level",
+        "start_time",
+        "start_ns",
+        "end_time",
+        "_log_date",
+        "time_elapsed",
+        "sections",
+        "buffer",
+        "buffered",
+        "keep_level",
+        "unsampled_dropped",
+        "limits",
+        "entries",
+        "dropped_entries",
+        "truncated_values",
+        "rules",
+        "rule_counts",
+        "triggered_rules",
+        "rule_level",
+        "version",
+    )
+
+    id_generator = staticmethod(uuid4_id)
+
+    def __init__(self):
+        self._alert_id = None
+        self.log_level = "info"
+        # The wall clock is read once; later times are measured on the
+        # monotonic perf_counter_ns() clock relative to start_ns
+        self.start_time = time.time()
+        self.start_ns = time.perf_counter_ns()
+        self.end_time = None
+        self._log_date = None
+        self.time_elapsed = None
+        self.sections = {tag: {} for tag in DEFAULT_TAGS}
+        self.buffer = None
+        self.buffered = 0
+        self.keep_level = 0
+        self.unsampled_dropped = 0
+        self.limits = None
+        self.entries = 0
+        self.dropped_entries = 0
+        self.truncated_values = 0
+        self.rules = None
+        self.rule_counts = None
+        self.triggered_rules = None
+        self.rule_level = 0
+        self.version = 0
+
+    @property
+    def alert_id(self) -> str:
+        if self._alert_id is None:
+            self._alert_id = self.id_generator()
+        return self._alert_id
+
+    @alert_id.setter
+    def alert_id(self, value: str):
+        self._alert_id = value
+        self.version += 1
+
+    @property
+    def log_date(self) -> str:
+        # The local date and time the request started
+        if self._log_date is None:
+            self._log_date = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(self.start_time)
+            )
+        return self._log_date
+
+    def wall_time(self, ns: int) -> float:
+        """
+        Converts a time.perf_counter_ns() reading taken during the request to
+        a wall-clock timestamp.
+        """
+        return self.start_time + (ns - self.start_ns) / 1e9
+
+    def end(self):
+        self.time_elapsed = (time.perf_counter_ns() - self.start_ns) / 1e9
+        self.end_time = self.start_time + self.time_elapsed
+        self.version += 1
+
+    def trigger(self, rule_name: str, level: int):
+        """
+        Records that an escalation rule was met, raising the level the request
+        escalates at to the rule's level (a LOG_LEVELS value).
+        """
+        if self.triggered_rules is None:
+            self.triggered_rules = [rule_name]
+        elif rule_name in self.triggered_rules:
+            return
+        else:
+            self.triggered_rules.append(rule_name)
+        self.version += 1
+        if level > self.rule_level:
+            self.rule_level = level
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Returns a top-level field, a tag's logs or an untagged entry as plain data.
+        """
+        if key in self.sections:
+            return self._section_to_dict(self.sections[key])
+        if key == ALERT_ID:
+            return self.alert_id
+        if key == "log_level":
+            return self.log_level
+        if key == START_TIME:
+            return self.start_time
+        if key == END_TIME:
+            return self.end_time
+        if key == LOG_DATE:
+            return self.log_date
+        if key == TIME_ELAPSED and self.time_elapsed is not None:
+            return self.time_elapsed
+        if key == UNSAMPLED_DROPPED and self.unsampled_dropped:
+            return self.unsampled_dropped
+        if key == LOG_OVERFLOW and (self.dropped_entries or self.truncated_values):
+            return self._overflow()
+        if key == TRIGGERED_RULES and self.triggered_rules:
+            return list(self.triggered_rules)
+        return default
+
+    def to_dict(self) -> dict:
+        data = {
+            ALERT_ID: self.alert_id,
+            "log_level": self.log_level,
+            START_TIME: self.start_time,
+            END_TIME: self.end_time,
+            LOG_DATE: self.log_date,
+        }
+        if self.time_elapsed is not None:
+            data[TIME_ELAPSED] = self.time_elapsed
+        if self.unsampled_dropped:
+            data[UNSAMPLED_DROPPED] = self.unsampled_dropped
+        if self.dropped_entries or self.truncated_values:
+            data[LOG_OVERFLOW] = self._overflow()
+        if self.triggered_rules:
+            data[TRIGGERED_RULES] = list(self.triggered_rules)
+        for name, section in self.sections.items():
+            data[name] = self._section_to_dict(section)
+        return data
+
+    def _overflow(self) -> dict:
+        return {
+            "dropped_entries": self.dropped_entries,
+            "truncated_values": self.truncated_values,
+        }
+
+    @staticmethod
+    def _section_to_dict(section) -> Any:
+        if isinstance(section, LogEntry):
+            return section.to_dict()
+        return {
+            key: entry.to_dict() if isinstance(entry, LogEntry) else entry
+            for key, entry in section.items()
+        }
@@ -1,8 +1,12 @@
 import abc
+import asyncio
 from abc import ABC
 
 
 class BaseNotifier(ABC):
+    # Set from the "route" key of the notifier config, see Route
+    route = None
+
     @abc.abstractmethod
     def notify(self, message: str, data: dict):
         pass
@@ -10,3 +14,11 @@ class BaseNotifier(ABC):
     @abc.abstractmethod
     def set_config(self, config: dict):
         pass
+
+    async def anotify(self, message: str, data: dict):
+        """
+        Async counterpart of notify.
+        The default runs notify in a worker thread so blocking I/O does not stall
+        the event loop; notifiers with a native async client can override it.
+        """
+        return await asyncio.to_thread(self.notify, message, data)
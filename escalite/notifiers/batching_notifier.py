@@ -0,0 +1,167 @@
+import atexit
+import logging
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.notifier_wrapper import NotifierWrapper
+from escalite.utils.constants import (
+    ALERT_ID,
+    API_LOGS,
+    ERROR_LOGS,
+    LOG_LEVELS,
+    SERVICE_LOGS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Flushed at exit; weak, so notifiers that were replaced can be collected
+_instances = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for notifier in list(_instances):
+        try:
+            notifier.flush()
+        except Exception:
+            logger.exception("Flushing %r at exit failed.", notifier)
+
+
+class BatchingNotifier(NotifierWrapper):
+    """
+    Coalesces escalations into a single digest message.
+
+    Escalations are collected until ``max_size`` of them are pending or
+    ``window`` seconds have passed since the first one, then the wrapped
+    notifier is called once with a summary of all of them. A batch holding a
+    single escalation is delivered unchanged.
+
+    notify() returns a Future for each escalation that completes once its
+    batch has been delivered, so the fan-out reports it as pending until
+    then (see NotifierResult.pending).
+
+    Enabled with the "batch" key of a notifier config, e.g.
+    ``{"batch": {"window": 60, "max_size": 50}}``.
+    """
+
+    def __init__(self, notifier: BaseNotifier, window: float = 60, max_size: int = 50):
+        super().__init__(notifier)
+        if window <= 0:
+            raise ValueError("window must be greater than 0")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.window = window
+        self.max_size = max_size
+        self._pending = []
+        self._lock = threading.Lock()
+        self._timer = None
+        _instances.add(self)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def notify(self, message: str, data: dict) -> Future:
+        delivered = Future()
+        batch = None
+        with self._lock:
+            self._pending.append((message, data, delivered))
+            if len(self._pending) >= self.max_size:
+                batch = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._send(batch)
+        return delivered
+
+    def flush(self):
+        """
+        Delivers pending escalations right away.
+        """
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._send(batch)
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to deliver escalation digest.")
+
+    def _take_pending(self) -> List[Tuple[str, dict, Future]]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _send(self, batch: List[Tuple[str, dict, Future]]):
+        futures = [delivered for _, _, delivered in batch]
+        if len(batch) == 1:
+            message, data, _ = batch[0]
+        else:
+            message, data = self.build_digest(
+                [(message, data) for message, data, _ in batch]
+            )
+        try:
+            outcome = self.notifier.notify(message=message, data=data)
+        except Exception as e:
+            for delivered in futures:
+                delivered.set_exception(e)
+            raise
+        if isinstance(outcome, Future):
+            # the wrapped notifier handed the digest on in turn
+            outcome.add_done_callback(
+                lambda done: self._complete(futures, done.exception())
+            )
+        else:
+            self._complete(futures, None)
+
+    @staticmethod
+    def _complete(futures: List[Future], error: Optional[BaseException]):
+        for delivered in futures:
+            if error is None:
+                delivered.set_result(None)
+            else:
+                delivered.set_exception(error)
+
+    @staticmethod
+    def build_digest(batch: List[Tuple[str, dict]]) -> Tuple[str, dict]:
+        """
+        Builds the digest message and a summary table keyed by alert id.
+        """
+        message = f"Escalite digest: {len(batch)} escalations"
+        digest = {"subject": message}
+        for index, (entry_message, data) in enumerate(batch):
+            data = data or {}
+            alert_id = data.get(ALERT_ID) or f"escalation-{index + 1}"
+            digest[alert_id] = BatchingNotifier.summarize(entry_message, data)
+        return message, digest
+
+    @staticmethod
+    def summarize(message: str, data: dict) -> dict:
+        """
+        Returns the level, services and errors of one escalation.
+        """
+        services = data.get(SERVICE_LOGS) or {}
+        errors = []
+        for tag in (API_LOGS, SERVICE_LOGS, ERROR_LOGS):
+            for key, entry in (data.get(tag) or {}).items():
+                if not isinstance(entry, dict):
+                    continue
+                level = entry.get("log_level", "info")
+                if LOG_LEVELS.get(level, 0) >= LOG_LEVELS["error"]:
+                    detail = entry.get("error_trace") or entry.get("message")
+                    errors.append(f"{key}: {detail}" if detail else key)
+        return {
+            "message": message,
+            "level": data.get("log_level", "info"),
+            "services": ", ".join(k for k in services if k != "log_level"),
+            "errors": "; ".join(errors),
+        }
@@ -1,16 +1,16 @@
-import smtplib
-import ssl
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 from escalite.formatters.base_formatter import Formatter
-from escalite.formatters.dict_table_formatter import DictTableFormatter
+from escalite.formatters.dict_table_formatter import default_table_formatter
+from escalite.formatters.render_cache import render
 from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.smtp_pool import SMTPConnectionPool
 
 
 class EmailNotifier(BaseNotifier):
     def __init__(
-        self, config: dict = None, formatter: Formatter = DictTableFormatter()
+        self, config: dict = None, formatter: Formatter = default_table_formatter
     ):
         self.config = config
         self.formatter = formatter
@@ -34,18 +34,14 @@ class EmailNotifier(BaseNotifier):
         if not self.config:
             raise ValueError("EmailNotifier config not set. Call set_config first.")
 
-        smtp_server = self.config.get("smtp_server")
-        smtp_port = self.config.get("smtp_port", 587)
         sender_email = self.config.get("sender_email")
-        sender_password = self.config.get("sender_password")
         recipient_emails = self.config.get("recipient_emails")
-        use_tls = self.config.get("use_tls", True)
 
         if isinstance(recipient_emails, str):
             recipient_emails = [recipient_emails]
 
         subject = data.get("subject", "Notification")
-        body = message + ("\n\n" + self.formatter.format(data) if data else "")
+        body = message + ("\n\n" + render(self.formatter, data) if data else "")
 
         msg = MIMEMultipart()
         msg["From"] = sender_email
@@ -53,9 +49,6 @@ class EmailNotifier(BaseNotifier):
         msg["Subject"] = subject
         msg.attach(MIMEText(body, "plain"))
 
-        context = ssl.create_default_context()
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            if use_tls:
-                server.starttls(context=context)
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, recipient_emails, msg.as_string())
+        SMTPConnectionPool.for_config(self.config).sendmail(
+            sender_email, recipient_emails, msg.as_string()
+        )
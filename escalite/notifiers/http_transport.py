@@ -0,0 +1,89 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HttpTransport:
+    """
+    Pooled keep-alive HTTP client used by the webhook based notifiers.
+
+    Notifiers with the same transport settings share one requests.Session, so
+    repeated alerts reuse open connections instead of paying a TCP and TLS
+    handshake each time. The settings are read from the notifier config:
+        - pool_size: connections kept per host (default 10)
+        - max_retries: retries for failed connection attempts (default 0)
+        - retry_backoff: backoff factor between those retries (default 0)
+        - connect_timeout: seconds to establish a connection (default 3.05)
+        - read_timeout: seconds to wait for a response (default 10)
+    """
+
+    DEFAULT_POOL_SIZE = 10
+    DEFAULT_CONNECT_TIMEOUT = 3.05
+    DEFAULT_READ_TIMEOUT = 10
+
+    _transports = {}
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = 0,
+        retry_backoff: float = 0,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        # Only connection errors are retried here: urllib3 does not retry
+        # reads or statuses for POST, so a request is never sent twice.
+        retry = Retry(total=max_retries, backoff_factor=retry_backoff)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @staticmethod
+    def settings_from_config(config: dict) -> tuple:
+        config = config or {}
+        return (
+            config.get("pool_size", HttpTransport.DEFAULT_POOL_SIZE),
+            config.get("max_retries", 0),
+            config.get("retry_backoff", 0),
+            config.get("connect_timeout", HttpTransport.DEFAULT_CONNECT_TIMEOUT),
+            config.get("read_timeout", HttpTransport.DEFAULT_READ_TIMEOUT),
+        )
+
+    @classmethod
+    def for_config(cls, config: dict) -> "HttpTransport":
+        """
+        Returns the shared transport for the settings in the notifier config.
+        """
+        settings = cls.settings_from_config(config)
+        transport = cls._transports.get(settings)
+        if transport is None:
+            with cls._lock:
+                transport = cls._transports.get(settings)
+                if transport is None:
+                    transport = cls(*settings)
+                    cls._transports[settings] = transport
+        return transport
+
+    @classmethod
+    def close_all(cls):
+        """
+        Closes every shared transport and their pooled connections.
+        """
+        with cls._lock:
+            transports, cls._transports = cls._transports, {}
+        for transport in transports.values():
+            transport.close()
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def close(self):
+        self.session.close()
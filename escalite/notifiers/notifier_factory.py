@@ -1,13 +1,36 @@
-from typing import List
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
 
+from escalite.formatters.base_formatter import Formatter
+from escalite.formatters.dict_table_formatter import default_table_formatter
+from escalite.formatters.json_formatter import JsonFormatter
 from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.batching_notifier import BatchingNotifier
 from escalite.notifiers.email_notifier import EmailNotifier
+from escalite.notifiers.notify_result import NotifierResult, NotifyResult
+from escalite.notifiers.rate_limiter import RateLimitedNotifier
+from escalite.notifiers.retry_policy import RetryingNotifier
+from escalite.notifiers.routing import Route
 from escalite.notifiers.slack_notifier import SlackNotifier
 from escalite.notifiers.telegram_notifier import TelegramNotifier
 from escalite.notifiers.whatsapp_notifier import WhatsAppNotifier
+from escalite.utils.background import mark_background
+
+logger = logging.getLogger(__name__)
 
 
 class NotifierFactory:
+    # Size of the thread pool shared by every parallel fan-out
+    MAX_WORKERS = 8
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
     NOTIFIER_MAP = {
         "slack": SlackNotifier,
         "telegram": TelegramNotifier,
@@ -15,6 +38,12 @@ class NotifierFactory:
         "email": EmailNotifier,
     }
 
+    # Shared instances, so notifiers using the same formatter share its renders
+    FORMATTER_MAP = {
+        "table": default_table_formatter,
+        "json": JsonFormatter(),
+    }
+
     @staticmethod
     def create_notifiers(config: dict):
         notifiers = []
@@ -24,13 +53,239 @@ class NotifierFactory:
             notifier_cls = NotifierFactory.NOTIFIER_MAP.get(notifier_type)
             if notifier_cls is None:
                 raise ValueError(f"Unknown notifier type: {notifier_type}")
-            notifiers.append(notifier_cls(config=notifier_conf))
+            notifier = notifier_cls(config=notifier_conf)
+            formatter = notifier_conf.get("formatter")
+            if formatter:
+                if formatter not in NotifierFactory.FORMATTER_MAP:
+                    raise ValueError(f"Unknown formatter: {formatter}")
+                notifier.formatter = NotifierFactory.FORMATTER_MAP[formatter]
+            notifier = NotifierFactory.wrap_notifier(notifier)
+            if notifier_conf.get("route"):
+                notifier.route = Route.from_config(notifier_conf["route"])
+            notifiers.append(notifier)
         return notifiers
 
     @staticmethod
-    def notify(notifiers: List[BaseNotifier], message: str, data: dict):
-        for notifier in notifiers:
-            notifier.notify(message=message, data=data)
+    def wrap_notifier(notifier: BaseNotifier) -> BaseNotifier:
+        """
+        Wraps a notifier with the delivery stages enabled in its config:
+            - "rate_limit": token bucket per channel, see RateLimitedNotifier
+            - "retry": retry failed deliveries, see RetryingNotifier
+            - "batch": coalesce escalations into digests, see BatchingNotifier
+        """
+        config = notifier.config or {}
+        if config.get("rate_limit"):
+            notifier = RateLimitedNotifier(notifier, **config["rate_limit"])
+        if config.get("retry"):
+            notifier = RetryingNotifier.from_config(notifier, config["retry"])
+        if config.get("batch"):
+            notifier = BatchingNotifier(notifier, **config["batch"])
+        return notifier
+
+    @staticmethod
+    def route(notifiers: List[BaseNotifier], data: dict) -> List[BaseNotifier]:
+        """
+        Returns the notifiers whose route (the "route" key of their config,
+        see Route) accepts the escalation; notifiers without one get all.
+        """
+        routed = None
+        for index, notifier in enumerate(notifiers):
+            route = getattr(notifier, "route", None)
+            if isinstance(route, Route) and not route.matches(data):
+                if routed is None:
+                    routed = list(notifiers[:index])
+            elif routed is not None:
+                routed.append(notifier)
+        return notifiers if routed is None else routed
+
+    @staticmethod
+    def notify(
+        notifiers: List[BaseNotifier],
+        message: str,
+        data: dict,
+        parallel: bool = False,
+        timeout: float = None,
+    ) -> Optional[NotifyResult]:
+        """
+        Notifies all notifiers one after the other, stopping at the first error.
+        Returns None once all of them delivered, or a NotifyResult when a
+        notifier handed its delivery on (e.g. to retries in the background),
+        see NotifyResult.when_done.
+        With parallel=True the notifiers run concurrently instead, see notify_parallel.
+        Notifiers whose route does not accept the escalation are skipped.
+        """
+        notifiers = NotifierFactory.route(notifiers, data)
+        if parallel:
+            return NotifierFactory.notify_parallel(notifiers, message, data, timeout)
+        results = None
+        for index, notifier in enumerate(notifiers):
+            started = time.perf_counter()
+            outcome = notifier.notify(message=message, data=data)
+            if results is None and not isinstance(outcome, Future):
+                continue
+            if results is None:
+                # only built once a delivery was handed on
+                results = [
+                    NotifierResult(delivered, True, 0.0)
+                    for delivered in notifiers[:index]
+                ]
+            results.append(
+                NotifierResult.from_outcome(
+                    notifier, outcome, time.perf_counter() - started
+                )
+            )
+        return None if results is None else NotifyResult(results)
+
+    @staticmethod
+    def notify_parallel(
+        notifiers: List[BaseNotifier],
+        message: str,
+        data: dict,
+        timeout: float = None,
+    ) -> NotifyResult:
+        """
+        Notifies all notifiers concurrently on the shared thread pool.
+
+        A failing or slow notifier does not affect the others: its error is
+        recorded in the returned result instead of being raised. ``timeout`` is
+        the default per-notifier deadline in seconds and can be overridden with
+        the ``notify_timeout`` key of a notifier's config. A notifier that
+        misses its deadline is reported as failed while its call finishes in
+        the background. A notifier that handed its delivery on, e.g. to
+        retries in the background, is reported as pending, see
+        NotifyResult.when_done.
+        """
+        executor = NotifierFactory._get_executor()
+        started = time.perf_counter()
+        futures = [
+            executor.submit(NotifierFactory._timed_notify, notifier, message, data)
+            for notifier in notifiers
+        ]
+
+        results = []
+        for notifier, future in zip(notifiers, futures):
+            notifier_timeout = NotifierFactory._notifier_timeout(notifier, timeout)
+            remaining = (
+                None
+                if notifier_timeout is None
+                else max(0.0, started + notifier_timeout - time.perf_counter())
+            )
+            try:
+                results.append(future.result(timeout=remaining))
+            except concurrent.futures.TimeoutError:
+                error = TimeoutError(
+                    f"{type(notifier).__name__} did not finish within {notifier_timeout}s"
+                )
+                results.append(
+                    NotifierResult(
+                        notifier, False, time.perf_counter() - started, error
+                    )
+                )
+
+        for result in results:
+            if not result.success and result.pending is None:
+                logger.warning(
+                    "Notifier %s failed: %r",
+                    type(result.notifier).__name__,
+                    result.error,
+                )
+        return NotifyResult(results)
+
+    @staticmethod
+    def _timed_notify(notifier: BaseNotifier, message: str, data: dict):
+        started = time.perf_counter()
+        try:
+            outcome = notifier.notify(message=message, data=data)
+        except Exception as e:
+            return NotifierResult(notifier, False, time.perf_counter() - started, e)
+        return NotifierResult.from_outcome(
+            notifier, outcome, time.perf_counter() - started
+        )
+
+    @staticmethod
+    def _notifier_timeout(notifier: BaseNotifier, default: Optional[float]):
+        config = getattr(notifier, "config", None)
+        if isinstance(config, dict) and config.get("notify_timeout") is not None:
+            return config["notify_timeout"]
+        return default
+
+    @staticmethod
+    def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+        if NotifierFactory._executor is None:
+            with NotifierFactory._executor_lock:
+                if NotifierFactory._executor is None:
+                    NotifierFactory._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=NotifierFactory.MAX_WORKERS,
+                        thread_name_prefix="escalite-notify",
+                        # fan-out threads deliver off the request path, so
+                        # retries run in place instead of being handed on
+                        # again; the request still waits on them, so nothing
+                        # waits there for a rate limit
+                        initializer=mark_background,
+                        initargs=(True,),
+                    )
+        return NotifierFactory._executor
+
+    @staticmethod
+    async def anotify(
+        notifiers: List[BaseNotifier],
+        message: str,
+        data: dict,
+        timeout: float = None,
+    ) -> Optional[NotifyResult]:
+        """
+        Notifies all notifiers concurrently on the running event loop.
+        Like notify_parallel, a failing or slow notifier does not affect the
+        others: its error is recorded in the result instead of being raised,
+        and ``timeout`` (or a notifier's ``notify_timeout``) bounds how long
+        each notifier may take. Like notify, returns a NotifyResult only when
+        a notifier handed its delivery on or did not deliver.
+        """
+        notifiers = NotifierFactory.route(notifiers, data)
+        results = await asyncio.gather(
+            *(
+                NotifierFactory._anotify_one(
+                    notifier,
+                    message,
+                    data,
+                    NotifierFactory._notifier_timeout(notifier, timeout),
+                )
+                for notifier in notifiers
+            )
+        )
+        if all(result.success for result in results):
+            return None
+        for result in results:
+            if not result.success and result.pending is None:
+                logger.warning(
+                    "Notifier %s failed: %r",
+                    type(result.notifier).__name__,
+                    result.error,
+                )
+        return NotifyResult(list(results))
+
+    @staticmethod
+    async def _anotify_one(
+        notifier: BaseNotifier, message: str, data: dict, timeout: Optional[float]
+    ) -> NotifierResult:
+        started = time.perf_counter()
+        anotify = getattr(notifier, "anotify", None)
+        try:
+            if anotify is not None:
+                call = anotify(message=message, data=data)
+            else:
+                call = asyncio.to_thread(notifier.notify, message=message, data=data)
+            outcome = await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            error = TimeoutError(
+                f"{type(notifier).__name__} did not finish within {timeout}s"
+            )
+            return NotifierResult(notifier, False, time.perf_counter() - started, error)
+        except Exception as e:
+            return NotifierResult(notifier, False, time.perf_counter() - started, e)
+        return NotifierResult.from_outcome(
+            notifier, outcome, time.perf_counter() - started
+        )
 
     @staticmethod
     def add_notifier_map(notifier_type: str, notifier_cls: type):
@@ -39,3 +294,9 @@ class NotifierFactory:
                 f"Notifier class {notifier_cls} must inherit from BaseNotifier"
             )
         NotifierFactory.NOTIFIER_MAP[notifier_type] = notifier_cls
+
+    @staticmethod
+    def add_formatter_map(name: str, formatter: Formatter):
+        if not isinstance(formatter, Formatter):
+            raise ValueError(f"Formatter {formatter} must inherit from Formatter")
+        NotifierFactory.FORMATTER_MAP[name] = formatter
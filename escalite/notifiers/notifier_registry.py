@@ -0,0 +1,76 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import List
+
+from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.notifier_factory import NotifierFactory
+
+
+class NotifierRegistry:
+    """
+    Caches notifiers built by NotifierFactory.create_notifiers, keyed by a
+    stable hash of the configuration, so the same instances (and their
+    connections) are reused across requests.
+
+    Passing the same configs object again skips hashing entirely. If a configs
+    dict is modified in place, call reload() to rebuild its notifiers.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # (configs object, key) of the last lookup, for the identity fast path.
+        # Holding a reference keeps the id of the object from being reused.
+        self._last = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def config_key(configs: dict) -> str:
+        """
+        Returns a hash of the configuration that does not depend on key order.
+        """
+        encoded = json.dumps(configs, sort_keys=True, default=repr)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get_notifiers(self, configs: dict) -> List[BaseNotifier]:
+        last = self._last
+        if last is not None and last[0] is configs:
+            notifiers = self._entries.get(last[1])
+            if notifiers is not None:
+                return notifiers
+
+        key = self.config_key(configs)
+        with self._lock:
+            notifiers = self._entries.get(key)
+            if notifiers is None:
+                notifiers = NotifierFactory.create_notifiers(configs)
+                self._entries[key] = notifiers
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            self._last = (configs, key)
+        return notifiers
+
+    def invalidate(self, configs: dict = None):
+        """
+        Drops the cached notifiers for the given configuration, or all of them.
+        """
+        with self._lock:
+            if configs is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.config_key(configs), None)
+            self._last = None
+
+    def reload(self, configs: dict) -> List[BaseNotifier]:
+        """
+        Rebuilds the notifiers for the given configuration.
+        """
+        self.invalidate(configs)
+        return self.get_notifiers(configs)
+
+    def __len__(self):
+        return len(self._entries)
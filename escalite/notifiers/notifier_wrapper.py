@@ -0,0 +1,39 @@
+from escalite.notifiers.base_notifier import BaseNotifier
+
+
+class NotifierWrapper(BaseNotifier):
+    """
+    Base class for notifiers that add behaviour in front of another notifier.
+    The wrapped notifier's config and formatter are exposed as the wrapper's own.
+    """
+
+    def __init__(self, notifier: BaseNotifier):
+        self.notifier = notifier
+
+    @property
+    def config(self):
+        return self.notifier.config
+
+    @property
+    def formatter(self):
+        return self.notifier.formatter
+
+    def set_config(self, config: dict):
+        self.notifier.set_config(config)
+
+    def notify(self, message: str, data: dict):
+        # Delivery stages may return a Future for a delivery they handed on,
+        # see NotifierResult.from_outcome
+        return self.notifier.notify(message=message, data=data)
+
+    def unwrap(self) -> BaseNotifier:
+        """
+        Returns the innermost notifier.
+        """
+        notifier = self.notifier
+        while isinstance(notifier, NotifierWrapper):
+            notifier = notifier.notifier
+        return notifier
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.notifier!r})"
@@ -0,0 +1,134 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from escalite.notifiers.base_notifier import BaseNotifier
+
+
+def _future_error(future: Future) -> Optional[BaseException]:
+    if future.cancelled():
+        return RuntimeError("Delivery was cancelled")
+    return future.exception()
+
+
+class NotifierResult:
+    """
+    Outcome of delivering one escalation through one notifier.
+    """
+
+    def __init__(
+        self,
+        notifier: BaseNotifier,
+        success: bool,
+        latency: float,
+        error: Optional[BaseException] = None,
+        pending: Optional[Future] = None,
+    ):
+        self.notifier = notifier
+        self.success = success
+        self.latency = latency
+        self.error = error
+        # A delivery the notifier handed on, e.g. retries scheduled in the
+        # background; it completes (or fails) later
+        self.pending = pending
+
+    @classmethod
+    def from_outcome(
+        cls, notifier: BaseNotifier, outcome: Any, latency: float
+    ) -> "NotifierResult":
+        """
+        Returns the result of a notify() call that returned ``outcome``:
+        a Future when the delivery was handed on, None when it was delivered.
+        """
+        if not isinstance(outcome, Future):
+            return cls(notifier, True, latency)
+        if not outcome.done():
+            return cls(notifier, False, latency, pending=outcome)
+        error = _future_error(outcome)
+        return cls(notifier, error is None, latency, error)
+
+    def __repr__(self):
+        if self.pending is not None:
+            status = "pending"
+        else:
+            status = "ok" if self.success else f"failed: {self.error!r}"
+        return (
+            f"NotifierResult({type(self.notifier).__name__}, {status}, "
+            f"latency={self.latency:.3f}s)"
+        )
+
+
+class NotifyResult:
+    """
+    Per-notifier outcomes of a fan-out, in the order the notifiers were given.
+    """
+
+    def __init__(self, results: List[NotifierResult]):
+        self.results = results
+
+    @property
+    def ok(self) -> bool:
+        """
+        True if every notifier delivered; pending deliveries are not ok yet.
+        """
+        return all(result.success for result in self.results)
+
+    @property
+    def succeeded(self) -> List[NotifierResult]:
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self) -> List[NotifierResult]:
+        return [
+            result
+            for result in self.results
+            if not result.success and result.pending is None
+        ]
+
+    @property
+    def pending(self) -> List[NotifierResult]:
+        return [result for result in self.results if result.pending is not None]
+
+    def when_done(self, callback: Callable[[bool, Optional[BaseException]], None]):
+        """
+        Calls ``callback`` with whether every notifier delivered and the first
+        error if not, once the pending deliveries have completed. Without
+        pending deliveries it is called right away.
+        """
+        pending = [result.pending for result in self.pending]
+        if not pending:
+            callback(*self._outcome())
+            return
+        remaining = [len(pending)]
+        lock = threading.Lock()
+
+        def on_completed(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            callback(*self._outcome())
+
+        for future in pending:
+            future.add_done_callback(on_completed)
+
+    def _outcome(self) -> Tuple[bool, Optional[BaseException]]:
+        for result in self.results:
+            if result.pending is not None:
+                error = _future_error(result.pending)
+            elif not result.success:
+                error = result.error
+            else:
+                continue
+            if error is not None:
+                return False, error
+        return True, None
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __repr__(self):
+        return f"NotifyResult({self.results!r})"
@@ -0,0 +1,227 @@
+import concurrent.futures
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.notifier_wrapper import NotifierWrapper
+from escalite.utils.background import mark_background, may_wait
+
+logger = logging.getLogger(__name__)
+
+QUEUE = "queue"
+DROP = "drop"
+RATE_LIMIT_MODES = (QUEUE, DROP)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Returns the delay requested by a 429/503 response's Retry-After header,
+    or None if the error carries no such header.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimitExceeded(RuntimeError):
+    """
+    An escalation was dropped because its notifier's rate limit was reached.
+    """
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing ``rate`` acquisitions per second on
+    average, with bursts of up to ``burst`` acquisitions.
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, int(rate))
+        if self.capacity < 1:
+            raise ValueError("burst must be at least 1")
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Takes a token, waiting up to ``timeout`` seconds for one (forever if None).
+        Returns False if no token became available in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        Hands out no tokens for the given number of seconds.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+
+class RateLimitedNotifier(NotifierWrapper):
+    """
+    Keeps a notifier within its provider's rate limit.
+
+    Every delivery takes a token from a TokenBucket. When the bucket is empty
+    the "queue" mode waits for a token (up to ``max_wait`` seconds) while the
+    "drop" mode discards the escalation right away; both count what they
+    dropped in ``metrics``. A dropped escalation is not raised, so the other
+    notifiers are still called, but notify() returns a Future failed with
+    RateLimitExceeded so the fan-out reports it as not delivered. A 429
+    response pauses the bucket for the Retry-After delay and, in "queue"
+    mode, the delivery is tried once more.
+
+    Waiting only happens on background threads no request waits on, e.g.
+    the dispatcher's workers. Elsewhere the delivery is handed to a shared
+    background pool and notify() returns its Future, so the fan-out reports
+    it as pending (see NotifierResult.pending).
+
+    Enabled with the "rate_limit" key of a notifier config, e.g.
+    ``{"rate_limit": {"rate": 1, "burst": 5, "mode": "queue", "max_wait": 30}}``.
+    """
+
+    DEFAULT_RETRY_AFTER = 1.0
+    MAX_WORKERS = 4
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(
+        self,
+        notifier: BaseNotifier,
+        rate: float,
+        burst: int = None,
+        mode: str = QUEUE,
+        max_wait: float = 30,
+    ):
+        super().__init__(notifier)
+        if mode not in RATE_LIMIT_MODES:
+            raise ValueError(
+                f"Unknown rate limit mode: {mode}. "
+                f"Expected one of: {', '.join(RATE_LIMIT_MODES)}"
+            )
+        self.bucket = TokenBucket(rate, burst)
+        self.mode = mode
+        self.max_wait = max_wait
+        self.metrics = {"sent": 0, "dropped": 0, "waited": 0, "throttled": 0}
+        self._metrics_lock = threading.Lock()
+
+    def notify(self, message: str, data: dict):
+        if not self.bucket.acquire(timeout=0):
+            if self.mode == QUEUE and not may_wait():
+                return self._hand_on(message, data)
+            if not self._wait():
+                dropped = Future()
+                dropped.set_exception(self._exceeded())
+                return dropped
+        return self._send(message, data)
+
+    def _send(self, message: str, data: dict):
+        # called once a token was taken
+        try:
+            outcome = self.notifier.notify(message=message, data=data)
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            delay = retry_after_seconds(e)
+            self.bucket.pause(self.DEFAULT_RETRY_AFTER if delay is None else delay)
+            self._count("throttled")
+            if self.mode == DROP:
+                raise
+            if not may_wait():
+                return self._hand_on(message, data)
+            if not self._wait():
+                raise
+            outcome = self.notifier.notify(message=message, data=data)
+        self._count("sent")
+        return outcome
+
+    def _hand_on(self, message: str, data: dict) -> Future:
+        # Waiting would hold up the caller, so the delivery waits in the pool
+        return self._get_executor().submit(self._deliver_when_allowed, message, data)
+
+    def _deliver_when_allowed(self, message: str, data: dict):
+        if not self._wait():
+            raise self._exceeded()
+        outcome = self._send(message, data)
+        if isinstance(outcome, Future):
+            outcome.result()
+
+    def _exceeded(self) -> RateLimitExceeded:
+        return RateLimitExceeded(
+            f"Rate limit reached for {type(self.unwrap()).__name__}"
+        )
+
+    def _wait(self) -> bool:
+        # Returns whether a token was taken; "drop" mode does not wait
+        if self.mode == QUEUE:
+            self._count("waited")
+            if self.bucket.acquire(timeout=self.max_wait):
+                return True
+        self._count("dropped")
+        logger.warning(
+            "Rate limit reached for %s, escalation dropped.",
+            type(self.unwrap()).__name__,
+        )
+        return False
+
+    def _count(self, metric: str):
+        with self._metrics_lock:
+            self.metrics[metric] += 1
+
+    @classmethod
+    def _get_executor(cls) -> concurrent.futures.ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=cls.MAX_WORKERS,
+                        thread_name_prefix="escalite-rate-limit",
+                        initializer=mark_background,
+                    )
+        return cls._executor
@@ -0,0 +1,164 @@
+import concurrent.futures
+import logging
+import random
+import smtplib
+import threading
+import time
+from typing import Callable, Iterable, Optional, Tuple, Type
+
+from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.notifier_wrapper import NotifierWrapper
+from escalite.notifiers.rate_limiter import retry_after_seconds
+from escalite.utils.background import in_background, mark_background
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+# requests' connection errors and timeouts, socket errors and dropped SMTP
+# connections are all OSErrors
+RETRYABLE_EXCEPTIONS = (OSError, TimeoutError)
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed delivery is tried again.
+
+    The delay before retry ``n`` grows as ``backoff_base * 2 ** (n - 1)``,
+    capped at ``backoff_cap`` seconds. With jitter the delay is drawn uniformly
+    between 0 and that value, so retries from many processes spread out. A
+    Retry-After header asks for at least its delay.
+
+    HTTP errors are retried when their status code is in ``retry_on_status``,
+    SMTP errors when the server answered with a temporary (4xx) code, and any
+    other error when it is an instance of ``retry_on_exceptions``.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30,
+        jitter: bool = True,
+        retry_on_status: Iterable[int] = RETRYABLE_STATUS_CODES,
+        retry_on_exceptions: Tuple[Type[BaseException], ...] = RETRYABLE_EXCEPTIONS,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retry_on_status = frozenset(retry_on_status)
+        self.retry_on_exceptions = tuple(retry_on_exceptions)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if status is not None:
+            return status in self.retry_on_status
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return False
+        return isinstance(error, self.retry_on_exceptions)
+
+    def delay(self, attempt: int, error: BaseException = None) -> float:
+        """
+        Returns the seconds to wait after the given failed attempt (1-based).
+        """
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_cap))
+        return delay
+
+    def call(self, func: Callable, *args, first_attempt: int = 1, **kwargs):
+        """
+        Calls func until it succeeds, fails with a non-retryable error or runs
+        out of attempts; the last error is raised.
+        ``first_attempt`` continues counting from attempts made elsewhere.
+        """
+        attempt = first_attempt
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e):
+                    raise
+                time.sleep(self.delay(attempt, e))
+                attempt += 1
+
+
+class RetryingNotifier(NotifierWrapper):
+    """
+    Retries failed deliveries of a notifier according to a RetryPolicy.
+
+    On a background delivery thread (see BackgroundDispatcher) all attempts
+    run in place. Anywhere else only the first attempt runs on the caller's
+    thread; if it fails with a retryable error, the remaining attempts are
+    handed to a shared background pool so the caller is not slowed down,
+    and notify() returns the Future of the retries. The fan-out reports
+    such a delivery as pending (see NotifierResult.pending) until the
+    retries have delivered it or failed.
+
+    Enabled with the "retry" key of a notifier config, e.g.
+    ``{"retry": {"max_attempts": 5, "backoff_base": 1, "backoff_cap": 60}}``.
+    """
+
+    MAX_WORKERS = 4
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, notifier: BaseNotifier, policy: RetryPolicy = None):
+        super().__init__(notifier)
+        self.policy = policy or RetryPolicy()
+
+    @classmethod
+    def from_config(cls, notifier: BaseNotifier, config: dict) -> "RetryingNotifier":
+        return cls(notifier, RetryPolicy(**config))
+
+    def notify(self, message: str, data: dict) -> Optional[concurrent.futures.Future]:
+        if in_background():
+            return self.policy.call(self.notifier.notify, message=message, data=data)
+        try:
+            return self.notifier.notify(message=message, data=data)
+        except Exception as e:
+            if self.policy.max_attempts < 2 or not self.policy.is_retryable(e):
+                raise
+            logger.warning(
+                "Delivery through %s failed (%r), retrying in the background.",
+                type(self.unwrap()).__name__,
+                e,
+            )
+            return self._get_executor().submit(
+                self._retry_in_background, message, data, self.policy.delay(1, e)
+            )
+
+    def _retry_in_background(self, message: str, data: dict, delay: float):
+        time.sleep(delay)
+        try:
+            outcome = self.policy.call(
+                self.notifier.notify, message=message, data=data, first_attempt=2
+            )
+            if isinstance(outcome, concurrent.futures.Future):
+                outcome.result()
+        except Exception:
+            logger.exception(
+                "Delivery through %s failed after retrying.",
+                type(self.unwrap()).__name__,
+            )
+            raise
+
+    @classmethod
+    def _get_executor(cls) -> concurrent.futures.ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=cls.MAX_WORKERS,
+                        thread_name_prefix="escalite-retry",
+                        initializer=mark_background,
+                    )
+        return cls._executor
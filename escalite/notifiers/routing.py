@@ -0,0 +1,133 @@
+from datetime import datetime, tzinfo
+from typing import Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from escalite.utils.constants import (
+    AGGREGATE_ALERTS,
+    ESCALATION_LEVEL,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    SERVICE_LOGS,
+)
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def parse_hours(hours: str) -> Tuple[int, int]:
+    """
+    Parses "HH:MM-HH:MM" into minutes since midnight. The end is exclusive
+    and may be before the start for a range over midnight.
+    """
+    try:
+        start, end = (_minutes(part) for part in hours.split("-"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid hours: {hours!r}, expected HH:MM-HH:MM") from None
+    return start, end
+
+
+def _minutes(value: str) -> int:
+    hour, minute = value.strip().split(":")
+    hour, minute = int(hour), int(minute)
+    if not (0 <= hour <= 24 and 0 <= minute < 60) or hour * 60 + minute > 1440:
+        raise ValueError(value)
+    return hour * 60 + minute
+
+
+class Route:
+    """
+    Decides which escalations a notifier receives.
+
+    Set with the "route" key of a notifier config, e.g.
+    {"min_level": "critical", "services": ["payments"], "hours": "09:00-18:00"}.
+    All the given conditions must hold:
+        - "min_level": the escalation is at this level or above
+        - "tags": one of these tags has an entry (at min_level or above,
+          when given)
+        - "services": one of these services has an entry in the service
+          logs (at min_level or above, when given), or an aggregate alert
+        - "hours" and "days" (e.g. ["mon", "fri"]): the time of the
+          escalation, in "timezone" (a zoneinfo name) or local time
+    The escalation's level is its "escalation_level" when escalation rules
+    or an aggregate policy raised it, and otherwise its "log_level".
+    """
+
+    def __init__(
+        self,
+        min_level: LOG_LEVEL = None,
+        tags: Iterable[str] = None,
+        services: Iterable[str] = None,
+        hours: str = None,
+        days: Iterable[str] = None,
+        timezone: str = None,
+    ):
+        if min_level is not None and min_level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {min_level}")
+        self.min_level = min_level
+        self.tags = frozenset(tags) if tags is not None else None
+        self.services = frozenset(services) if services is not None else None
+        self.hours = parse_hours(hours) if hours is not None else None
+        self.days = None
+        if days is not None:
+            unknown = [day for day in days if day not in DAYS]
+            if unknown:
+                raise ValueError(f"Unknown days: {', '.join(unknown)}")
+            self.days = frozenset(DAYS.index(day) for day in days)
+        self.timezone: Optional[tzinfo] = None
+        if timezone is not None:
+            self.timezone = ZoneInfo(timezone)
+        self._level = LOG_LEVELS[min_level] if min_level is not None else None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Route":
+        return cls(**config)
+
+    def matches(self, data: dict, now: datetime = None) -> bool:
+        level = self._level
+        if level is not None:
+            escalation_level = data.get(ESCALATION_LEVEL) or data.get("log_level")
+            if LOG_LEVELS.get(escalation_level, 0) < level:
+                return False
+        if self.tags is not None and not any(
+            self._has_entry(data.get(tag)) for tag in self.tags
+        ):
+            return False
+        if self.services is not None and not self._matches_services(data):
+            return False
+        if self.hours is not None or self.days is not None:
+            if now is None:
+                now = datetime.now(self.timezone)
+            if self.days is not None and now.weekday() not in self.days:
+                return False
+            if self.hours is not None:
+                start, end = self.hours
+                minute = now.hour * 60 + now.minute
+                if start <= end:
+                    if not start <= minute < end:
+                        return False
+                elif end <= minute < start:
+                    return False
+        return True
+
+    def _matches_services(self, data: dict) -> bool:
+        service_logs = data.get(SERVICE_LOGS)
+        if isinstance(service_logs, dict):
+            for service in self.services:
+                if self._is_match(service_logs.get(service)):
+                    return True
+        return any(
+            alert.get("group") in self.services
+            for alert in data.get(AGGREGATE_ALERTS) or ()
+        )
+
+    def _has_entry(self, section) -> bool:
+        if not isinstance(section, dict):
+            return False
+        return any(self._is_match(entry) for entry in section.values())
+
+    def _is_match(self, entry) -> bool:
+        if not isinstance(entry, dict):
+            return False
+        return (
+            self._level is None
+            or LOG_LEVELS.get(entry.get("log_level"), 0) >= self._level
+        )
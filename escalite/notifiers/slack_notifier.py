@@ -1,14 +1,14 @@
-import requests
-
 from escalite.formatters.base_formatter import Formatter
-from escalite.formatters.dict_table_formatter import DictTableFormatter
+from escalite.formatters.dict_table_formatter import default_table_formatter
+from escalite.formatters.render_cache import render
 from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.http_transport import HttpTransport
 
 
 class SlackNotifier(BaseNotifier):
 
     def __init__(
-        self, config: dict = None, formatter: Formatter = DictTableFormatter()
+        self, config: dict = None, formatter: Formatter = default_table_formatter
     ):
         self.config = config
         self.formatter = formatter
@@ -21,6 +21,8 @@ class SlackNotifier(BaseNotifier):
     def notify(self, message: str, data: dict):
         if not self.config:
             raise ValueError("Config not set")
-        payload = {"text": f"{message}\n{self.formatter.format(data)}"}
-        response = requests.post(self.config["webhook_url"], json=payload)
+        payload = {"text": f"{message}\n{render(self.formatter, data)}"}
+        response = HttpTransport.for_config(self.config).post(
+            self.config["webhook_url"], json=payload
+        )
         response.raise_for_status()
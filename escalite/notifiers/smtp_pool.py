@@ -0,0 +1,150 @@
+import functools
+import smtplib
+import ssl
+import threading
+import time
+from collections import deque
+from typing import List
+
+
+@functools.lru_cache(maxsize=None)
+def default_ssl_context() -> ssl.SSLContext:
+    """
+    Returns a process-wide SSL context, created once and shared by all connections.
+    """
+    return ssl.create_default_context()
+
+
+class SMTPConnectionPool:
+    """
+    Keeps authenticated SMTP connections open between emails.
+
+    Connections are checked out for one sendmail at a time, so the pool is safe
+    to share across threads. An idle connection the server has closed is
+    replaced by a fresh one transparently. Settings read from the email
+    notifier config:
+        - smtp_pool_size: idle connections kept open (default 2)
+        - smtp_idle_timeout: seconds after which an idle connection is
+          closed instead of reused (default 60)
+    """
+
+    DEFAULT_POOL_SIZE = 2
+    DEFAULT_IDLE_TIMEOUT = 60
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(
+        self,
+        smtp_server: str,
+        smtp_port: int,
+        sender_email: str,
+        sender_password: str,
+        use_tls: bool = True,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.use_tls = use_tls
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        # (connection, released_at) pairs, most recently used on the right
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_config(cls, config: dict) -> "SMTPConnectionPool":
+        """
+        Returns the shared pool for the server and credentials in the config.
+        """
+        settings = (
+            config.get("smtp_server"),
+            config.get("smtp_port", 587),
+            config.get("sender_email"),
+            config.get("sender_password"),
+            config.get("use_tls", True),
+            config.get("smtp_pool_size", cls.DEFAULT_POOL_SIZE),
+            config.get("smtp_idle_timeout", cls.DEFAULT_IDLE_TIMEOUT),
+        )
+        pool = cls._pools.get(settings)
+        if pool is None:
+            with cls._pools_lock:
+                pool = cls._pools.get(settings)
+                if pool is None:
+                    pool = cls(*settings)
+                    cls._pools[settings] = pool
+        return pool
+
+    @classmethod
+    def close_all(cls):
+        """
+        Closes every shared pool and their open connections.
+        """
+        with cls._pools_lock:
+            pools, cls._pools = cls._pools, {}
+        for pool in pools.values():
+            pool.close()
+
+    def sendmail(self, from_addr: str, to_addrs: List[str], msg: str):
+        connection = self._acquire()
+        try:
+            connection.sendmail(from_addr, to_addrs, msg)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped the pooled connection, retry once on a new one.
+            self._discard(connection)
+            connection = self._connect()
+            try:
+                connection.sendmail(from_addr, to_addrs, msg)
+            except Exception:
+                self._discard(connection)
+                raise
+        except Exception:
+            self._discard(connection)
+            raise
+        self._release(connection)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            if self.use_tls:
+                connection.starttls(context=default_ssl_context())
+            connection.login(self.sender_email, self.sender_password)
+        except Exception:
+            self._discard(connection)
+            raise
+        return connection
+
+    def _acquire(self) -> smtplib.SMTP:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, released_at = self._idle.pop()
+            if now - released_at < self.idle_timeout:
+                return connection
+            self._discard(connection)
+        return self._connect()
+
+    def _release(self, connection: smtplib.SMTP):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((connection, time.monotonic()))
+                return
+        self._discard(connection)
+
+    @staticmethod
+    def _discard(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
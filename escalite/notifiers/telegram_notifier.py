@@ -1,13 +1,13 @@
-import requests
-
 from escalite.formatters.base_formatter import Formatter
 from escalite.notifiers.base_notifier import BaseNotifier
-from escalite.formatters.dict_table_formatter import DictTableFormatter
+from escalite.notifiers.http_transport import HttpTransport
+from escalite.formatters.dict_table_formatter import default_table_formatter
+from escalite.formatters.render_cache import render
 
 
 class TelegramNotifier(BaseNotifier):
     def __init__(
-        self, config: dict = None, formatter: Formatter = DictTableFormatter()
+        self, config: dict = None, formatter: Formatter = default_table_formatter
     ):
         self.config = config
         self.formatter = formatter
@@ -27,9 +27,9 @@ class TelegramNotifier(BaseNotifier):
 
         body = message
         if data:
-            body += "\n\n" + self.formatter.format(data)
+            body += "\n\n" + render(self.formatter, data)
 
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
         payload = {"chat_id": chat_id, "text": body}
-        resp = requests.post(url, data=payload)
+        resp = HttpTransport.for_config(self.config).post(url, data=payload)
         resp.raise_for_status()
@@ -1,45 +1,102 @@
 import time
 
-import requests
-
 from escalite.formatters.base_formatter import Formatter
-from escalite.formatters.dict_table_formatter import DictTableFormatter
+from escalite.formatters.dict_table_formatter import default_table_formatter
 from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.http_transport import HttpTransport
 
+DEFAULT_DETAILS_URL = "https://escalite.com/escalite-alerts?id="
 
-class WhatsAppNotifier(BaseNotifier):
+# The format specified in issue #22. The body parameters are filled in by
+# position: name, date, message and a link to the alert details
+DEFAULT_PAYLOAD_TEMPLATE = {
+    "messaging_product": "whatsapp",
+    "recipient_type": "individual",
+    "to": None,
+    "type": "template",
+    "template": {
+        "name": "escalite_alert",
+        "language": {"code": "en_US"},
+        "components": [
+            {
+                "type": "body",
+                "parameters": [
+                    {"type": "text", "parameter_name": "name", "text": ""},
+                    {"type": "text", "parameter_name": "date", "text": ""},
+                    {"type": "text", "parameter_name": "message", "text": None},
+                    {"type": "text", "parameter_name": "data", "text": ""},
+                ],
+            }
+        ],
+    },
+}
+
+
+class WhatsAppPayloadBuilder:
+    """
+    Builds the payloads of one notifier from its template.
+
+    The template and the values fixed by the config are prepared once. Each
+    payload shares the static parts of the template and only copies the dicts
+    and lists leading to the fields filled in per call, so neither the
+    template nor earlier payloads are ever changed and concurrent
+    escalations don't affect each other.
+    """
+
+    def __init__(
+        self,
+        template: dict,
+        to: str,
+        name: str = "",
+        details_url: str = DEFAULT_DETAILS_URL,
+    ):
+        try:
+            body = template["template"]["components"][0]
+            parameters = body["parameters"]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(
+                "payload_template must have template.components[0].parameters"
+            )
+        if len(parameters) < 4:
+            raise ValueError(
+                "payload_template needs the name, date, message and data parameters"
+            )
+        self.template = template
+        self.to = to
+        self.name = name
+        self.details_url = details_url
+
+    def build(self, message: str, alert_id) -> dict:
+        template = self.template["template"]
+        components = template["components"]
+        body = components[0]
+        name, date, text, details = body["parameters"][:4]
+        parameters = [
+            {**name, "text": self.name},
+            {**date, "text": time.strftime("%Y-%m-%d %H:%M:%S")},
+            {**text, "text": message},
+            {**details, "text": self.details_url + str(alert_id)},
+            *body["parameters"][4:],
+        ]
+        return {
+            **self.template,
+            "to": self.to,
+            "template": {
+                **template,
+                "components": [{**body, "parameters": parameters}, *components[1:]],
+            },
+        }
 
-    _payload_template = {
-        "messaging_product": "whatsapp",
-        "recipient_type": "individual",
-        "to": None,
-        "type": "template",
-        "template": {
-            "name": "escalite_alert",
-            "language": {"code": "en_US"},
-            "components": [
-                {
-                    "type": "body",
-                    "parameters": [
-                        {"type": "text", "parameter_name": "name", "text": ""},
-                        {
-                            "type": "text",
-                            "parameter_name": "date",
-                            "text": time.strftime("%Y-%m-%d %H:%M:%S"),
-                        },
-                        {"type": "text", "parameter_name": "message", "text": None},
-                        {"type": "text", "parameter_name": "data", "text": ""},
-                    ],
-                }
-            ],
-        },
-    }
 
+class WhatsAppNotifier(BaseNotifier):
     def __init__(
-        self, config: dict = None, formatter: Formatter = DictTableFormatter()
+        self, config: dict = None, formatter: Formatter = default_table_formatter
     ):
         self.config = config
         self.formatter = formatter
+        self._builder = None
+        self._headers = None
+        self._compiled_config = None
 
     def set_config(self, config: dict):
         required = [
@@ -55,26 +112,23 @@ class WhatsAppNotifier(BaseNotifier):
     def notify(self, message: str, data: dict):
         if not self.config:
             raise ValueError("Config not set")
-        # Currently, the payload template is fixed, and we expect it to be matching the format specified in the issue#22
-        payload = self.config.get(
-            "payload_template", WhatsAppNotifier._payload_template
-        )
-        payload["to"] = self.config["to"]
-        payload["template"]["components"][0]["parameters"][0]["text"] = self.config.get(
-            "name", ""
-        )
-        payload["template"]["components"][0]["parameters"][1]["text"] = time.strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
-        payload["template"]["components"][0]["parameters"][2]["text"] = message
+        if self._compiled_config is not self.config:
+            self._compile()
         # TODO: Add alert id to the message and link to the Escalite dashboard
-        details = self.config.get(
-            "details_url", "https://escalite.com/escalite-alerts?id="
+        payload = self._builder.build(message, data.get("alert_id", ""))
+        response = HttpTransport.for_config(self.config).post(
+            self.config["api_url"], json=payload, headers=self._headers
         )
-        payload["template"]["components"][0]["parameters"][3]["text"] = details + str(
-            data.get("alert_id", "")
-        )
-
-        headers = {"Authorization": f"Bearer {self.config['token']}"}
-        response = requests.post(self.config["api_url"], json=payload, headers=headers)
         response.raise_for_status()
+
+    def _compile(self):
+        # Prepared once per config; a new config object is compiled on first use
+        config = self.config
+        self._builder = WhatsAppPayloadBuilder(
+            config.get("payload_template", DEFAULT_PAYLOAD_TEMPLATE),
+            config["to"],
+            config.get("name", ""),
+            config.get("details_url", DEFAULT_DETAILS_URL),
+        )
+        self._headers = {"Authorization": f"Bearer {config['token']}"}
+        self._compiled_config = config
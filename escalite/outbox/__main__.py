@@ -0,0 +1,105 @@
+"""
+Inspects and manages an escalation outbox.
+
+    python -m escalite.outbox outbox.db list
+    python -m escalite.outbox outbox.db show <id>
+    python -m escalite.outbox outbox.db replay --config notifiers.json
+    python -m escalite.outbox outbox.db purge [<id> ...]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.outbox.sqlite_outbox import SqliteOutbox
+
+
+def _list(outbox: SqliteOutbox, args) -> int:
+    entries = outbox.entries(args.limit)
+    for entry in entries:
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.created))
+        error = f"  last error: {entry.last_error}" if entry.last_error else ""
+        print(
+            f"{entry.id}  {created}  alert {entry.alert_id}  "
+            f"attempts {entry.attempts}  {entry.message}{error}"
+        )
+    print(f"{len(entries)} escalation(s)", file=sys.stderr)
+    return 0
+
+
+def _show(outbox: SqliteOutbox, args) -> int:
+    for entry in outbox.entries():
+        if entry.id == args.id:
+            data = entry.to_dict()
+            data["data"] = json.loads(entry.data)
+            print(json.dumps(data, indent=2))
+            return 0
+    print(f"No escalation with id {args.id}", file=sys.stderr)
+    return 1
+
+
+def _count(outbox: SqliteOutbox, args) -> int:
+    print(len(outbox))
+    return 0
+
+
+def _replay(outbox: SqliteOutbox, args) -> int:
+    with open(args.config) as f:
+        notifiers = NotifierFactory.create_notifiers(json.load(f))
+    delivered = outbox.replay(notifiers, args.limit)
+    remaining = len(outbox)
+    print(f"Delivered {delivered}, {remaining} left in the outbox", file=sys.stderr)
+    return 0 if remaining == 0 else 1
+
+
+def _purge(outbox: SqliteOutbox, args) -> int:
+    deleted = outbox.purge(args.ids or None)
+    print(f"Deleted {deleted} escalation(s)", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m escalite.outbox", description="Manage an escalation outbox."
+    )
+    parser.add_argument("path", help="path of the outbox database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list stored escalations")
+    list_parser.add_argument("--limit", type=int)
+    list_parser.set_defaults(func=_list)
+
+    show_parser = commands.add_parser("show", help="show one escalation as JSON")
+    show_parser.add_argument("id")
+    show_parser.set_defaults(func=_show)
+
+    count_parser = commands.add_parser("count", help="count stored escalations")
+    count_parser.set_defaults(func=_count)
+
+    replay_parser = commands.add_parser(
+        "replay", help="deliver stored escalations and remove the delivered ones"
+    )
+    replay_parser.add_argument(
+        "--config", required=True, help="JSON file with the notifier configuration"
+    )
+    replay_parser.add_argument("--limit", type=int)
+    replay_parser.set_defaults(func=_replay)
+
+    purge_parser = commands.add_parser(
+        "purge", help="delete the given escalations, or all of them"
+    )
+    purge_parser.add_argument("ids", nargs="*")
+    purge_parser.set_defaults(func=_purge)
+
+    args = parser.parse_args(argv)
+    outbox = SqliteOutbox(args.path)
+    try:
+        return args.func(outbox, args)
+    finally:
+        outbox.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
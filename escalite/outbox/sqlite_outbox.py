@@ -0,0 +1,459 @@
+import asyncio
+import atexit
+import functools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterable, List, Optional
+
+from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.notifiers.notifier_wrapper import NotifierWrapper
+from escalite.utils.alert_id import CounterIdGenerator
+from escalite.utils.background import mark_background
+from escalite.utils.constants import ALERT_ID
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    alert_id TEXT,
+    message TEXT NOT NULL,
+    data TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    delivered TEXT
+)
+"""
+
+_COLUMNS = (
+    "id",
+    "created",
+    "alert_id",
+    "message",
+    "data",
+    "attempts",
+    "last_error",
+    "delivered",
+)
+
+
+def notifier_key(index: int, notifier: BaseNotifier) -> str:
+    """
+    Identifies a notifier by its position in the configured notifiers and
+    its type, so the same configuration gives the same keys in a new process.
+    """
+    if isinstance(notifier, NotifierWrapper):
+        notifier = notifier.unwrap()
+    return f"{index}:{type(notifier).__name__}"
+
+
+class OutboxEntry:
+    """
+    An escalation stored in the outbox.
+    """
+
+    __slots__ = _COLUMNS
+
+    def __init__(
+        self, id, created, alert_id, message, data, attempts, last_error, delivered
+    ):
+        self.id = id
+        self.created = created
+        self.alert_id = alert_id
+        self.message = message
+        self.data = data
+        self.attempts = attempts
+        self.last_error = last_error
+        # Keys of the notifiers that delivered it, one per line, see notifier_key
+        self.delivered = delivered
+
+    @property
+    def delivered_to(self) -> set:
+        return set(self.delivered.split("\n")) if self.delivered else set()
+
+    def to_dict(self) -> dict:
+        return {column: getattr(self, column) for column in _COLUMNS}
+
+
+class SqliteOutbox:
+    """
+    Keeps escalations on disk until they are delivered, so an alert survives
+    a failing notifier or a crashing process.
+
+    append() records an escalation before delivery, ack() removes it once it
+    was delivered and fail() records a failed attempt. Writes are batched: a
+    background thread commits them every ``flush_interval`` seconds or once
+    ``batch_size`` of them are waiting, in one transaction. An escalation
+    acknowledged before its batch is written never touches the disk. The
+    database runs in WAL mode with ``synchronous=NORMAL``, so a commit is
+    not fsynced on its own; escalations appended within the last
+    ``flush_interval`` are lost if the process dies. Call flush() to commit
+    right away.
+
+    track() records which notifiers delivered an escalation, so replay(),
+    which redelivers what is left in the outbox, e.g. on startup, only sends
+    it to the notifiers that have not. Notifiers are told apart by their
+    position and type (see notifier_key), so replay with the same notifier
+    configuration.
+
+    Each process needs its own outbox file: the escalations another process
+    is still delivering cannot be told apart from the ones left behind.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be greater than 0")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if "delivered" not in columns:
+            # outbox files written before notifiers were tracked
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN delivered TEXT")
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+
+        self._new_id = CounterIdGenerator()
+        # Writes waiting for the next batch
+        self._inserts = {}
+        self._failures = {}
+        self._deletes = set()
+        self._deliveries = {}
+        self._pending = 0
+        # Escalations appended or replayed here that are still being delivered
+        self._in_flight = set()
+        # Notifier calls still running per escalation, see track()
+        self._running = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._run, name="escalite-outbox", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def append(self, message: str, data: dict) -> str:
+        """
+        Records an escalation and returns its outbox id.
+        """
+        entry_id = self._new_id()
+        row = (
+            entry_id,
+            time.time(),
+            data.get(ALERT_ID),
+            message,
+            json.dumps(data, default=str),
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Outbox has been closed.")
+            self._inserts[entry_id] = row
+            self._in_flight.add(entry_id)
+            self._queued()
+        return entry_id
+
+    def ack(self, entry_id: str):
+        """
+        Removes a delivered escalation.
+        """
+        with self._cond:
+            self._in_flight.discard(entry_id)
+            self._failures.pop(entry_id, None)
+            self._deliveries.pop(entry_id, None)
+            if self._inserts.pop(entry_id, None) is not None:
+                self._pending -= 1
+                return
+            self._deletes.add(entry_id)
+            self._queued()
+
+    def fail(self, entry_id: str, error: Optional[BaseException] = None):
+        """
+        Records a failed delivery attempt; the escalation stays in the outbox.
+        """
+        with self._cond:
+            self._in_flight.discard(entry_id)
+            attempts, _ = self._failures.get(entry_id, (0, None))
+            self._failures[entry_id] = (attempts + 1, repr(error) if error else None)
+            self._queued()
+
+    def track(
+        self,
+        entry_id: str,
+        notifiers: List[BaseNotifier],
+        delivered: Iterable[str] = (),
+    ) -> List[BaseNotifier]:
+        """
+        Returns the notifiers whose key is not in ``delivered``, wrapped so
+        that the ones delivering the escalation are recorded with it. A call
+        that is reported as failed, e.g. after a timeout, but delivers later
+        is recorded too; the escalation is not replayed while it runs.
+        """
+        delivered = set(delivered)
+        tracked = []
+        for index, notifier in enumerate(notifiers):
+            key = notifier_key(index, notifier)
+            if key not in delivered:
+                tracked.append(_TrackedNotifier(notifier, self, entry_id, key))
+        return tracked
+
+    def flush(self):
+        """
+        Commits the waiting writes now.
+        """
+        # Batches are taken and written under the database lock, so they
+        # reach the database in the order they were taken
+        with self._db_lock:
+            with self._cond:
+                batch = self._take_batch()
+            self._write(batch)
+
+    def entries(self, limit: int = None) -> List[OutboxEntry]:
+        """
+        Returns the stored escalations, oldest first.
+        """
+        self.flush()
+        query = f"SELECT {', '.join(_COLUMNS)} FROM outbox ORDER BY created, id"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._db_lock:
+            rows = self._conn.execute(query).fetchall()
+        return [OutboxEntry(*row) for row in rows]
+
+    def __len__(self):
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def purge(self, entry_ids: List[str] = None) -> int:
+        """
+        Deletes the given escalations, or all of them. Returns how many were deleted.
+        """
+        self.flush()
+        with self._db_lock:
+            if entry_ids is None:
+                cursor = self._conn.execute("DELETE FROM outbox")
+            else:
+                cursor = self._conn.executemany(
+                    "DELETE FROM outbox WHERE id = ?", [(i,) for i in entry_ids]
+                )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def replay(self, notifiers: List[BaseNotifier], limit: int = None) -> int:
+        """
+        Delivers the stored escalations to the notifiers, removing the ones
+        that were delivered. Returns the number delivered; deliveries a
+        notifier handed on (e.g. batched) are settled when they complete and
+        are not counted. Escalations appended to this outbox that are still
+        being delivered are skipped, so they are not delivered twice.
+        """
+        delivered = 0
+        for entry in self.entries(limit):
+            with self._cond:
+                if entry.id in self._in_flight or entry.id in self._running:
+                    continue
+                self._in_flight.add(entry.id)
+            data = json.loads(entry.data)
+            outstanding = self.track(entry.id, notifiers, entry.delivered_to)
+            try:
+                result = NotifierFactory.notify(outstanding, entry.message, data)
+            except Exception as e:
+                logger.warning("Replaying escalation %s failed: %r", entry.id, e)
+                self.fail(entry.id, e)
+                continue
+            if result is None:
+                self.ack(entry.id)
+                delivered += 1
+                continue
+            result.when_done(functools.partial(self._settle, entry.id))
+        self.flush()
+        return delivered
+
+    def start_replay(self, notifiers: List[BaseNotifier]) -> threading.Thread:
+        """
+        Replays the outbox on a background thread, e.g. when the service
+        starts. Requests escalating meanwhile are not replayed, see replay().
+        """
+
+        def run():
+            mark_background()
+            try:
+                count = self.replay(notifiers)
+            except Exception:
+                logger.exception("Replaying the escalation outbox failed.")
+                return
+            if count:
+                logger.info("Replayed %d escalations from the outbox.", count)
+
+        thread = threading.Thread(
+            target=run, name="escalite-outbox-replay", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def close(self):
+        """
+        Commits the waiting writes and closes the database.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        with self._db_lock:
+            with self._cond:
+                batch = self._take_batch()
+            self._write(batch)
+            self._conn.close()
+        atexit.unregister(self.close)
+
+    def _started(self, entry_id: str):
+        with self._cond:
+            self._running[entry_id] = self._running.get(entry_id, 0) + 1
+
+    def _finished(self, entry_id: str, key: Optional[str]):
+        # key is the notifier that delivered, None if it did not
+        with self._cond:
+            running = self._running.pop(entry_id) - 1
+            if running:
+                self._running[entry_id] = running
+            if key is not None:
+                self._deliveries.setdefault(entry_id, []).append(key)
+                self._queued()
+
+    def _settle(self, entry_id: str, delivered: bool, error: BaseException = None):
+        if delivered:
+            self.ack(entry_id)
+        else:
+            self.fail(entry_id, error)
+
+    def _queued(self):
+        # called with self._cond held
+        self._pending += 1
+        if self._pending == 1 or self._pending >= self.batch_size:
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                if self._pending < self.batch_size:
+                    # give the batch time to fill up
+                    self._cond.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Writing to the escalation outbox failed.")
+
+    def _take_batch(self):
+        # called with self._cond held
+        batch = (self._inserts, self._failures, self._deliveries, self._deletes)
+        self._inserts, self._failures, self._deliveries = {}, {}, {}
+        self._deletes = set()
+        self._pending = 0
+        return batch
+
+    def _write(self, batch):
+        # called with self._db_lock held
+        inserts, failures, deliveries, deletes = batch
+        if not (inserts or failures or deliveries or deletes):
+            return
+        with self._conn:
+            if inserts:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO outbox "
+                    "(id, created, alert_id, message, data) VALUES (?, ?, ?, ?, ?)",
+                    inserts.values(),
+                )
+            if failures:
+                self._conn.executemany(
+                    "UPDATE outbox SET attempts = attempts + ?, last_error = ? "
+                    "WHERE id = ?",
+                    [(n, error, i) for i, (n, error) in failures.items()],
+                )
+            if deliveries:
+                self._conn.executemany(
+                    "UPDATE outbox SET delivered = "
+                    "COALESCE(delivered || char(10), '') || ? WHERE id = ?",
+                    [("\n".join(keys), i) for i, keys in deliveries.items()],
+                )
+            if deletes:
+                self._conn.executemany(
+                    "DELETE FROM outbox WHERE id = ?", [(i,) for i in deletes]
+                )
+
+
+class _TrackedNotifier(NotifierWrapper):
+    """
+    Records with an outbox entry whether the wrapped notifier delivered it.
+    """
+
+    def __init__(
+        self, notifier: BaseNotifier, outbox: SqliteOutbox, entry_id: str, key: str
+    ):
+        super().__init__(notifier)
+        self.outbox = outbox
+        self.entry_id = entry_id
+        self.key = key
+
+    @property
+    def route(self):
+        return getattr(self.notifier, "route", None)
+
+    def notify(self, message: str, data: dict):
+        self.outbox._started(self.entry_id)
+        try:
+            outcome = self.notifier.notify(message=message, data=data)
+        except BaseException:
+            self.outbox._finished(self.entry_id, None)
+            raise
+        return self._track(outcome)
+
+    async def anotify(self, message: str, data: dict):
+        self.outbox._started(self.entry_id)
+        try:
+            anotify = getattr(self.notifier, "anotify", None)
+            if anotify is not None:
+                outcome = await anotify(message=message, data=data)
+            else:
+                outcome = await asyncio.to_thread(
+                    self.notifier.notify, message=message, data=data
+                )
+        except BaseException:
+            self.outbox._finished(self.entry_id, None)
+            raise
+        return self._track(outcome)
+
+    def _track(self, outcome):
+        if not isinstance(outcome, Future):
+            self.outbox._finished(self.entry_id, self.key)
+            return outcome
+
+        def on_done(future: Future):
+            delivered = not future.cancelled() and future.exception() is None
+            self.outbox._finished(self.entry_id, self.key if delivered else None)
+
+        outcome.add_done_callback(on_done)
+        return outcome
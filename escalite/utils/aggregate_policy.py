@@ -0,0 +1,207 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from escalite.models.log_entry import LogEntry
+from escalite.models.request_log import RequestLog
+from escalite.utils.constants import LOG_LEVEL, LOG_LEVELS, SERVICE_LOGS
+
+GROUP_BY = (None, "service", "tag")
+FIRING = "firing"
+RECOVERED = "recovered"
+ALL_REQUESTS = "*"
+
+
+class SlidingWindow:
+    """
+    Counts events and failed events over the last ``window`` seconds, in a
+    ring of ``buckets`` time buckets. Buckets are reused once they fall out
+    of the window, so the memory used does not grow with traffic.
+    """
+
+    def __init__(self, window: float = 60, buckets: int = 12):
+        if window <= 0:
+            raise ValueError("window must be greater than 0")
+        if buckets < 1:
+            raise ValueError("buckets must be at least 1")
+        self.window = window
+        self._width = window / buckets
+        # [bucket number, events, failed events]
+        self._slots = [[-1, 0, 0] for _ in range(buckets)]
+
+    def add(self, failed: bool, now: float):
+        number = int(now // self._width)
+        slot = self._slots[number % len(self._slots)]
+        if slot[0] != number:
+            slot[0], slot[1], slot[2] = number, 0, 0
+        slot[1] += 1
+        if failed:
+            slot[2] += 1
+
+    def totals(self, now: float) -> Tuple[int, int]:
+        """
+        Returns the number of events and of failed events in the window.
+        """
+        oldest = int(now // self._width) - len(self._slots)
+        events = failed = 0
+        for number, slot_events, slot_failed in self._slots:
+            if number > oldest:
+                events += slot_events
+                failed += slot_failed
+        return events, failed
+
+
+class AggregatePolicy:
+    """
+    Escalates on the failure rate across requests instead of on each request.
+
+    Every observed request counts as an event, per service (``group_by``
+    "service"), per tag ("tag") or for all requests (None). An event fails
+    when it is logged at ``error_level`` or above or, with ``slow_ms``, when
+    it took longer than that. Once a group has seen ``min_requests`` events
+    in the last ``window`` seconds and its failure rate reaches
+    ``error_rate``, one alert is raised; the group recovers, with a recovery
+    notification, when the rate falls to ``recover_rate`` (half of
+    ``error_rate`` by default). As the rate is computed when requests are
+    observed, recovery is only noticed once traffic resumes.
+    """
+
+    def __init__(
+        self,
+        error_rate: float = 0.1,
+        recover_rate: float = None,
+        window: float = 60,
+        buckets: int = 12,
+        min_requests: int = 20,
+        group_by: Optional[str] = None,
+        error_level: LOG_LEVEL = "error",
+        slow_ms: float = None,
+    ):
+        if not 0 < error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        if recover_rate is None:
+            recover_rate = error_rate / 2
+        if not 0 <= recover_rate < error_rate:
+            raise ValueError("recover_rate must be between 0 and error_rate")
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Unknown group_by: {group_by}")
+        if error_level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {error_level}")
+        if min_requests < 1:
+            raise ValueError("min_requests must be at least 1")
+        if window <= 0:
+            raise ValueError("window must be greater than 0")
+        if buckets < 1:
+            raise ValueError("buckets must be at least 1")
+        self.error_rate = error_rate
+        self.recover_rate = recover_rate
+        self.window = window
+        self.buckets = buckets
+        self.min_requests = min_requests
+        self.group_by = group_by
+        self.error_level = error_level
+        self.slow_ms = slow_ms
+        self._error_level = LOG_LEVELS[error_level]
+        self._slow = slow_ms / 1000 if slow_ms is not None else None
+        # group -> [SlidingWindow, firing]
+        self._groups: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, logs: RequestLog, now: float = None) -> List[dict]:
+        """
+        Counts a request and returns the alerts it caused: groups whose
+        failure rate started or stopped firing.
+        """
+        now = time.monotonic() if now is None else now
+        events = self._events(logs)
+        alerts = []
+        with self._lock:
+            for group, failed in events.items():
+                state = self._groups.get(group)
+                if state is None:
+                    state = self._groups[group] = [
+                        SlidingWindow(self.window, self.buckets),
+                        False,
+                    ]
+                window = state[0]
+                window.add(failed, now)
+                requests, failures = window.totals(now)
+                if requests < self.min_requests:
+                    continue
+                rate = failures / requests
+                if not state[1] and rate >= self.error_rate:
+                    state[1] = True
+                elif state[1] and rate <= self.recover_rate:
+                    state[1] = False
+                else:
+                    continue
+                alerts.append(
+                    {
+                        "group": group,
+                        "state": FIRING if state[1] else RECOVERED,
+                        "error_rate": round(rate, 4),
+                        "errors": failures,
+                        "requests": requests,
+                        "window": self.window,
+                    }
+                )
+        return alerts
+
+    def firing(self) -> List[str]:
+        """
+        Returns the groups currently alerting.
+        """
+        with self._lock:
+            return [group for group, state in self._groups.items() if state[1]]
+
+    def reset(self):
+        with self._lock:
+            self._groups.clear()
+
+    @staticmethod
+    def describe(alerts: List[dict]) -> str:
+        """
+        Returns a notification message for alerts returned by observe().
+        """
+        parts = []
+        for alert in alerts:
+            rate = (
+                f"error rate {alert['error_rate']:.1%} "
+                f"({alert['errors']} of {alert['requests']} requests "
+                f"in the last {alert['window']:g}s)"
+            )
+            if alert["state"] == FIRING:
+                parts.append(f"{alert['group']}: {rate}")
+            else:
+                parts.append(f"{alert['group']} recovered: {rate}")
+        return "; ".join(parts)
+
+    def _events(self, logs: RequestLog) -> Dict[str, bool]:
+        if self.group_by is None:
+            level = max(LOG_LEVELS[logs.log_level], logs.rule_level)
+            return {
+                ALL_REQUESTS: level >= self._error_level
+                or self._is_slow(logs.time_elapsed)
+            }
+        if self.group_by == "service":
+            return {
+                name: self._failed(entry)
+                for name, entry in logs.sections.get(SERVICE_LOGS, {}).items()
+                if isinstance(entry, LogEntry)
+            }
+        events = {}
+        for tag, section in logs.sections.items():
+            if isinstance(section, LogEntry):
+                continue
+            entries = [e for e in section.values() if isinstance(e, LogEntry)]
+            if entries:
+                events[tag] = any(self._failed(entry) for entry in entries)
+        return events
+
+    def _failed(self, entry: LogEntry) -> bool:
+        return LOG_LEVELS[entry.log_level] >= self._error_level or self._is_slow(
+            entry.time_elapsed
+        )
+
+    def _is_slow(self, elapsed: Optional[float]) -> bool:
+        return self._slow is not None and elapsed is not None and elapsed > self._slow
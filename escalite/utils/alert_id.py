@@ -0,0 +1,84 @@
+import itertools
+import os
+import time
+import uuid
+import weakref
+from typing import Callable, Union
+
+# Crockford's base32, as used by ULIDs
+_ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def uuid4_id() -> str:
+    """
+    Returns a random UUID4, e.g. "1b4e28ba-2fa1-41d2-883f-0016d3cca427".
+    """
+    return str(uuid.uuid4())
+
+
+def ulid_id() -> str:
+    """
+    Returns a ULID: 26 characters that sort by creation time (millisecond
+    precision) followed by 80 random bits.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    chars = []
+    for _ in range(26):
+        value, index = divmod(value, 32)
+        chars.append(_ULID_ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+class CounterIdGenerator:
+    """
+    Generates ids from a random per-process prefix and a counter, e.g.
+    "3f9a1c2e-1", "3f9a1c2e-2". Much cheaper than a UUID while staying unique
+    across processes; a forked child picks a new prefix.
+    """
+
+    def __init__(self):
+        self._reset()
+        _counter_generators.add(self)
+
+    def _reset(self):
+        self.prefix = os.urandom(4).hex()
+        self._counter = itertools.count(1)
+
+    def __call__(self) -> str:
+        return f"{self.prefix}-{next(self._counter)}"
+
+
+# Reset in a forked child; weak, so generators no longer used can be collected
+_counter_generators = weakref.WeakSet()
+
+
+def _reset_counter_generators():
+    for generator in list(_counter_generators):
+        generator._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_counter_generators)
+
+
+ALERT_ID_GENERATORS = {
+    "uuid4": uuid4_id,
+    "ulid": ulid_id,
+    "counter": CounterIdGenerator(),
+}
+
+
+def get_alert_id_generator(
+    generator: Union[str, Callable[[], str]],
+) -> Callable[[], str]:
+    """
+    Returns the generator registered under the given name, or the given callable.
+    """
+    if callable(generator):
+        return generator
+    if generator not in ALERT_ID_GENERATORS:
+        raise ValueError(
+            f"Unknown alert id generator: {generator}. "
+            f"Expected one of: {', '.join(ALERT_ID_GENERATORS)}"
+        )
+    return ALERT_ID_GENERATORS[generator]
@@ -0,0 +1,30 @@
+import contextvars
+
+# Set in threads that deliver escalations off the request path
+_in_background = contextvars.ContextVar("_in_background", default=False)
+# Set in those of them a request may be waiting on, e.g. the parallel fan-out
+_awaited = contextvars.ContextVar("_awaited", default=False)
+
+
+def in_background() -> bool:
+    """
+    Returns True when running on a background delivery thread.
+    """
+    return _in_background.get()
+
+
+def may_wait() -> bool:
+    """
+    Returns True when running on a background delivery thread no request
+    waits on, where a delivery may wait as long as it needs.
+    """
+    return _in_background.get() and not _awaited.get()
+
+
+def mark_background(awaited: bool = False):
+    """
+    Marks the current thread as a background delivery thread; ``awaited``
+    if a request may be waiting for what it delivers.
+    """
+    _in_background.set(True)
+    _awaited.set(awaited)
@@ -10,3 +10,9 @@ LOG_DATE = "log_date"
 LOG_LEVEL = Literal["info", "warning", "error", "debug", "critical"]
 LOG_LEVELS = {"info": 20, "warning": 30, "error": 40, "debug": 10, "critical": 50}
 ALERT_ID = "alert_id"
+SUPPRESSED_COUNT = "suppressed_count"
+UNSAMPLED_DROPPED = "unsampled_dropped"
+LOG_OVERFLOW = "log_overflow"
+TRIGGERED_RULES = "triggered_rules"
+AGGREGATE_ALERTS = "aggregate_alerts"
+ESCALATION_LEVEL = "escalation_level"
@@ -0,0 +1,220 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from escalite.utils.constants import LOG_LEVEL, LOG_LEVELS, SERVICE_LOGS
+
+
+class EscalationRule:
+    """
+    A condition that, once met by a request, makes the request escalate at
+    ``level`` even if its own log level is lower. ``name`` identifies the
+    rule in the request's "triggered_rules".
+    """
+
+    type = None
+
+    def __init__(self, name: str = None, level: LOG_LEVEL = "error"):
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {level}")
+        self.name = name or self.type
+        self.level = level
+
+
+class ServiceLatencyRule(EscalationRule):
+    """
+    Met when a service call (of ``service``, or of any service) takes longer
+    than ``over_ms`` milliseconds.
+    """
+
+    type = "service_latency"
+
+    def __init__(self, over_ms: float, service: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.over_ms = over_ms
+        self.service = service
+
+
+class RequestLatencyRule(EscalationRule):
+    """
+    Met when the whole request takes longer than ``over_ms`` milliseconds.
+    """
+
+    type = "request_latency"
+
+    def __init__(self, over_ms: float, **kwargs):
+        super().__init__(**kwargs)
+        self.over_ms = over_ms
+
+
+class ErrorCountRule(EscalationRule):
+    """
+    Met when more than ``over`` entries (under ``tag``, or under any tag)
+    are at ``min_level`` or above.
+    """
+
+    type = "error_count"
+
+    def __init__(
+        self, over: int, min_level: LOG_LEVEL = "error", tag: str = None, **kwargs
+    ):
+        super().__init__(**kwargs)
+        if min_level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {min_level}")
+        self.over = over
+        self.min_level = min_level
+        self.tag = tag
+
+
+class CodeRule(EscalationRule):
+    """
+    Met when an entry (under ``tag``, or under any tag) is logged with one
+    of ``codes``.
+    """
+
+    type = "code"
+
+    def __init__(self, codes: Iterable[int], tag: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.codes = frozenset(codes)
+        self.tag = tag
+
+
+RULE_TYPES = {
+    rule.type: rule
+    for rule in (ServiceLatencyRule, RequestLatencyRule, ErrorCountRule, CodeRule)
+}
+
+
+def build_rule(config: dict) -> EscalationRule:
+    """
+    Creates a rule from a dict with its "type" and arguments, e.g.
+    {"type": "service_latency", "service": "payments", "over_ms": 500}.
+    """
+    config = dict(config)
+    rule_type = config.pop("type", None)
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"Unknown rule type: {rule_type}")
+    return RULE_TYPES[rule_type](**config)
+
+
+class RuleSet:
+    """
+    Escalation rules compiled for incremental evaluation.
+
+    The rules are indexed by what can trigger them, so each logged entry
+    only looks at the rules for its service, code and level, and a request
+    only carries a counter per error-count rule. Triggered rules are
+    recorded on the request as they are met (see RequestLog.trigger), which
+    leaves a single comparison for escalate().
+    """
+
+    def __init__(self, rules: Iterable[EscalationRule]):
+        self.rules = tuple(rules)
+        names = [rule.name for rule in self.rules]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate rule names: {', '.join(sorted(duplicates))}")
+        self._service_rules: Dict[Optional[str], List[Tuple[float, str, int]]] = {}
+        self._code_rules: Dict[int, List[Tuple[Optional[str], str, int]]] = {}
+        self._count_rules: List[Tuple[int, Optional[str], int, str, int]] = []
+        self._request_rules: List[Tuple[float, str, int]] = []
+        for rule in self.rules:
+            level = LOG_LEVELS[rule.level]
+            if isinstance(rule, ServiceLatencyRule):
+                self._service_rules.setdefault(rule.service, []).append(
+                    (rule.over_ms / 1000, rule.name, level)
+                )
+            elif isinstance(rule, RequestLatencyRule):
+                self._request_rules.append((rule.over_ms / 1000, rule.name, level))
+            elif isinstance(rule, ErrorCountRule):
+                self._count_rules.append(
+                    (LOG_LEVELS[rule.min_level], rule.tag, rule.over, rule.name, level)
+                )
+            elif isinstance(rule, CodeRule):
+                for code in rule.codes:
+                    self._code_rules.setdefault(code, []).append(
+                        (rule.tag, rule.name, level)
+                    )
+            else:
+                raise ValueError(f"Unsupported rule: {rule!r}")
+        self._any_service_rules = self._service_rules.pop(None, [])
+        self._min_count_level = min(
+            (min_level for min_level, *_ in self._count_rules), default=None
+        )
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[dict]) -> "RuleSet":
+        return cls(build_rule(config) for config in configs)
+
+    def watches(
+        self, tag: Optional[str], key: str, code: Optional[int], level: LOG_LEVEL
+    ) -> bool:
+        """
+        Returns True if an entry logged with these fields can meet a rule.
+        """
+        return (
+            (code is not None and code in self._code_rules)
+            or (
+                self._min_count_level is not None
+                and LOG_LEVELS[level] >= self._min_count_level
+            )
+            or (
+                tag == SERVICE_LOGS
+                and (bool(self._any_service_rules) or key in self._service_rules)
+            )
+        )
+
+    def on_entry(
+        self,
+        logs,
+        tag: Optional[str],
+        key: str,
+        entry,
+        code: Optional[int],
+        previous_level: Optional[LOG_LEVEL],
+    ):
+        """
+        Evaluates the rules an entry that was just added (previous_level is
+        None) or updated can trigger.
+        """
+        if code is not None and code in self._code_rules:
+            for rule_tag, name, level in self._code_rules[code]:
+                if rule_tag is None or rule_tag == tag:
+                    logs.trigger(name, level)
+
+        if tag == SERVICE_LOGS and entry.time_elapsed is not None:
+            elapsed = entry.time_elapsed
+            for over, name, level in self._any_service_rules:
+                if elapsed > over:
+                    logs.trigger(name, level)
+            for over, name, level in self._service_rules.get(key, ()):
+                if elapsed > over:
+                    logs.trigger(name, level)
+
+        if self._min_count_level is not None:
+            entry_level = LOG_LEVELS[entry.log_level]
+            if entry_level < self._min_count_level:
+                return
+            previous = -1 if previous_level is None else LOG_LEVELS[previous_level]
+            for index, (min_level, rule_tag, over, name, level) in enumerate(
+                self._count_rules
+            ):
+                # an entry counts once, when it first reaches the level
+                if entry_level >= min_level > previous and (
+                    rule_tag is None or rule_tag == tag
+                ):
+                    counts = logs.rule_counts
+                    if counts is None:
+                        counts = logs.rule_counts = [0] * len(self._count_rules)
+                    counts[index] += 1
+                    if counts[index] > over:
+                        logs.trigger(name, level)
+
+    def on_end(self, logs):
+        """
+        Evaluates the rules on the duration of an ended request.
+        """
+        if logs.time_elapsed is None:
+            return
+        for over, name, level in self._request_rules:
+            if logs.time_elapsed > over:
+                logs.trigger(name, level)
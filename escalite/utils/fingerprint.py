@@ -0,0 +1,29 @@
+import hashlib
+
+from escalite.utils.constants import API_LOGS, ERROR_LOGS, SERVICE_LOGS
+
+FINGERPRINT_TAGS = (API_LOGS, SERVICE_LOGS, ERROR_LOGS)
+
+
+def fingerprint(log_data: dict) -> str:
+    """
+    Returns a hash identifying the failure described by a request's logs.
+
+    Only stable fields take part: the overall level and, for every entry in the
+    api, service and error logs, its key, level, code and error trace. Values,
+    messages, timestamps and the alert id differ between requests and are
+    ignored, so the same failure repeated across requests has the same
+    fingerprint.
+    """
+    parts = [str(log_data.get("log_level", "info"))]
+    for tag in FINGERPRINT_TAGS:
+        entries = log_data.get(tag) or {}
+        for key in sorted(entries, key=str):
+            entry = entries[key]
+            if not isinstance(entry, dict):
+                continue
+            parts.append(
+                f"{tag}\x1f{key}\x1f{entry.get('log_level')}"
+                f"\x1f{entry.get('code')}\x1f{entry.get('error_trace')}"
+            )
+    return hashlib.sha1("\x1e".join(parts).encode("utf-8")).hexdigest()
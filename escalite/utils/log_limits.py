@@ -0,0 +1,166 @@
+from typing import Any, List, Optional
+
+TRUNCATION_MARKER = "...[truncated {} bytes]"
+# Containers are cut without converting them in full, so their size is unknown
+CONTAINER_TRUNCATION_MARKER = "...[truncated {}]"
+CONTAINERS = (dict, list, tuple, set, frozenset)
+# Nesting deeper than this is shown as "..."
+MAX_REPR_DEPTH = 32
+
+
+class _ReprFull(Exception):
+    pass
+
+
+def bounded_repr(value: Any, limit: int) -> Optional[str]:
+    """
+    Returns the first ``limit`` characters of repr(value) if it is longer,
+    or None if it is not. Only as much of the value is converted as needed.
+    """
+    parts: List[str] = []
+    size = 0
+
+    def emit(text: str):
+        nonlocal size
+        parts.append(text)
+        size += len(text)
+        if size > limit:
+            raise _ReprFull
+
+    def walk(item: Any, depth: int):
+        if depth > MAX_REPR_DEPTH:
+            emit("...")
+        elif isinstance(item, dict):
+            emit("{")
+            for index, (key, nested) in enumerate(item.items()):
+                if index:
+                    emit(", ")
+                walk(key, depth + 1)
+                emit(": ")
+                walk(nested, depth + 1)
+            emit("}")
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            if isinstance(item, list):
+                opening, closing = "[", "]"
+            elif isinstance(item, tuple):
+                opening, closing = "(", ",)" if len(item) == 1 else ")"
+            else:
+                opening, closing = "{", "}"
+            emit(opening)
+            for index, nested in enumerate(item):
+                if index:
+                    emit(", ")
+                walk(nested, depth + 1)
+            emit(closing)
+        elif isinstance(item, (str, bytes, bytearray)) and len(item) > limit:
+            # the repr of the cut value is longer than the limit already
+            emit(repr(item[: limit + 1]))
+        else:
+            emit(repr(item))
+
+    try:
+        walk(value, 0)
+    except _ReprFull:
+        return "".join(parts)[:limit]
+    return None
+
+
+class LogLimits:
+    """
+    Caps how much a single request may log.
+
+    ``max_entries`` bounds the number of entries of a request and
+    ``max_entries_per_tag`` the number of entries under one tag; new keys
+    beyond the caps are dropped, while existing entries can still be updated.
+    String and bytes values, messages and extras longer than
+    ``max_value_bytes`` (UTF-8 encoded) are cut and end with
+    "...[truncated N bytes]". Dicts, lists, tuples and sets whose repr is
+    longer are replaced by the start of their repr, ending with e.g.
+    "...[truncated dict]". Other values are kept as they are. The dropped
+    entries and truncated values are counted in the request's
+    "log_overflow".
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_entries_per_tag: Optional[int] = None,
+        max_value_bytes: Optional[int] = None,
+    ):
+        for name, limit in (
+            ("max_entries", max_entries),
+            ("max_entries_per_tag", max_entries_per_tag),
+            ("max_value_bytes", max_value_bytes),
+        ):
+            if limit is not None and limit < 0:
+                raise ValueError(f"{name} must not be negative")
+        self.max_entries = max_entries
+        self.max_entries_per_tag = max_entries_per_tag
+        self.max_value_bytes = max_value_bytes
+
+    def admit(self, logs, section: Optional[dict]) -> bool:
+        """
+        Returns True if a new entry may be added to the given tag's section
+        (None for an untagged entry) of the request logs, counting it.
+        """
+        if (self.max_entries is not None and logs.entries >= self.max_entries) or (
+            section is not None
+            and self.max_entries_per_tag is not None
+            and len(section) - ("log_level" in section) >= self.max_entries_per_tag
+        ):
+            logs.dropped_entries += 1
+            return False
+        logs.entries += 1
+        return True
+
+    def truncate(self, logs, value: Any) -> Any:
+        """
+        Returns the value cut to max_value_bytes, counting it if it was cut.
+        """
+        limit = self.max_value_bytes
+        if limit is None:
+            return value
+        if isinstance(value, str):
+            # a character takes at most 4 bytes in UTF-8
+            if len(value) * 4 <= limit:
+                return value
+            encoded = value.encode("utf-8")
+            if len(encoded) <= limit:
+                return value
+            value = encoded[:limit].decode(
+                "utf-8", "ignore"
+            ) + TRUNCATION_MARKER.format(len(encoded) - limit)
+        elif isinstance(value, (bytes, bytearray)):
+            if len(value) <= limit:
+                return value
+            value = (
+                bytes(value[:limit])
+                + TRUNCATION_MARKER.format(len(value) - limit).encode()
+            )
+        elif isinstance(value, CONTAINERS):
+            text = bounded_repr(value, limit)
+            if text is None:
+                return value
+            value = text.encode("utf-8")[:limit].decode(
+                "utf-8", "ignore"
+            ) + CONTAINER_TRUNCATION_MARKER.format(type(value).__name__)
+        else:
+            return value
+        logs.truncated_values += 1
+        return value
+
+    def truncate_extras(self, logs, extras: Optional[dict]) -> Optional[dict]:
+        """
+        Returns the extras with each value cut as truncate() does; a copy
+        when a value was cut, the given dict otherwise.
+        """
+        if self.max_value_bytes is None or not extras:
+            return extras
+        truncated = None
+        for key, value in extras.items():
+            cut = self.truncate(logs, value)
+            if cut is not value:
+                if truncated is None:
+                    truncated = dict(extras)
+                truncated[key] = cut
+        return extras if truncated is None else truncated
@@ -0,0 +1,41 @@
+import random
+
+from escalite.utils.constants import LOG_LEVEL, LOG_LEVELS
+
+
+class SamplingPolicy:
+    """
+    Decides which requests have their logs fully captured.
+
+    A request is sampled with probability ``rate`` when logging starts. An
+    unsampled request only keeps its last ``buffer_size`` entries and its
+    highest level; as soon as an entry at ``keep_level`` or above is logged,
+    the buffered entries are replayed and the request is captured in full
+    from then on. ``keep_level`` should therefore not be above the level
+    requests are escalated from. An entry that can meet an escalation rule
+    (see RuleSet.watches) switches to full capture the same way. Otherwise
+    the buffer is only replayed when the request is escalated or its logs
+    are read, never by end_logging().
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        keep_level: LOG_LEVEL = "error",
+        buffer_size: int = 20,
+    ):
+        if not 0 <= rate <= 1:
+            raise ValueError("rate must be between 0 and 1")
+        if keep_level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {keep_level}")
+        if buffer_size < 0:
+            raise ValueError("buffer_size must not be negative")
+        self.rate = rate
+        self.keep_level = keep_level
+        self.buffer_size = buffer_size
+
+    def sample(self) -> bool:
+        """
+        Returns True if a new request should be captured in full.
+        """
+        return self.rate >= 1 or random.random() < self.rate
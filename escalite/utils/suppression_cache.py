@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class SuppressionCache:
+    """
+    Suppresses repeats of the same alert fingerprint within a time window.
+
+    The first alert for a fingerprint is delivered and opens a window of
+    ``ttl`` seconds. Repeats inside the window are suppressed and counted; the
+    count is reported with the next alert delivered for that fingerprint. At
+    most ``max_size`` fingerprints are tracked, the least recently seen are
+    forgotten first.
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 10000):
+        if ttl <= 0:
+            raise ValueError("ttl must be greater than 0")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.ttl = ttl
+        self.max_size = max_size
+        # fingerprint -> [window end, suppressed count]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, fingerprint: str, now: float = None) -> Optional[int]:
+        """
+        Returns None if the alert should be suppressed, otherwise the number of
+        alerts suppressed for this fingerprint since the last delivered one.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None and now < entry[0]:
+                entry[1] += 1
+                self._entries.move_to_end(fingerprint)
+                return None
+
+            suppressed = entry[1] if entry is not None else 0
+            self._entries[fingerprint] = [now + self.ttl, 0]
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return suppressed
+
+    def suppressed_count(self, fingerprint: str) -> int:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            return entry[1] if entry is not None else 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
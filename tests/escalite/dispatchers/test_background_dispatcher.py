@@ -0,0 +1,195 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from escalite.dispatchers.background_dispatcher import (
+    BackgroundDispatcher,
+    EscalationDropped,
+)
+
+
+class RecordingNotifier:
+    def __init__(self, gate: threading.Event = None):
+        self.gate = gate
+        self.calls = []
+
+    def notify(self, message, data):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append((message, data))
+
+
+class FailingNotifier:
+    def notify(self, message, data):
+        raise RuntimeError("boom")
+
+
+def wait_until_picked_up(dispatcher, timeout=2):
+    # the worker holds the first item, so the queue slot is free again
+    deadline = time.monotonic() + timeout
+    while dispatcher._queue.qsize() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def dispatcher_factory():
+    created = []
+
+    def _factory(**kwargs):
+        dispatcher = BackgroundDispatcher(**kwargs)
+        created.append(dispatcher)
+        return dispatcher
+
+    yield _factory
+    for dispatcher in created:
+        dispatcher.shutdown(timeout=1)
+
+
+def test_submit_delivers_in_background(dispatcher_factory):
+    dispatcher = dispatcher_factory()
+    notifier = RecordingNotifier()
+    assert dispatcher.submit([notifier], "msg", {"foo": "bar"}) is True
+    assert dispatcher.flush(timeout=2) is True
+    assert notifier.calls == [("msg", {"foo": "bar"})]
+    assert dispatcher.delivered == 1
+
+
+def test_submit_snapshots_data(dispatcher_factory):
+    gate = threading.Event()
+    dispatcher = dispatcher_factory()
+    notifier = RecordingNotifier(gate)
+    data = {"api_logs": {"key": {"value": 1}}}
+    dispatcher.submit([notifier], "msg", data)
+    data["api_logs"]["key"]["value"] = 2
+    gate.set()
+    dispatcher.flush(timeout=2)
+    assert notifier.calls[0][1]["api_logs"]["key"]["value"] == 1
+
+
+def test_drop_newest_when_full(dispatcher_factory):
+    gate = threading.Event()
+    dispatcher = dispatcher_factory(queue_size=1, overflow="drop_newest")
+    notifier = RecordingNotifier(gate)
+    outcomes = []
+    dispatcher.submit([notifier], "first", {})
+    wait_until_picked_up(dispatcher)
+    assert dispatcher.submit([notifier], "second", {}) is True
+    assert (
+        dispatcher.submit(
+            [notifier], "third", {}, on_done=lambda *args: outcomes.append(args)
+        )
+        is False
+    )
+    assert len(outcomes) == 1
+    assert outcomes[0][0] is False
+    assert isinstance(outcomes[0][1], EscalationDropped)
+    gate.set()
+    dispatcher.flush(timeout=2)
+    assert [call[0] for call in notifier.calls] == ["first", "second"]
+    assert dispatcher.dropped == 1
+
+
+def test_drop_oldest_when_full(dispatcher_factory):
+    gate = threading.Event()
+    dispatcher = dispatcher_factory(queue_size=1, overflow="drop_oldest")
+    notifier = RecordingNotifier(gate)
+    outcomes = []
+    dispatcher.submit([notifier], "first", {})
+    wait_until_picked_up(dispatcher)
+    dispatcher.submit(
+        [notifier], "second", {}, on_done=lambda *args: outcomes.append(args)
+    )
+    assert dispatcher.submit([notifier], "third", {}) is True
+    assert len(outcomes) == 1
+    assert isinstance(outcomes[0][1], EscalationDropped)
+    gate.set()
+    dispatcher.flush(timeout=2)
+    assert [call[0] for call in notifier.calls] == ["first", "third"]
+    assert dispatcher.dropped == 1
+
+
+def test_block_times_out_when_full(dispatcher_factory):
+    gate = threading.Event()
+    dispatcher = dispatcher_factory(queue_size=1, overflow="block", block_timeout=0.05)
+    notifier = RecordingNotifier(gate)
+    dispatcher.submit([notifier], "first", {})
+    wait_until_picked_up(dispatcher)
+    dispatcher.submit([notifier], "second", {})
+    assert dispatcher.submit([notifier], "third", {}) is False
+    gate.set()
+    assert dispatcher.flush(timeout=2) is True
+
+
+def test_failures_are_counted_and_do_not_stop_worker(dispatcher_factory):
+    dispatcher = dispatcher_factory()
+    notifier = RecordingNotifier()
+    dispatcher.submit([FailingNotifier()], "bad", {})
+    dispatcher.submit([notifier], "good", {})
+    dispatcher.flush(timeout=2)
+    assert dispatcher.failed == 1
+    assert dispatcher.delivered == 1
+    assert notifier.calls == [("good", {})]
+
+
+def test_on_done_reports_delivery(dispatcher_factory):
+    dispatcher = dispatcher_factory()
+    results = []
+    dispatcher.submit(
+        [FailingNotifier()], "bad", {}, on_done=lambda *r: results.append(r)
+    )
+    dispatcher.submit(
+        [RecordingNotifier()], "good", {}, on_done=lambda *r: results.append(r)
+    )
+    dispatcher.flush(timeout=2)
+    assert results[0][0] is False
+    assert isinstance(results[0][1], Exception)
+    assert results[1] == (True, None)
+
+
+class HandingOnNotifier:
+    def __init__(self):
+        self.future = Future()
+
+    def notify(self, message, data):
+        return self.future
+
+
+def test_handed_on_delivery_is_counted_when_it_completes(dispatcher_factory):
+    dispatcher = dispatcher_factory()
+    notifier = HandingOnNotifier()
+    results = []
+    dispatcher.submit([notifier], "msg", {}, on_done=lambda *r: results.append(r))
+    dispatcher.flush(timeout=2)
+    assert dispatcher.delivered == 0
+    assert results == []
+
+    error = ConnectionError("down")
+    notifier.future.set_exception(error)
+    assert dispatcher.failed == 1
+    assert results == [(False, error)]
+
+
+def test_flush_returns_false_on_timeout(dispatcher_factory):
+    gate = threading.Event()
+    dispatcher = dispatcher_factory()
+    dispatcher.submit([RecordingNotifier(gate)], "msg", {})
+    assert dispatcher.flush(timeout=0.05) is False
+    gate.set()
+    assert dispatcher.flush(timeout=2) is True
+
+
+def test_shutdown_delivers_pending_and_rejects_new(dispatcher_factory):
+    dispatcher = dispatcher_factory()
+    notifier = RecordingNotifier()
+    dispatcher.submit([notifier], "msg", {})
+    assert dispatcher.shutdown(timeout=2) is True
+    assert notifier.calls == [("msg", {})]
+    with pytest.raises(RuntimeError):
+        dispatcher.submit([notifier], "late", {})
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        BackgroundDispatcher(overflow="explode")
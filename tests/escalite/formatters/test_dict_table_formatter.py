@@ -1,3 +1,5 @@
+import pytest
+
 from escalite.formatters.dict_table_formatter import DictTableFormatter
 
 
@@ -15,3 +17,69 @@ def test_dict_table_formatter():
     assert [line.rstrip() for line in result.splitlines()] == [
         line.rstrip() for line in expected.splitlines()
     ]
+
+
+def test_dict_table_formatter_empty():
+    assert DictTableFormatter().format({}) == ""
+
+
+def test_dict_table_formatter_nested_sub_tables():
+    formatter = DictTableFormatter()
+    data = {"alert_id": "abc", "api_logs": {"path": "/users", "status": 500}}
+    assert formatter.format(data).splitlines() == [
+        "Key      | Value",
+        "---------+------",
+        "alert_id | abc  ",
+        "api_logs |",
+        "  Key    | Value ",
+        "  -------+-------",
+        "  path   | /users",
+        "  status | 500   ",
+    ]
+
+
+def test_dict_table_formatter_stringifies_deeper_levels():
+    formatter = DictTableFormatter(max_depth=0)
+    result = formatter.format({"api_logs": {"path": "/users"}})
+    assert result.splitlines()[2] == "api_logs | {'path': '/users'}"
+
+
+def test_dict_table_formatter_wraps_long_and_multiline_values():
+    formatter = DictTableFormatter(max_width=5)
+    lines = formatter.format({"k": "abcdefghij", "t": "a\nb"}).splitlines()
+    assert lines[2:] == [
+        "k   | abcde",
+        "    | fghij",
+        "t   | a    ",
+        "    | b    ",
+    ]
+
+
+def test_dict_table_formatter_truncates_long_values():
+    formatter = DictTableFormatter(max_width=6, overflow="truncate")
+    lines = formatter.format({"k": "abcdefghij"}).splitlines()
+    assert lines[2] == "k   | abc..."
+
+
+def test_dict_table_formatter_invalid_settings():
+    with pytest.raises(ValueError):
+        DictTableFormatter(overflow="scroll")
+    with pytest.raises(ValueError):
+        DictTableFormatter(max_width=3)
+
+
+def test_dict_table_formatter_iter_chunks():
+    formatter = DictTableFormatter()
+    data = {f"key_{i}": "x" * 20 for i in range(20)}
+    chunks = list(formatter.iter_chunks(data, 100))
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert "\n".join(chunks) == formatter.format(data)
+
+
+def test_dict_table_formatter_iter_chunks_splits_long_lines():
+    formatter = DictTableFormatter()
+    chunks = list(formatter.iter_chunks({"k": "x" * 50}, 20))
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == formatter.format(
+        {"k": "x" * 50}
+    ).replace("\n", "")
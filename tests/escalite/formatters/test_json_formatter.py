@@ -0,0 +1,46 @@
+import json
+import uuid
+
+import pytest
+
+from escalite.formatters import json_formatter
+from escalite.formatters.json_formatter import JsonFormatter
+
+DATA = {
+    "alert_id": "abc",
+    "log_level": "error",
+    "api_logs": {"status": {"value": 500, "code": None}},
+    "id": uuid.UUID(int=1),
+    1: "int key",
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_formatter_output(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(json_formatter, "orjson", None)
+    elif json_formatter.orjson is None:
+        pytest.skip("orjson is not installed")
+    result = JsonFormatter().format(DATA)
+    assert "\n" not in result
+    assert json.loads(result) == {
+        "alert_id": "abc",
+        "log_level": "error",
+        "api_logs": {"status": {"value": 500, "code": None}},
+        "id": str(uuid.UUID(int=1)),
+        "1": "int key",
+    }
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_formatter_indent(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(json_formatter, "orjson", None)
+    elif json_formatter.orjson is None:
+        pytest.skip("orjson is not installed")
+    result = JsonFormatter(indent=True).format({"a": {"b": 1}})
+    assert result == '{\n  "a": {\n    "b": 1\n  }\n}'
+
+
+def test_json_formatter_falls_back_for_big_integers():
+    assert JsonFormatter().format({"n": 2**70}) == '{"n":%d}' % 2**70
@@ -0,0 +1,99 @@
+import copy
+import threading
+import time
+
+import pytest
+
+from escalite.formatters.base_formatter import Formatter
+from escalite.formatters.render_cache import RenderCache, VersionedLogs, render
+
+
+class CountingFormatter(Formatter):
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def format(self, data) -> str:
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"rendered {sorted(data)}"
+
+
+def test_render_cache_formats_once_per_formatter_and_version():
+    cache = RenderCache()
+    table, other = CountingFormatter(), CountingFormatter()
+    data = VersionedLogs({"alert_id": "a"}, ("a", 1))
+    assert cache.render(table, data) == "rendered ['alert_id']"
+    assert cache.render(table, VersionedLogs(data, ("a", 1))) == (
+        "rendered ['alert_id']"
+    )
+    cache.render(other, data)
+    cache.render(table, VersionedLogs({"alert_id": "a", "b": 1}, ("a", 2)))
+    assert table.calls == 2
+    assert other.calls == 1
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_render_cache_evicts_oldest():
+    cache = RenderCache(max_entries=2)
+    formatter = CountingFormatter()
+    first, second, third = (
+        VersionedLogs({"a": 1}, 1),
+        VersionedLogs({"b": 1}, 2),
+        VersionedLogs({"c": 1}, 3),
+    )
+    for data in (first, second, third, first):
+        cache.render(formatter, data)
+    assert len(cache) == 2
+    assert formatter.calls == 4
+
+
+def test_render_formats_plain_dicts_every_time():
+    formatter = CountingFormatter()
+    data = {"status": "first"}
+    assert render(formatter, data) == "rendered ['status']"
+    data["value"] = 1
+    assert render(formatter, data) == "rendered ['status', 'value']"
+    assert formatter.calls == 2
+
+
+def test_versioned_logs_keep_their_version_when_copied():
+    data = VersionedLogs({"a": {"b": 1}}, ("a", 3))
+    copied = copy.deepcopy(data)
+    assert copied == data
+    assert copied.version == ("a", 3)
+
+
+def test_render_cache_concurrent_renders_format_once():
+    cache = RenderCache()
+    formatter = CountingFormatter(delay=0.05)
+    data = VersionedLogs({"a": 1}, 1)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.render(formatter, data)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert formatter.calls == 1
+    assert results == ["rendered ['a']"] * 4
+
+
+def test_render_cache_does_not_cache_errors():
+    class FailingFormatter(Formatter):
+        calls = 0
+
+        def format(self, data) -> str:
+            self.calls += 1
+            raise ValueError("boom")
+
+    cache = RenderCache()
+    formatter = FailingFormatter()
+    data = VersionedLogs({"a": 1}, 1)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.render(formatter, data)
+    assert formatter.calls == 2
+    assert len(cache) == 0
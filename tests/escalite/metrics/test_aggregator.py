@@ -0,0 +1,108 @@
+from collections import deque
+
+import pytest
+
+from escalite.metrics.aggregator import MetricsAggregator
+from escalite.metrics.prometheus import to_prometheus
+from escalite.models.log_entry import LogEntry
+from escalite.models.request_log import RequestLog
+
+
+def make_logs(path=None, elapsed=0.2, services=None):
+    logs = RequestLog()
+    if path is not None:
+        logs.sections["api_logs"]["request_path"] = LogEntry(value=path)
+    for name, seconds in (services or {}).items():
+        entry = LogEntry(message="done")
+        entry.time_elapsed = seconds
+        logs.sections["service_logs"][name] = entry
+    logs.sections["service_logs"]["log_level"] = "info"
+    logs.time_elapsed = elapsed
+    return logs
+
+
+def test_observe_records_requests_and_services():
+    aggregator = MetricsAggregator()
+    aggregator.observe(make_logs("/orders", 0.2, {"db": 0.05, "cache": 0.001}))
+    aggregator.observe(make_logs("/orders", 0.4, {"db": 0.07}))
+    aggregator.observe(make_logs(elapsed=0.1))
+
+    requests = aggregator.request_stats()
+    assert set(requests) == {"/orders", ""}
+    assert requests["/orders"]["count"] == 2
+    assert requests["/orders"]["max"] == pytest.approx(0.4)
+    assert aggregator.service_stats("db")["count"] == 2
+    assert aggregator.service_stats("cache")["quantiles"][0.5] == pytest.approx(
+        0.001, rel=1 / 128
+    )
+    assert aggregator.service_stats("missing") == {}
+    assert set(aggregator.snapshot()) == {"requests", "services"}
+
+
+def test_observe_skips_unfinished_entries():
+    aggregator = MetricsAggregator()
+    logs = make_logs("/", elapsed=None)
+    logs.sections["service_logs"]["db"] = LogEntry(message="started")
+    aggregator.observe(logs)
+    assert aggregator.snapshot() == {"requests": {}, "services": {}}
+
+
+def test_observe_reads_unsampled_buffer():
+    aggregator = MetricsAggregator()
+    logs = RequestLog()
+    logs.buffer = deque(
+        [
+            ("db", None, "service_logs", None, "query", "info", None, 1_000_000),
+            ("request_path", "/orders", "api_logs", None, None, "info", None, 0),
+            ("cache", None, "service_logs", None, "get", "info", None, 2_000_000),
+            ("db", None, "service_logs", None, "done", "info", None, 51_000_000),
+        ]
+    )
+    logs.time_elapsed = 0.2
+    aggregator.observe(logs)
+    assert aggregator.request_stats("/orders")["count"] == 1
+    assert aggregator.service_stats("db")["max"] == pytest.approx(0.05)
+    assert aggregator.service_stats("cache") == {}
+    assert logs.buffer is not None
+
+
+def test_reset_clears_histograms():
+    aggregator = MetricsAggregator()
+    aggregator.record_service("db", 0.1)
+    aggregator.reset()
+    assert aggregator.service_stats() == {}
+
+
+def test_invalid_quantile():
+    with pytest.raises(ValueError):
+        MetricsAggregator(quantiles=(0.5, 1.5))
+
+
+def test_to_prometheus():
+    aggregator = MetricsAggregator(quantiles=(0.5, 0.99))
+    aggregator.record_request('/say "hi"', 0.25)
+    aggregator.record_service("db", 0.5)
+    text = to_prometheus(aggregator)
+    lines = text.splitlines()
+    assert "# TYPE escalite_request_duration_seconds summary" in lines
+    assert (
+        'escalite_request_duration_seconds{endpoint="/say \\"hi\\"",quantile="0.5"} '
+        "0.25" in lines
+    )
+    assert 'escalite_request_duration_seconds_count{endpoint="/say \\"hi\\""} 1' in (
+        lines
+    )
+    assert 'escalite_service_duration_seconds_sum{service="db"} 0.5' in lines
+    assert text.endswith("\n")
+
+
+def test_to_prometheus_empty_with_prefix():
+    text = to_prometheus(MetricsAggregator(), prefix="app")
+    assert text == (
+        "# HELP app_request_duration_seconds Duration of the requests logged by "
+        "escalite.\n"
+        "# TYPE app_request_duration_seconds summary\n"
+        "# HELP app_service_duration_seconds Duration of the service calls logged "
+        "by escalite.\n"
+        "# TYPE app_service_duration_seconds summary\n"
+    )
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from escalite.metrics.histogram import LatencyHistogram
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.count == 0
+    assert histogram.quantile(0.5) is None
+    assert histogram.summary() == {
+        "count": 0,
+        "sum": 0.0,
+        "min": None,
+        "max": None,
+        "quantiles": {0.5: None, 0.95: None, 0.99: None},
+    }
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for us in range(1, 101):
+        histogram.record(us / 1_000_000)
+    assert histogram.quantile(0.5) == pytest.approx(50e-6)
+    assert histogram.quantile(0.99) == pytest.approx(99e-6)
+    assert histogram.quantile(1) == pytest.approx(100e-6)
+
+
+def test_quantiles_within_relative_error():
+    histogram = LatencyHistogram(significant_bits=8)
+    values = [i * 0.0137 for i in range(1, 1001)]
+    for value in values:
+        histogram.record(value)
+    for q in (0.5, 0.95, 0.99):
+        expected = values[int(q * len(values)) - 1]
+        assert histogram.quantile(q) == pytest.approx(expected, rel=1 / 128)
+
+
+def test_bucket_bounds_cover_every_value():
+    histogram = LatencyHistogram(significant_bits=4)
+    for value in range(0, 5000):
+        index = histogram._index(value)
+        assert histogram._upper(index) >= value
+        if index:
+            assert histogram._upper(index - 1) < value
+
+
+def test_summary_and_reset():
+    histogram = LatencyHistogram()
+    histogram.record(0.25)
+    histogram.record(0.75)
+    histogram.record(-1)
+    summary = histogram.summary((0.5,))
+    assert summary["count"] == 3
+    assert summary["sum"] == pytest.approx(1.0)
+    assert summary["min"] == 0
+    assert summary["max"] == pytest.approx(0.75)
+    histogram.reset()
+    assert histogram.count == 0
+
+
+def test_concurrent_records_are_counted():
+    histogram = LatencyHistogram(shards=4)
+
+    def record():
+        for _ in range(1000):
+            histogram.record(0.001)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert histogram.count == 8000
+    assert histogram.quantile(0.5) == pytest.approx(0.001, rel=1 / 128)
+
+
+def test_threads_record_into_different_shards():
+    histogram = LatencyHistogram(shards=4)
+    threads = [
+        threading.Thread(target=histogram.record, args=(0.001,)) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    used = [shard for shard in histogram._shards if shard.count]
+    assert len(used) > 1
+    assert histogram.count == 8
+
+
+@pytest.mark.parametrize("kwargs", [{"significant_bits": 1}, {"shards": 0}])
+def test_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        LatencyHistogram(**kwargs)
@@ -0,0 +1,47 @@
+from escalite.models.log_entry import LogEntry
+
+
+def test_to_dict_has_core_fields():
+    entry = LogEntry("value", 200, "message", "warning", 1.0)
+    assert entry.to_dict() == {
+        "value": "value",
+        "code": 200,
+        "message": "message",
+        "log_level": "warning",
+        "log_time": 1.0,
+    }
+
+
+def test_extras_are_created_lazily():
+    assert LogEntry().extras is None
+    entry = LogEntry(extras={"url": "/login"})
+    assert entry.extras == {"url": "/login"}
+    assert entry.to_dict()["url"] == "/login"
+
+
+def test_timing_extras_go_to_timing_fields():
+    entry = LogEntry(extras={"start_time": 1.0, "end_time": 3.0})
+    assert entry.start_time == 1.0
+    assert entry.end_time == 3.0
+    assert entry.extras is None
+    assert entry.to_dict()["end_time"] == 3.0
+
+
+def test_update_extras_ignores_timing_keys():
+    entry = LogEntry()
+    entry.update_extras({"url": "/stop", "start_time": 5.0})
+    assert entry.extras == {"url": "/stop"}
+    assert entry.start_time is None
+
+
+def test_unset_timing_is_left_out_of_dict():
+    entry = LogEntry()
+    entry.start_time = 1.0
+    data = entry.to_dict()
+    assert data["start_time"] == 1.0
+    assert "end_time" not in data
+    assert "time_elapsed" not in data
+
+
+def test_entry_has_no_instance_dict():
+    assert not hasattr(LogEntry(), "__dict__")
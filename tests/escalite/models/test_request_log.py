@@ -0,0 +1,66 @@
+import time
+import uuid
+
+import pytest
+
+from escalite.models.log_entry import LogEntry
+from escalite.models.request_log import RequestLog
+
+
+def test_new_request_log_shape():
+    logs = RequestLog()
+    data = logs.to_dict()
+    assert uuid.UUID(data["alert_id"])
+    assert data["log_level"] == "info"
+    assert data["end_time"] is None
+    assert "time_elapsed" not in data
+    assert data["api_logs"] == {}
+    assert data["service_logs"] == {}
+    assert data["error_logs"] == {}
+
+
+def test_end_sets_time_elapsed():
+    logs = RequestLog()
+    logs.end()
+    data = logs.to_dict()
+    assert data["time_elapsed"] > 0
+    assert data["end_time"] - data["start_time"] == pytest.approx(
+        data["time_elapsed"], abs=1e-6
+    )
+
+
+def test_sections_are_converted_to_dicts():
+    logs = RequestLog()
+    logs.sections["api_logs"]["path"] = LogEntry("/home", log_time=1.0)
+    logs.sections["api_logs"]["log_level"] = "warning"
+    logs.sections["untagged"] = LogEntry("value", log_time=2.0)
+    data = logs.to_dict()
+    assert data["api_logs"]["path"]["value"] == "/home"
+    assert data["api_logs"]["log_level"] == "warning"
+    assert data["untagged"]["value"] == "value"
+
+
+def test_get_returns_fields_and_sections():
+    logs = RequestLog()
+    logs.sections["untagged"] = LogEntry("value")
+    assert logs.get("alert_id") == logs.alert_id
+    assert logs.get("log_level") == "info"
+    assert logs.get("api_logs") == {}
+    assert logs.get("untagged")["value"] == "value"
+    assert logs.get("time_elapsed") is None
+    assert logs.get("missing", "default") == "default"
+
+
+def test_alert_id_and_log_date_are_computed_on_first_access(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        RequestLog, "id_generator", staticmethod(lambda: calls.append(1) or "id-1")
+    )
+    logs = RequestLog()
+    assert calls == []
+    assert logs.alert_id == "id-1"
+    assert logs.to_dict()["alert_id"] == "id-1"
+    assert calls == [1]
+    assert logs.log_date == time.strftime(
+        "%Y-%m-%d %H:%M:%S", time.localtime(logs.start_time)
+    )
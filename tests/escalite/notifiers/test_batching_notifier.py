@@ -0,0 +1,164 @@
+import gc
+import time
+import weakref
+
+import pytest
+
+from escalite.notifiers import batching_notifier
+from escalite.notifiers.batching_notifier import BatchingNotifier
+from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.notifiers.slack_notifier import SlackNotifier
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.config = {"name": "recording"}
+        self.formatter = None
+        self.calls = []
+
+    def notify(self, message, data):
+        self.calls.append((message, data))
+
+
+class FailingNotifier(RecordingNotifier):
+    def notify(self, message, data):
+        raise ConnectionError("down")
+
+
+def make_log(alert_id, level="error", services=None):
+    return {
+        "alert_id": alert_id,
+        "log_level": level,
+        "api_logs": {},
+        "service_logs": services or {},
+        "error_logs": {},
+    }
+
+
+def test_sends_digest_when_max_size_reached():
+    inner = RecordingNotifier()
+    notifier = BatchingNotifier(inner, window=60, max_size=3)
+    notifier.notify("first", make_log("a1"))
+    notifier.notify("second", make_log("a2"))
+    assert inner.calls == []
+
+    notifier.notify("third", make_log("a3"))
+    assert len(inner.calls) == 1
+    message, data = inner.calls[0]
+    assert message == "Escalite digest: 3 escalations"
+    assert data["subject"] == message
+    assert [k for k in data if k != "subject"] == ["a1", "a2", "a3"]
+    assert notifier.pending == 0
+
+
+def test_sends_digest_when_window_expires():
+    inner = RecordingNotifier()
+    notifier = BatchingNotifier(inner, window=0.05, max_size=10)
+    notifier.notify("first", make_log("a1"))
+    notifier.notify("second", make_log("a2"))
+    deadline = time.monotonic() + 2
+    while not inner.calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(inner.calls) == 1
+    assert inner.calls[0][0] == "Escalite digest: 2 escalations"
+
+
+def test_single_escalation_is_delivered_unchanged():
+    inner = RecordingNotifier()
+    notifier = BatchingNotifier(inner, window=60, max_size=10)
+    data = make_log("a1")
+    notifier.notify("only", data)
+    notifier.flush()
+    assert inner.calls == [("only", data)]
+
+
+def test_notify_completes_once_the_batch_is_delivered():
+    inner = RecordingNotifier()
+    notifier = BatchingNotifier(inner, window=60, max_size=5)
+    first = notifier.notify("first", make_log("a1"))
+    second = notifier.notify("second", make_log("a2"))
+    assert not first.done()
+    notifier.flush()
+    assert first.result() is None
+    assert second.result() is None
+
+
+def test_failed_batch_fails_every_escalation():
+    notifier = BatchingNotifier(FailingNotifier(), window=60, max_size=5)
+    delivered = notifier.notify("first", make_log("a1"))
+    with pytest.raises(ConnectionError):
+        notifier.flush()
+    assert isinstance(delivered.exception(), ConnectionError)
+
+
+def test_flush_without_pending_does_nothing():
+    inner = RecordingNotifier()
+    BatchingNotifier(inner).flush()
+    assert inner.calls == []
+
+
+def test_summarize_collects_level_services_and_errors():
+    data = make_log(
+        "a1",
+        services={
+            "auth": {"log_level": "error", "error_trace": "Traceback"},
+            "db": {"log_level": "info", "message": "ok"},
+            "log_level": "error",
+        },
+    )
+    data["api_logs"] = {"status": {"log_level": "critical", "message": "500"}}
+    summary = BatchingNotifier.summarize("msg", data)
+    assert summary == {
+        "message": "msg",
+        "level": "error",
+        "services": "auth, db",
+        "errors": "status: 500; auth: Traceback",
+    }
+
+
+def test_wrapper_exposes_inner_config():
+    inner = RecordingNotifier()
+    notifier = BatchingNotifier(inner)
+    assert notifier.config is inner.config
+    assert notifier.unwrap() is inner
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        BatchingNotifier(RecordingNotifier(), window=0)
+    with pytest.raises(ValueError):
+        BatchingNotifier(RecordingNotifier(), max_size=0)
+
+
+def test_factory_wraps_notifier_with_batch_config():
+    notifiers = NotifierFactory.create_notifiers(
+        {
+            "notifiers": [
+                {
+                    "type": "slack",
+                    "config": {
+                        "webhook_url": "https://hooks.slack.com/services/xxx",
+                        "batch": {"window": 30, "max_size": 5},
+                    },
+                }
+            ]
+        }
+    )
+    assert isinstance(notifiers[0], BatchingNotifier)
+    assert isinstance(notifiers[0].notifier, SlackNotifier)
+    assert notifiers[0].window == 30
+    assert notifiers[0].max_size == 5
+
+
+def test_pending_escalations_are_flushed_at_exit():
+    inner = RecordingNotifier()
+    notifier = BatchingNotifier(inner, window=60, max_size=10)
+    notifier.notify("first", make_log("a1"))
+    batching_notifier._flush_all()
+    assert [call[0] for call in inner.calls] == ["first"]
+
+
+def test_replaced_notifiers_can_be_collected():
+    notifier = weakref.ref(BatchingNotifier(RecordingNotifier()))
+    gc.collect()
+    assert notifier() is None
@@ -2,11 +2,13 @@ import pytest
 from unittest.mock import patch, MagicMock
 
 from escalite.notifiers.email_notifier import EmailNotifier
+from escalite.notifiers.smtp_pool import SMTPConnectionPool
 
 
 @pytest.fixture
 def email_notifier():
-    return EmailNotifier()
+    yield EmailNotifier()
+    SMTPConnectionPool.close_all()
 
 
 def test_set_config(email_notifier):
@@ -39,7 +41,7 @@ def test_notify_sends_email(mock_smtp, email_notifier):
     }
     email_notifier.set_config(config)
     mock_server = MagicMock()
-    mock_smtp.return_value.__enter__.return_value = mock_server
+    mock_smtp.return_value = mock_server
 
     email_notifier.notify("Hello", {"subject": "Test"})
 
@@ -47,3 +49,24 @@ def test_notify_sends_email(mock_smtp, email_notifier):
     mock_server.starttls.assert_called()
     mock_server.login.assert_called_with("sender@example.com", "password")
     mock_server.sendmail.assert_called()
+
+
+@patch("smtplib.SMTP")
+def test_notify_reuses_connection(mock_smtp, email_notifier):
+    config = {
+        "smtp_server": "smtp.example.com",
+        "smtp_port": 587,
+        "sender_email": "sender@example.com",
+        "sender_password": "password",
+        "recipient_emails": "recipient@example.com",
+    }
+    email_notifier.set_config(config)
+    mock_server = MagicMock()
+    mock_smtp.return_value = mock_server
+
+    email_notifier.notify("Hello", {"subject": "Test"})
+    email_notifier.notify("Hello again", {"subject": "Test"})
+
+    mock_smtp.assert_called_once()
+    mock_server.login.assert_called_once()
+    assert mock_server.sendmail.call_count == 2
@@ -0,0 +1,46 @@
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from escalite.notifiers.http_transport import HttpTransport
+
+
+@pytest.fixture(autouse=True)
+def close_transports():
+    yield
+    HttpTransport.close_all()
+
+
+def test_for_config_shares_transport_for_same_settings():
+    first = HttpTransport.for_config({"webhook_url": "https://a"})
+    second = HttpTransport.for_config({"bot_token": "x", "chat_id": "y"})
+    assert first is second
+
+
+def test_for_config_separates_different_settings():
+    default = HttpTransport.for_config({})
+    tuned = HttpTransport.for_config({"pool_size": 50, "read_timeout": 2})
+    assert default is not tuned
+    assert tuned.timeout == (HttpTransport.DEFAULT_CONNECT_TIMEOUT, 2)
+
+
+def test_adapter_uses_configured_pool_and_retries():
+    transport = HttpTransport.for_config({"pool_size": 4, "max_retries": 2})
+    adapter = transport.session.get_adapter("https://hooks.slack.com")
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
+
+
+def test_post_applies_default_timeout():
+    transport = HttpTransport.for_config({"connect_timeout": 1, "read_timeout": 5})
+    with patch.object(transport.session, "post", return_value=MagicMock()) as post:
+        transport.post("https://hooks.slack.com", json={"text": "hi"})
+    post.assert_called_once_with(
+        "https://hooks.slack.com", json={"text": "hi"}, timeout=(1, 5)
+    )
+
+
+def test_close_all_drops_shared_transports():
+    first = HttpTransport.for_config({})
+    HttpTransport.close_all()
+    assert HttpTransport.for_config({}) is not first
@@ -1,5 +1,13 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from escalite.formatters.json_formatter import JsonFormatter
 from escalite.notifiers.base_notifier import BaseNotifier
 from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.notifiers.routing import Route
 
 
 class DummyNotifier:
@@ -24,6 +32,35 @@ def test_notify_factory_calls_all():
     assert n1.last_data == {"foo": "bar"}
 
 
+def test_anotify_factory_runs_notifiers_concurrently():
+    barrier = threading.Barrier(2, timeout=2)
+
+    class BlockingNotifier(BaseNotifier):
+        def __init__(self):
+            self.called = False
+
+        def set_config(self, config: dict):
+            pass
+
+        def notify(self, message: str, data: dict):
+            # both notifiers must be running at the same time to pass the barrier
+            barrier.wait()
+            self.called = True
+
+    n1 = BlockingNotifier()
+    n2 = BlockingNotifier()
+    asyncio.run(NotifierFactory.anotify([n1, n2], "msg", {"foo": "bar"}))
+    assert n1.called
+    assert n2.called
+
+
+def test_anotify_factory_falls_back_to_notify():
+    n1 = DummyNotifier()
+    asyncio.run(NotifierFactory.anotify([n1], "msg", {"foo": "bar"}))
+    assert n1.called
+    assert n1.last_data == {"foo": "bar"}
+
+
 def test_create_notifiers():
     config = {
         "notifiers": [
@@ -48,6 +85,30 @@ def test_create_notifiers():
     assert isinstance(notifiers[2], NotifierFactory.NOTIFIER_MAP["telegram"])
 
 
+def test_create_notifiers_with_formatter():
+    config = {
+        "notifiers": [
+            {"type": "slack", "config": {"webhook_url": "a", "formatter": "json"}},
+            {"type": "slack", "config": {"webhook_url": "b", "formatter": "json"}},
+        ]
+    }
+    notifiers = NotifierFactory.create_notifiers(config)
+    assert isinstance(notifiers[0].formatter, JsonFormatter)
+    assert notifiers[0].formatter is notifiers[1].formatter
+
+    config["notifiers"][0]["config"]["formatter"] = "xml"
+    with pytest.raises(ValueError):
+        NotifierFactory.create_notifiers(config)
+
+
+def test_add_formatter_map():
+    formatter = JsonFormatter(indent=True)
+    NotifierFactory.add_formatter_map("pretty_json", formatter)
+    assert NotifierFactory.FORMATTER_MAP["pretty_json"] is formatter
+    with pytest.raises(ValueError):
+        NotifierFactory.add_formatter_map("invalid", object())
+
+
 def test_add_notifier_map_valid_notifier_type():
     class MockNotifier(BaseNotifier):
         def set_config(self, config: dict):
@@ -74,3 +135,132 @@ def test_add_notifier_map_invalid_notifier_type():
             == "Notifier class <class 'tests.escalite.notifiers.test_notifier_factory"
             ".test_add_notifier_map_invalid_notifier_type.<locals>.InvalidNotifier'> must inherit from BaseNotifier"
         )
+
+
+class SlowNotifier(DummyNotifier):
+    def __init__(self, delay, config=None):
+        super().__init__()
+        self.delay = delay
+        self.config = config
+
+    def notify(self, message, data):
+        time.sleep(self.delay)
+        super().notify(message, data)
+
+
+class FailingNotifier:
+    def notify(self, message, data):
+        raise RuntimeError("channel down")
+
+
+def test_notify_parallel_isolates_failures():
+    n1 = DummyNotifier()
+    n2 = DummyNotifier()
+    result = NotifierFactory.notify(
+        [n1, FailingNotifier(), n2], "msg", {"foo": "bar"}, parallel=True
+    )
+    assert n1.called
+    assert n2.called
+    assert not result.ok
+    assert len(result) == 3
+    assert [r.success for r in result] == [True, False, True]
+    assert isinstance(result.failed[0].error, RuntimeError)
+    assert all(r.latency >= 0 for r in result)
+
+
+def test_notify_parallel_wall_time_is_slowest_notifier():
+    notifiers = [SlowNotifier(0.2) for _ in range(4)]
+    started = time.perf_counter()
+    result = NotifierFactory.notify_parallel(notifiers, "msg", {})
+    elapsed = time.perf_counter() - started
+    assert result.ok
+    assert elapsed < 0.6
+
+
+def test_notify_parallel_times_out_slow_notifier():
+    fast = DummyNotifier()
+    slow = SlowNotifier(0.5)
+    result = NotifierFactory.notify_parallel([slow, fast], "msg", {}, timeout=0.05)
+    assert [r.success for r in result] == [False, True]
+    assert isinstance(result.results[0].error, TimeoutError)
+
+
+def test_notify_parallel_per_notifier_timeout_from_config():
+    slow = SlowNotifier(0.2, config={"notify_timeout": 1})
+    result = NotifierFactory.notify_parallel([slow], "msg", {}, timeout=0.01)
+    assert result.ok
+
+
+def test_create_notifiers_with_route():
+    config = {
+        "notifiers": [
+            {"type": "slack", "config": {"webhook_url": "a"}},
+            {
+                "type": "slack",
+                "config": {
+                    "webhook_url": "b",
+                    "route": {"min_level": "critical"},
+                    "retry": {"max_attempts": 2},
+                },
+            },
+        ]
+    }
+    notifiers = NotifierFactory.create_notifiers(config)
+    assert notifiers[0].route is None
+    assert notifiers[1].route.min_level == "critical"
+
+
+def test_notify_skips_notifiers_outside_their_route():
+    everything = DummyNotifier()
+    critical = DummyNotifier()
+    critical.route = Route(min_level="critical")
+    NotifierFactory.notify([everything, critical], "msg", {"log_level": "error"})
+    assert everything.called
+    assert not critical.called
+
+    NotifierFactory.notify([critical, everything], "msg", {"log_level": "critical"})
+    assert critical.called
+
+    skipped = DummyNotifier()
+    skipped.route = Route(min_level="critical")
+    result = NotifierFactory.notify(
+        [skipped], "msg", {"log_level": "info"}, parallel=True
+    )
+    assert result.ok
+    assert not skipped.called
+    asyncio.run(NotifierFactory.anotify([skipped], "msg", {"log_level": "info"}))
+    assert not skipped.called
+
+
+def test_route_keeps_the_list_when_every_notifier_matches():
+    notifiers = [DummyNotifier(), DummyNotifier()]
+    assert NotifierFactory.route(notifiers, {}) is notifiers
+
+
+def test_anotify_isolates_failures():
+    n1 = DummyNotifier()
+    n2 = DummyNotifier()
+    result = asyncio.run(
+        NotifierFactory.anotify([n1, FailingNotifier(), n2], "msg", {"foo": "bar"})
+    )
+    assert n1.called
+    assert n2.called
+    assert [r.success for r in result] == [True, False, True]
+    assert isinstance(result.failed[0].error, RuntimeError)
+
+
+def test_anotify_times_out_slow_notifier():
+    class AsyncSlowNotifier(DummyNotifier):
+        config = {"notify_timeout": 0.05}
+
+        async def anotify(self, message, data):
+            await asyncio.sleep(1)
+
+    fast = DummyNotifier()
+    started = time.perf_counter()
+    result = asyncio.run(
+        NotifierFactory.anotify([AsyncSlowNotifier(), fast], "msg", {}, timeout=5)
+    )
+    assert time.perf_counter() - started < 0.5
+    assert [r.success for r in result] == [False, True]
+    assert isinstance(result.results[0].error, TimeoutError)
@@ -0,0 +1,83 @@
+from escalite.notifiers.notifier_registry import NotifierRegistry
+from escalite.notifiers.slack_notifier import SlackNotifier
+
+SLACK_CONFIG = {
+    "notifiers": [
+        {
+            "type": "slack",
+            "config": {"webhook_url": "https://hooks.slack.com/services/xxx"},
+        }
+    ]
+}
+
+
+def test_get_notifiers_returns_cached_instances():
+    registry = NotifierRegistry()
+    first = registry.get_notifiers(SLACK_CONFIG)
+    second = registry.get_notifiers(SLACK_CONFIG)
+    assert first is second
+    assert isinstance(first[0], SlackNotifier)
+
+
+def test_get_notifiers_matches_equal_configs():
+    registry = NotifierRegistry()
+    first = registry.get_notifiers(SLACK_CONFIG)
+    equal = {
+        "notifiers": [
+            {
+                "config": {"webhook_url": "https://hooks.slack.com/services/xxx"},
+                "type": "slack",
+            }
+        ]
+    }
+    assert registry.get_notifiers(equal) is first
+    assert len(registry) == 1
+
+
+def test_get_notifiers_builds_new_instances_for_other_config():
+    registry = NotifierRegistry()
+    first = registry.get_notifiers(SLACK_CONFIG)
+    other = {
+        "notifiers": [
+            {"type": "slack", "config": {"webhook_url": "https://other"}},
+        ]
+    }
+    assert registry.get_notifiers(other) is not first
+    assert len(registry) == 2
+
+
+def test_reload_after_in_place_change():
+    registry = NotifierRegistry()
+    configs = {
+        "notifiers": [
+            {"type": "slack", "config": {"webhook_url": "https://old"}},
+        ]
+    }
+    first = registry.get_notifiers(configs)
+    configs["notifiers"][0]["config"]["webhook_url"] = "https://new"
+    reloaded = registry.reload(configs)
+    assert reloaded is not first
+    assert reloaded[0].config["webhook_url"] == "https://new"
+
+
+def test_invalidate_all():
+    registry = NotifierRegistry()
+    first = registry.get_notifiers(SLACK_CONFIG)
+    registry.invalidate()
+    assert len(registry) == 0
+    assert registry.get_notifiers(SLACK_CONFIG) is not first
+
+
+def test_oldest_entries_are_evicted():
+    registry = NotifierRegistry(max_entries=2)
+    for i in range(3):
+        registry.get_notifiers(
+            {"notifiers": [{"type": "slack", "config": {"webhook_url": str(i)}}]}
+        )
+    assert len(registry) == 2
+
+
+def test_config_key_is_order_independent():
+    assert NotifierRegistry.config_key({"a": 1, "b": 2}) == NotifierRegistry.config_key(
+        {"b": 2, "a": 1}
+    )
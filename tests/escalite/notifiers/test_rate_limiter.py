@@ -0,0 +1,196 @@
+import threading
+import time
+from concurrent.futures import Future
+from email.utils import formatdate
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from escalite.notifiers.batching_notifier import BatchingNotifier
+from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.notifiers.rate_limiter import (
+    RateLimitExceeded,
+    RateLimitedNotifier,
+    TokenBucket,
+    retry_after_seconds,
+)
+from escalite.utils.background import mark_background
+
+
+class RecordingNotifier:
+    def __init__(self, failures=None):
+        self.config = {}
+        self.formatter = None
+        self.failures = list(failures or [])
+        self.calls = []
+
+    def notify(self, message, data):
+        self.calls.append(message)
+        if self.failures:
+            raise self.failures.pop(0)
+
+
+def on_worker(call, awaited=False):
+    # runs call on a background delivery thread
+    outcome = []
+
+    def run():
+        mark_background(awaited)
+        outcome.append(call())
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join(5)
+    return outcome[0]
+
+
+def http_error(status, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return requests.HTTPError(response=response)
+
+
+def test_token_bucket_allows_burst_then_refuses():
+    bucket = TokenBucket(rate=1, burst=2)
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate=20, burst=1)
+    assert bucket.acquire(timeout=0)
+    started = time.monotonic()
+    assert bucket.acquire(timeout=1)
+    assert time.monotonic() - started >= 0.03
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(rate=100, burst=5)
+    bucket.pause(10)
+    assert not bucket.acquire(timeout=0.01)
+
+
+def test_token_bucket_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_drop_mode_drops_when_bucket_empty():
+    inner = RecordingNotifier()
+    notifier = RateLimitedNotifier(inner, rate=0.001, burst=1, mode="drop")
+    assert notifier.notify("first", {}) is None
+    dropped = notifier.notify("second", {})
+    assert inner.calls == ["first"]
+    assert notifier.metrics["sent"] == 1
+    assert notifier.metrics["dropped"] == 1
+    assert isinstance(dropped.exception(), RateLimitExceeded)
+
+
+def test_dropped_escalation_is_reported_as_not_delivered():
+    inner = RecordingNotifier()
+    other = RecordingNotifier()
+    notifier = RateLimitedNotifier(inner, rate=0.001, burst=1, mode="drop")
+    assert NotifierFactory.notify([notifier, other], "first", {}) is None
+    result = NotifierFactory.notify([notifier, other], "second", {})
+    assert other.calls == ["first", "second"]
+    assert [r.success for r in result] == [False, True]
+    assert isinstance(result.failed[0].error, RateLimitExceeded)
+
+
+def test_queue_mode_waits_for_token():
+    inner = RecordingNotifier()
+    notifier = RateLimitedNotifier(inner, rate=20, burst=1, mode="queue")
+    on_worker(lambda: notifier.notify("first", {}))
+    assert on_worker(lambda: notifier.notify("second", {})) is None
+    assert inner.calls == ["first", "second"]
+    assert notifier.metrics["waited"] == 1
+
+
+def test_queue_mode_hands_waiting_off_the_calling_thread():
+    inner = RecordingNotifier()
+    notifier = RateLimitedNotifier(inner, rate=20, burst=1, mode="queue")
+    assert notifier.notify("first", {}) is None
+    pending = notifier.notify("second", {})
+    assert isinstance(pending, Future)
+    pending.result(timeout=2)
+    assert inner.calls == ["first", "second"]
+    assert notifier.metrics["waited"] == 1
+
+    # the parallel fan-out is awaited by the request, so it hands off too
+    awaited = on_worker(lambda: notifier.notify("third", {}), awaited=True)
+    assert isinstance(awaited, Future)
+    awaited.result(timeout=2)
+
+
+def test_queue_mode_drops_after_max_wait():
+    inner = RecordingNotifier()
+    notifier = RateLimitedNotifier(inner, rate=0.001, burst=1, max_wait=0.01)
+    notifier.notify("first", {})
+    with pytest.raises(RateLimitExceeded):
+        notifier.notify("second", {}).result(timeout=2)
+    assert inner.calls == ["first"]
+    assert notifier.metrics["dropped"] == 1
+
+
+def test_429_pauses_bucket_and_retries_in_queue_mode():
+    inner = RecordingNotifier(failures=[http_error(429, {"Retry-After": "0.05"})])
+    notifier = RateLimitedNotifier(inner, rate=100, burst=5)
+    started = time.monotonic()
+    notifier.notify("msg", {}).result(timeout=2)
+    assert inner.calls == ["msg", "msg"]
+    assert time.monotonic() - started >= 0.04
+    assert notifier.metrics["throttled"] == 1
+    assert notifier.metrics["sent"] == 1
+
+
+def test_429_is_raised_in_drop_mode():
+    inner = RecordingNotifier(failures=[http_error(429, {"Retry-After": "5"})])
+    notifier = RateLimitedNotifier(inner, rate=100, burst=5, mode="drop")
+    with pytest.raises(requests.HTTPError):
+        notifier.notify("msg", {})
+    assert not notifier.bucket.acquire(timeout=0)
+
+
+def test_other_errors_are_raised():
+    inner = RecordingNotifier(failures=[http_error(500)])
+    notifier = RateLimitedNotifier(inner, rate=100)
+    with pytest.raises(requests.HTTPError):
+        notifier.notify("msg", {})
+    assert notifier.metrics["throttled"] == 0
+
+
+def test_retry_after_seconds_parses_delay_and_date():
+    assert retry_after_seconds(http_error(429, {"Retry-After": "3"})) == 3
+    later = formatdate(time.time() + 60, usegmt=True)
+    assert 55 < retry_after_seconds(http_error(429, {"Retry-After": later})) <= 60
+    assert retry_after_seconds(http_error(429)) is None
+    assert retry_after_seconds(ValueError()) is None
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        RateLimitedNotifier(RecordingNotifier(), rate=1, mode="sometimes")
+
+
+def test_factory_wraps_rate_limit_inside_batch():
+    notifiers = NotifierFactory.create_notifiers(
+        {
+            "notifiers": [
+                {
+                    "type": "telegram",
+                    "config": {
+                        "bot_token": "xxx",
+                        "chat_id": "yyy",
+                        "rate_limit": {"rate": 1, "burst": 20},
+                        "batch": {"window": 10},
+                    },
+                }
+            ]
+        }
+    )
+    assert isinstance(notifiers[0], BatchingNotifier)
+    assert isinstance(notifiers[0].notifier, RateLimitedNotifier)
+    assert notifiers[0].notifier.bucket.capacity == 20
@@ -0,0 +1,174 @@
+import smtplib
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.notifiers.retry_policy import RetryingNotifier, RetryPolicy
+from escalite.utils.background import mark_background
+
+
+class FlakyNotifier:
+    def __init__(self, failures):
+        self.config = {}
+        self.formatter = None
+        self.failures = list(failures)
+        self.calls = 0
+        self.threads = []
+        self.done = threading.Event()
+
+    def notify(self, message, data):
+        self.calls += 1
+        self.threads.append(threading.current_thread().name)
+        if self.failures:
+            raise self.failures.pop(0)
+        self.done.set()
+
+
+def http_error(status, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return requests.HTTPError(response=response)
+
+
+def fast_policy(**kwargs):
+    return RetryPolicy(backoff_base=0.001, backoff_cap=0.01, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "error, retryable",
+    [
+        (http_error(503), True),
+        (http_error(429), True),
+        (http_error(400), False),
+        (requests.ConnectionError(), True),
+        (requests.Timeout(), True),
+        (smtplib.SMTPServerDisconnected(), True),
+        (smtplib.SMTPDataError(451, b"try later"), True),
+        (smtplib.SMTPDataError(554, b"rejected"), False),
+        (smtplib.SMTPRecipientsRefused({}), False),
+        (ValueError(), False),
+    ],
+)
+def test_is_retryable(error, retryable):
+    assert RetryPolicy().is_retryable(error) is retryable
+
+
+def test_delay_grows_exponentially_and_is_capped():
+    policy = RetryPolicy(backoff_base=1, backoff_cap=5, jitter=False)
+    assert [policy.delay(n) for n in range(1, 5)] == [1, 2, 4, 5]
+
+
+def test_delay_with_jitter_stays_within_bounds():
+    policy = RetryPolicy(backoff_base=1, backoff_cap=5)
+    assert all(0 <= policy.delay(3) <= 4 for _ in range(20))
+
+
+def test_delay_honours_retry_after():
+    policy = RetryPolicy(backoff_base=0.1, backoff_cap=10, jitter=False)
+    assert policy.delay(1, http_error(429, {"Retry-After": "3"})) == 3
+
+
+def test_call_retries_until_success():
+    notifier = FlakyNotifier([http_error(503), requests.ConnectionError()])
+    fast_policy(max_attempts=3).call(notifier.notify, "msg", {})
+    assert notifier.calls == 3
+
+
+def test_call_raises_after_max_attempts():
+    notifier = FlakyNotifier([http_error(503)] * 3)
+    with pytest.raises(requests.HTTPError):
+        fast_policy(max_attempts=2).call(notifier.notify, "msg", {})
+    assert notifier.calls == 2
+
+
+def test_call_does_not_retry_permanent_errors():
+    notifier = FlakyNotifier([http_error(404)])
+    with pytest.raises(requests.HTTPError):
+        fast_policy().call(notifier.notify, "msg", {})
+    assert notifier.calls == 1
+
+
+def test_retrying_notifier_retries_off_the_calling_thread():
+    inner = FlakyNotifier([http_error(503)])
+    notifier = RetryingNotifier(inner, fast_policy())
+    notifier.notify("msg", {})
+    assert inner.done.wait(2)
+    assert inner.calls == 2
+    assert inner.threads[0] == threading.current_thread().name
+    assert inner.threads[1].startswith("escalite-retry")
+
+
+def test_scheduled_retry_is_reported_as_pending():
+    inner = FlakyNotifier([http_error(503), http_error(503), http_error(503)])
+    notifier = RetryingNotifier(inner, fast_policy())
+    result = NotifierFactory.notify([notifier], "msg", {})
+    assert not result.ok
+    assert result.failed == []
+    assert len(result.pending) == 1
+
+    outcome = []
+    done = threading.Event()
+    result.when_done(lambda *args: outcome.append(args) or done.set())
+    assert done.wait(2)
+    [(delivered, error)] = outcome
+    assert not delivered
+    assert isinstance(error, requests.HTTPError)
+
+
+def test_parallel_fan_out_retries_in_place():
+    inner = FlakyNotifier([http_error(503)])
+    notifier = RetryingNotifier(inner, fast_policy())
+    result = NotifierFactory.notify([notifier], "msg", {}, parallel=True)
+    assert result.ok
+    assert inner.calls == 2
+    assert inner.threads[0] == inner.threads[1]
+    assert inner.threads[0].startswith("escalite-notify")
+
+
+def test_retrying_notifier_raises_permanent_errors():
+    inner = FlakyNotifier([http_error(401)])
+    notifier = RetryingNotifier(inner, fast_policy())
+    with pytest.raises(requests.HTTPError):
+        notifier.notify("msg", {})
+
+
+def test_retrying_notifier_retries_in_place_on_background_thread():
+    inner = FlakyNotifier([http_error(503), http_error(503)])
+    notifier = RetryingNotifier(inner, fast_policy())
+
+    def run():
+        mark_background()
+        notifier.notify("msg", {})
+
+    thread = threading.Thread(target=run, name="worker")
+    thread.start()
+    thread.join(2)
+    assert inner.threads == ["worker", "worker", "worker"]
+
+
+def test_invalid_max_attempts():
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
+
+
+def test_factory_wraps_notifier_with_retry_config():
+    notifiers = NotifierFactory.create_notifiers(
+        {
+            "notifiers": [
+                {
+                    "type": "slack",
+                    "config": {
+                        "webhook_url": "https://hooks.slack.com/services/xxx",
+                        "retry": {"max_attempts": 5, "retry_on_status": [503]},
+                    },
+                }
+            ]
+        }
+    )
+    assert isinstance(notifiers[0], RetryingNotifier)
+    assert notifiers[0].policy.max_attempts == 5
+    assert notifiers[0].policy.retry_on_status == {503}
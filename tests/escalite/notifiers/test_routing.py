@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+
+from escalite.notifiers.routing import Route, parse_hours
+
+DATA = {
+    "log_level": "warning",
+    "api_logs": {"status": {"value": 500, "log_level": "warning"}},
+    "service_logs": {
+        "log_level": "error",
+        "payments": {"message": "declined", "log_level": "error"},
+        "cache": {"message": "miss", "log_level": "info"},
+    },
+    "error_logs": {},
+}
+
+# a Wednesday
+NOON = datetime(2026, 10, 14, 12, 0)
+
+
+def test_empty_route_matches_everything():
+    assert Route().matches({})
+
+
+@pytest.mark.parametrize(
+    "min_level, data, expected",
+    [
+        ("warning", DATA, True),
+        ("error", DATA, False),
+        ("error", {**DATA, "escalation_level": "critical"}, True),
+        ("info", {}, False),
+    ],
+)
+def test_min_level(min_level, data, expected):
+    assert Route(min_level=min_level).matches(data) is expected
+
+
+def test_tags():
+    assert Route(tags=["api_logs"]).matches(DATA)
+    assert not Route(tags=["error_logs", "missing"]).matches(DATA)
+    assert not Route(min_level="info", tags=["api_logs"]).matches(
+        {**DATA, "api_logs": {"status": {"log_level": "debug"}}}
+    )
+
+
+def test_services():
+    assert Route(services=["cache"]).matches(DATA)
+    assert not Route(services=["cache"], min_level="warning").matches(DATA)
+    assert Route(services=["payments"], min_level="warning").matches(DATA)
+    assert not Route(services=["orders"]).matches(DATA)
+    assert Route(services=["orders"]).matches(
+        {"aggregate_alerts": [{"group": "orders", "state": "firing"}]}
+    )
+
+
+@pytest.mark.parametrize(
+    "hours, time, expected",
+    [
+        ("09:00-18:00", "12:00", True),
+        ("09:00-18:00", "18:00", False),
+        ("09:00-18:00", "08:59", False),
+        ("22:00-06:00", "23:30", True),
+        ("22:00-06:00", "05:59", True),
+        ("22:00-06:00", "12:00", False),
+        ("00:00-24:00", "23:59", True),
+    ],
+)
+def test_hours(hours, time, expected):
+    hour, minute = map(int, time.split(":"))
+    now = NOON.replace(hour=hour, minute=minute)
+    assert Route(hours=hours).matches(DATA, now=now) is expected
+
+
+def test_days():
+    assert Route(days=["wed"]).matches(DATA, now=NOON)
+    assert not Route(days=["sat", "sun"]).matches(DATA, now=NOON)
+
+
+def test_timezone():
+    route = Route(hours="00:00-24:00", timezone="UTC")
+    assert route.timezone is not None
+    assert route.matches(DATA)
+
+
+@pytest.mark.parametrize("hours", ["9-17", "09:00", "25:00-26:00", "09:60-10:00", 9])
+def test_invalid_hours(hours):
+    with pytest.raises(ValueError):
+        parse_hours(hours)
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"min_level": "fatal"}, {"days": ["monday"]}, {"hours": "x"}]
+)
+def test_invalid_route(kwargs):
+    with pytest.raises(ValueError):
+        Route(**kwargs)
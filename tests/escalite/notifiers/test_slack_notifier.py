@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -29,7 +31,20 @@ def test_notify_without_config_raises(slack_notifier):
         slack_notifier.notify("Test message", {})
 
 
-@patch("escalite.notifiers.slack_notifier.requests.post")
+@patch("escalite.notifiers.http_transport.requests.Session.post")
+def test_notify_renders_a_reused_dict_again(mock_post, slack_notifier):
+    slack_notifier.set_config({"webhook_url": "https://hooks.slack.com/services/x"})
+    data = {"status": "first"}
+    slack_notifier.notify("Hello", data)
+    data["status"] = "second"
+    slack_notifier.notify("Hello", data)
+    first, second = (call.kwargs["json"]["text"] for call in mock_post.call_args_list)
+    assert "first" in first
+    assert "second" in second
+    assert "first" not in second
+
+
+@patch("escalite.notifiers.http_transport.requests.Session.post")
 def test_notify_sends_request(mock_post, slack_notifier):
     config = {"webhook_url": "https://hooks.slack.com/services/xxx/yyy/zzz"}
     slack_notifier.set_config(config)
@@ -41,9 +56,23 @@ def test_notify_sends_request(mock_post, slack_notifier):
     args, kwargs = mock_post.call_args
     assert args[0] == config["webhook_url"]
     assert "Hello" in kwargs["json"]["text"]
+    assert kwargs["timeout"] == (3.05, 10)
     mock_response.raise_for_status.assert_called_once()
 
 
+@patch("escalite.notifiers.http_transport.requests.Session.post")
+def test_anotify_sends_request(mock_post, slack_notifier):
+    config = {"webhook_url": "https://hooks.slack.com/services/xxx/yyy/zzz"}
+    slack_notifier.set_config(config)
+    mock_post.return_value = MagicMock()
+
+    asyncio.run(slack_notifier.anotify("Hello", {"foo": "bar"}))
+    mock_post.assert_called_once()
+    args, kwargs = mock_post.call_args
+    assert args[0] == config["webhook_url"]
+    assert "Hello" in kwargs["json"]["text"]
+
+
 def test_init_with_config_sets_config_and_default_formatter():
     config = {"webhook_url": "https://hooks.slack.com/services/xxx"}
     notifier = SlackNotifier(config=config)
@@ -0,0 +1,96 @@
+import smtplib
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from escalite.notifiers.smtp_pool import SMTPConnectionPool, default_ssl_context
+
+CONFIG = {
+    "smtp_server": "smtp.example.com",
+    "smtp_port": 587,
+    "sender_email": "sender@example.com",
+    "sender_password": "password",
+    "use_tls": True,
+}
+
+
+@pytest.fixture(autouse=True)
+def close_pools():
+    yield
+    SMTPConnectionPool.close_all()
+
+
+@pytest.fixture
+def mock_smtp():
+    with patch("smtplib.SMTP") as mock_smtp:
+        mock_smtp.side_effect = lambda *args: MagicMock()
+        yield mock_smtp
+
+
+def test_for_config_shares_pool():
+    assert SMTPConnectionPool.for_config(CONFIG) is SMTPConnectionPool.for_config(
+        dict(CONFIG)
+    )
+    other = {**CONFIG, "sender_email": "other@example.com"}
+    assert SMTPConnectionPool.for_config(other) is not SMTPConnectionPool.for_config(
+        CONFIG
+    )
+
+
+def test_connect_uses_cached_ssl_context(mock_smtp):
+    pool = SMTPConnectionPool.for_config(CONFIG)
+    pool.sendmail("sender@example.com", ["to@example.com"], "msg")
+    connection = pool._idle[0][0]
+    connection.starttls.assert_called_once_with(context=default_ssl_context())
+    assert default_ssl_context() is default_ssl_context()
+
+
+def test_sendmail_reuses_idle_connection(mock_smtp):
+    pool = SMTPConnectionPool.for_config(CONFIG)
+    pool.sendmail("sender@example.com", ["to@example.com"], "one")
+    pool.sendmail("sender@example.com", ["to@example.com"], "two")
+    assert mock_smtp.call_count == 1
+
+
+def test_sendmail_reconnects_when_server_disconnected(mock_smtp):
+    pool = SMTPConnectionPool.for_config(CONFIG)
+    pool.sendmail("sender@example.com", ["to@example.com"], "one")
+    stale = pool._idle[0][0]
+    stale.sendmail.side_effect = smtplib.SMTPServerDisconnected()
+
+    pool.sendmail("sender@example.com", ["to@example.com"], "two")
+
+    assert mock_smtp.call_count == 2
+    fresh = pool._idle[0][0]
+    assert fresh is not stale
+    fresh.sendmail.assert_called_once_with(
+        "sender@example.com", ["to@example.com"], "two"
+    )
+
+
+def test_sendmail_discards_connection_on_error(mock_smtp):
+    pool = SMTPConnectionPool.for_config(CONFIG)
+    pool.sendmail("sender@example.com", ["to@example.com"], "one")
+    connection = pool._idle[0][0]
+    connection.sendmail.side_effect = smtplib.SMTPDataError(554, b"rejected")
+
+    with pytest.raises(smtplib.SMTPDataError):
+        pool.sendmail("sender@example.com", ["to@example.com"], "two")
+    assert len(pool._idle) == 0
+    connection.quit.assert_called_once()
+
+
+def test_idle_connection_expires(mock_smtp):
+    pool = SMTPConnectionPool.for_config({**CONFIG, "smtp_idle_timeout": 0})
+    pool.sendmail("sender@example.com", ["to@example.com"], "one")
+    pool.sendmail("sender@example.com", ["to@example.com"], "two")
+    assert mock_smtp.call_count == 2
+
+
+def test_pool_keeps_at_most_pool_size_connections():
+    pool = SMTPConnectionPool.for_config({**CONFIG, "smtp_pool_size": 1})
+    first, second = MagicMock(), MagicMock()
+    pool._release(first)
+    pool._release(second)
+    assert len(pool._idle) == 1
+    second.quit.assert_called_once()
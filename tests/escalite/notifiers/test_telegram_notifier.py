@@ -26,7 +26,7 @@ def test_notify_without_config_raises(telegram_notifier):
         telegram_notifier.notify("msg", {})
 
 
-@patch("escalite.notifiers.telegram_notifier.requests.post")
+@patch("escalite.notifiers.http_transport.requests.Session.post")
 def test_notify_sends_message(mock_post, telegram_notifier):
     config = {"bot_token": "token", "chat_id": "12345"}
     telegram_notifier.set_config(config)
@@ -1,8 +1,15 @@
+import copy
+
 import pytest
 from unittest.mock import patch, MagicMock
 
 from escalite.formatters.dict_table_formatter import DictTableFormatter
-from escalite.notifiers.whatsapp_notifier import WhatsAppNotifier
+from escalite.notifiers.whatsapp_notifier import (
+    DEFAULT_DETAILS_URL,
+    DEFAULT_PAYLOAD_TEMPLATE,
+    WhatsAppNotifier,
+    WhatsAppPayloadBuilder,
+)
 
 
 @pytest.fixture
@@ -31,7 +38,7 @@ def test_notify_without_config_raises(whatsapp_notifier):
         whatsapp_notifier.notify("msg", {})
 
 
-@patch("escalite.notifiers.whatsapp_notifier.requests.post")
+@patch("escalite.notifiers.http_transport.requests.Session.post")
 def test_notify_sends_request(mock_post, whatsapp_notifier):
     config = {"api_url": "http://api", "token": "abc", "to": "+123"}
     whatsapp_notifier.set_config(config)
@@ -61,3 +68,65 @@ def test_init_without_config_sets_none_and_default_formatter():
     notifier = WhatsAppNotifier()
     assert notifier.config is None
     assert isinstance(notifier.formatter, DictTableFormatter)
+
+
+@patch("escalite.notifiers.http_transport.requests.Session.post")
+def test_notify_does_not_change_the_template(mock_post):
+    template = copy.deepcopy(DEFAULT_PAYLOAD_TEMPLATE)
+    config = {"api_url": "http://api", "token": "abc", "to": "+123", "name": "api"}
+    notifier = WhatsAppNotifier(config=config)
+    notifier.notify("first", {"alert_id": "a1"})
+    notifier.notify("second", {"alert_id": "a2"})
+    assert DEFAULT_PAYLOAD_TEMPLATE == template
+    first = mock_post.call_args_list[0].kwargs["json"]
+    second = mock_post.call_args_list[1].kwargs["json"]
+    parameters = first["template"]["components"][0]["parameters"]
+    assert [p["text"] for p in parameters[::2]] == ["api", "first"]
+    assert parameters[3]["text"] == DEFAULT_DETAILS_URL + "a1"
+    assert second["template"]["components"][0]["parameters"][2]["text"] == "second"
+
+
+def test_payload_builder_fills_the_date_per_call(mocker):
+    builder = WhatsAppPayloadBuilder(DEFAULT_PAYLOAD_TEMPLATE, "+123")
+    strftime = mocker.patch(
+        "escalite.notifiers.whatsapp_notifier.time.strftime",
+        side_effect=["2025-01-01 00:00:00", "2025-01-02 00:00:00"],
+    )
+    dates = [
+        builder.build("msg", "id")["template"]["components"][0]["parameters"][1]["text"]
+        for _ in range(2)
+    ]
+    assert dates == ["2025-01-01 00:00:00", "2025-01-02 00:00:00"]
+    assert strftime.call_count == 2
+
+
+def test_payload_builder_keeps_extra_template_fields():
+    template = copy.deepcopy(DEFAULT_PAYLOAD_TEMPLATE)
+    template["template"]["name"] = "custom_alert"
+    parameters = template["template"]["components"][0]["parameters"]
+    parameters.append({"type": "text", "parameter_name": "extra", "text": "x"})
+    template["template"]["components"].append({"type": "button"})
+    payload = WhatsAppPayloadBuilder(template, "+123").build("msg", "id")
+    assert payload["to"] == "+123"
+    assert payload["template"]["name"] == "custom_alert"
+    assert payload["template"]["components"][0]["parameters"][4]["text"] == "x"
+    assert payload["template"]["components"][1] == {"type": "button"}
+    assert template["to"] is None
+
+
+def test_payload_builder_rejects_invalid_template():
+    with pytest.raises(ValueError):
+        WhatsAppPayloadBuilder({"template": {}}, "+123")
+
+
+@patch("escalite.notifiers.http_transport.requests.Session.post")
+def test_notify_recompiles_after_config_change(mock_post):
+    notifier = WhatsAppNotifier(
+        config={"api_url": "http://api", "token": "a", "to": "+1"}
+    )
+    notifier.notify("msg", {})
+    notifier.set_config({"api_url": "http://api", "token": "b", "to": "+2"})
+    notifier.notify("msg", {})
+    second = mock_post.call_args_list[1].kwargs
+    assert second["json"]["to"] == "+2"
+    assert second["headers"]["Authorization"] == "Bearer b"
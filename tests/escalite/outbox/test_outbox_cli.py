@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.outbox.__main__ import main
+from escalite.outbox.sqlite_outbox import SqliteOutbox
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    outbox = SqliteOutbox(path)
+    outbox.append("first", {"alert_id": "a1"})
+    outbox.append("second", {"alert_id": "a2"})
+    outbox.close()
+    return path
+
+
+def test_list_and_count(path, capsys):
+    assert main([path, "list"]) == 0
+    out = capsys.readouterr().out
+    assert "alert a1" in out and "second" in out
+    assert main([path, "count"]) == 0
+    assert capsys.readouterr().out.strip() == "2"
+
+
+def test_show(path, capsys):
+    outbox = SqliteOutbox(path)
+    entry_id = outbox.entries()[0].id
+    outbox.close()
+    assert main([path, "show", entry_id]) == 0
+    assert json.loads(capsys.readouterr().out)["data"] == {"alert_id": "a1"}
+    assert main([path, "show", "missing"]) == 1
+
+
+def test_replay(path, tmp_path, mocker):
+    config = tmp_path / "notifiers.json"
+    config.write_text(json.dumps({"notifiers": []}))
+    notifier = mocker.Mock()
+    mocker.patch.object(NotifierFactory, "create_notifiers", return_value=[notifier])
+    assert main([path, "replay", "--config", str(config)]) == 0
+    assert notifier.notify.call_count == 2
+    assert main([path, "count"]) == 0
+
+
+def test_purge(path, capsys):
+    assert main([path, "purge"]) == 0
+    main([path, "count"])
+    assert capsys.readouterr().out.strip() == "0"
@@ -0,0 +1,216 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from escalite.notifiers.base_notifier import BaseNotifier
+from escalite.notifiers.notifier_factory import NotifierFactory
+from escalite.outbox.sqlite_outbox import SqliteOutbox
+
+
+class RecordingNotifier(BaseNotifier):
+    def __init__(self, fail=False):
+        self.config = {}
+        self.fail = fail
+        self.calls = []
+
+    def set_config(self, config: dict):
+        self.config = config
+
+    def notify(self, message: str, data: dict):
+        if self.fail:
+            raise ConnectionError("down")
+        self.calls.append((message, data))
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = SqliteOutbox(str(tmp_path / "outbox.db"), flush_interval=0.01)
+    yield outbox
+    outbox.close()
+
+
+def test_append_is_stored_until_acked(outbox):
+    entry_id = outbox.append("Alert", {"alert_id": "a1", "log_level": "error"})
+    entries = outbox.entries()
+    assert [e.id for e in entries] == [entry_id]
+    assert entries[0].alert_id == "a1"
+    assert entries[0].message == "Alert"
+    assert json.loads(entries[0].data) == {"alert_id": "a1", "log_level": "error"}
+    outbox.ack(entry_id)
+    assert len(outbox) == 0
+
+
+def test_ack_before_write_skips_the_database(outbox, mocker):
+    write = mocker.spy(outbox, "_write")
+    with outbox._cond:
+        entry_id = outbox.append("Alert", {})
+        outbox.ack(entry_id)
+    outbox.flush()
+    assert len(outbox) == 0
+    assert all(not any(call.args[0]) for call in write.call_args_list)
+
+
+def test_fail_records_attempts(outbox):
+    entry_id = outbox.append("Alert", {})
+    outbox.fail(entry_id, ValueError("boom"))
+    outbox.flush()
+    outbox.fail(entry_id)
+    entry = outbox.entries()[0]
+    assert entry.attempts == 2
+    assert entry.last_error is None
+    assert outbox.entries()[0].to_dict()["id"] == entry_id
+
+
+def test_writer_commits_in_the_background(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    outbox = SqliteOutbox(path, flush_interval=0.01)
+    outbox.append("Alert", {"alert_id": "a1"})
+    reader = SqliteOutbox(path)
+    try:
+        for _ in range(100):
+            if len(reader):
+                break
+            threading.Event().wait(0.01)
+        assert len(reader) == 1
+    finally:
+        reader.close()
+        outbox.close()
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    outbox = SqliteOutbox(path)
+    outbox.append("Alert", {"alert_id": "a1"})
+    outbox.close()
+    reopened = SqliteOutbox(path)
+    try:
+        assert [e.alert_id for e in reopened.entries()] == ["a1"]
+    finally:
+        reopened.close()
+
+
+def store_from_earlier_run(tmp_path, *messages):
+    earlier = SqliteOutbox(str(tmp_path / "outbox.db"))
+    for index, message in enumerate(messages, 1):
+        earlier.append(message, {"alert_id": f"a{index}"})
+    earlier.close()
+
+
+def test_replay_delivers_and_removes(outbox, tmp_path):
+    store_from_earlier_run(tmp_path, "first", "second")
+    notifier = RecordingNotifier()
+    assert outbox.replay([notifier]) == 2
+    assert [call[0] for call in notifier.calls] == ["first", "second"]
+    assert len(outbox) == 0
+
+
+def test_replay_keeps_failed_escalations(outbox, tmp_path):
+    store_from_earlier_run(tmp_path, "Alert")
+    assert outbox.replay([RecordingNotifier(fail=True)]) == 0
+    entries = outbox.entries()
+    assert entries[0].attempts == 1
+    assert "down" in entries[0].last_error
+
+
+def test_replay_skips_escalations_still_being_delivered(outbox, tmp_path):
+    store_from_earlier_run(tmp_path, "earlier")
+    live = outbox.append("live", {"alert_id": "a2"})
+    failed = outbox.append("failed", {"alert_id": "a3"})
+    outbox.fail(failed)
+    notifier = RecordingNotifier()
+    assert outbox.replay([notifier]) == 2
+    assert [call[0] for call in notifier.calls] == ["earlier", "failed"]
+    assert [entry.id for entry in outbox.entries()] == [live]
+
+
+def test_replay_only_sends_to_notifiers_that_did_not_deliver(outbox):
+    slack, email = RecordingNotifier(), RecordingNotifier(fail=True)
+    entry_id = outbox.append("Alert", {"alert_id": "a1"})
+    with pytest.raises(ConnectionError):
+        NotifierFactory.notify(outbox.track(entry_id, [slack, email]), "Alert", {})
+    outbox.fail(entry_id)
+    assert outbox.entries()[0].delivered_to == {"0:RecordingNotifier"}
+
+    email.fail = False
+    assert outbox.replay([slack, email]) == 1
+    assert len(slack.calls) == 1
+    assert len(email.calls) == 1
+    assert len(outbox) == 0
+
+
+def test_late_delivery_is_recorded_and_not_replayed_while_running(outbox):
+    gate = threading.Event()
+    slow = RecordingNotifier()
+    slow.notify = lambda message, data: gate.wait(5)
+    entry_id = outbox.append("Alert", {"alert_id": "a1"})
+    result = NotifierFactory.notify_parallel(
+        outbox.track(entry_id, [slow]), "Alert", {}, timeout=0.01
+    )
+    assert isinstance(result.failed[0].error, TimeoutError)
+    outbox.fail(entry_id, result.failed[0].error)
+
+    replayed = RecordingNotifier()
+    assert outbox.replay([replayed]) == 0
+    assert replayed.calls == []
+
+    gate.set()
+    for _ in range(100):
+        if outbox.entries()[0].delivered_to:
+            break
+        threading.Event().wait(0.01)
+    assert outbox.replay([replayed]) == 1
+    assert replayed.calls == []
+    assert len(outbox) == 0
+
+
+def test_outbox_files_without_delivered_column_are_upgraded(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE outbox (id TEXT PRIMARY KEY, created REAL NOT NULL, "
+        "alert_id TEXT, message TEXT NOT NULL, data TEXT NOT NULL, "
+        "attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT)"
+    )
+    conn.execute("INSERT INTO outbox VALUES ('1', 0, 'a1', 'Alert', '{}', 1, NULL)")
+    conn.commit()
+    conn.close()
+    outbox = SqliteOutbox(path)
+    try:
+        notifier = RecordingNotifier()
+        assert outbox.replay([notifier]) == 1
+        assert len(notifier.calls) == 1
+    finally:
+        outbox.close()
+
+
+def test_start_replay_runs_in_background(outbox, tmp_path):
+    store_from_earlier_run(tmp_path, "Alert")
+    notifier = RecordingNotifier()
+    outbox.start_replay([notifier]).join(5)
+    assert len(notifier.calls) == 1
+    assert len(outbox) == 0
+
+
+def test_purge(outbox):
+    first = outbox.append("first", {})
+    outbox.append("second", {})
+    assert outbox.purge([first]) == 1
+    assert [e.message for e in outbox.entries()] == ["second"]
+    assert outbox.purge() == 1
+    assert len(outbox) == 0
+
+
+def test_append_after_close_raises(tmp_path):
+    outbox = SqliteOutbox(str(tmp_path / "outbox.db"))
+    outbox.close()
+    outbox.close()
+    with pytest.raises(RuntimeError):
+        outbox.append("Alert", {})
+
+
+@pytest.mark.parametrize("kwargs", [{"batch_size": 0}, {"flush_interval": 0}])
+def test_invalid_settings(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        SqliteOutbox(str(tmp_path / "outbox.db"), **kwargs)
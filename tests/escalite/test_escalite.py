@@ -1,3 +1,7 @@
+import asyncio
+import contextvars
+import copy
+import json
 import logging
 import threading
 import time
@@ -5,7 +9,10 @@ import uuid
 
 import pytest
 from escalite.escalite import Escalite
+from escalite.models.request_log import RequestLog
+from escalite.notifiers.notifier_registry import NotifierRegistry
 from escalite.utils.constants import ALERT_ID
+from escalite.utils.sampling_policy import SamplingPolicy
 from contextlib import nullcontext as does_not_raise
 
 
@@ -33,6 +40,13 @@ class TestEscalite:
             ]
         }
 
+    @pytest.fixture
+    def fresh_notifier_registry(self, monkeypatch):
+        # notifiers are cached per config, keep patched factories from leaking
+        registry = NotifierRegistry()
+        monkeypatch.setattr(Escalite, "notifier_registry", registry)
+        return registry
+
     def test_start_logging(self):
         Escalite.start_logging()
         logs = Escalite.get_all_logs()
@@ -49,6 +63,15 @@ class TestEscalite:
         assert "time_elapsed" in logs
         assert logs["end_time"] > logs["start_time"]
 
+    def test_end_logging_returns_a_plain_dict(self):
+        Escalite.start_logging()
+        Escalite.add_to_log("status", 200, tag="api_logs")
+        logs = Escalite.end_logging()
+        assert type(logs) is dict
+        assert json.loads(json.dumps(logs))["api_logs"]["status"]["value"] == 200
+        logs["extra"] = 1
+        assert "extra" not in Escalite.get_all_logs()
+
     def test_add_to_log(self):
         Escalite.start_logging()
         Escalite.add_to_log(
@@ -74,6 +97,228 @@ class TestEscalite:
         with pytest.raises(RuntimeError):
             Escalite.add_to_log("test_key", "test_value")
 
+    def test_add_many_to_log(self):
+        Escalite.start_logging()
+        Escalite.add_many_to_log(
+            [
+                {"key": "path", "value": "/users", "tag": "api_logs"},
+                {"key": "status", "value": 500, "tag": "api_logs", "level": "error"},
+                {"key": "db", "value": "timeout", "tag": "service_logs", "code": 504},
+                {"key": "request_id", "value": "abc"},
+            ]
+        )
+        logs = Escalite.get_all_logs()
+        assert logs["api_logs"]["path"]["value"] == "/users"
+        assert logs["api_logs"]["status"]["log_level"] == "error"
+        assert logs["api_logs"]["log_level"] == "error"
+        assert logs["service_logs"]["db"]["code"] == 504
+        assert logs["request_id"]["value"] == "abc"
+        assert logs["log_level"] == "info"
+
+    def test_add_many_to_log_matches_add_to_log(self):
+        entries = [
+            {"key": "a", "value": 1, "tag": "api_logs", "level": "warning"},
+            {"key": "a", "value": None, "tag": "api_logs", "message": "again"},
+            {"key": "b", "value": 2, "level": "error", "extras": {"x": 1}},
+        ]
+        Escalite.start_logging()
+        for entry in entries:
+            Escalite.add_to_log(**entry)
+        expected = Escalite.get_all_logs()
+        Escalite.start_logging()
+        Escalite.add_many_to_log(entries)
+        actual = Escalite.get_all_logs()
+        for logs in (expected, actual):
+            for key in ("alert_id", "start_time", "log_date"):
+                logs.pop(key)
+            for entry in (logs["api_logs"]["a"], logs["b"]):
+                for key in ("log_time", "start_time", "end_time", "time_elapsed"):
+                    entry.pop(key, None)
+        assert actual == expected
+
+    def test_add_many_to_log_raises_error_if_not_started(self):
+        from escalite.escalite import _request_logs
+
+        _request_logs.set(None)
+        with pytest.raises(RuntimeError):
+            Escalite.add_many_to_log([{"key": "test_key", "value": "test_value"}])
+
+    def test_set_notifiers_from_configs_alert_id_generator(
+        self, configs, monkeypatch, fresh_notifier_registry
+    ):
+        monkeypatch.setattr(
+            RequestLog, "id_generator", RequestLog.__dict__["id_generator"]
+        )
+        Escalite.set_notifiers_from_configs(
+            {**configs, "alert_id_generator": "counter"}
+        )
+        Escalite.start_logging()
+        first = Escalite.get_all_logs()[ALERT_ID]
+        Escalite.start_logging()
+        second = Escalite.get_all_logs()[ALERT_ID]
+        prefix, count = first.rsplit("-", 1)
+        assert second == f"{prefix}-{int(count) + 1}"
+
+        Escalite.set_alert_id_generator(lambda: "fixed")
+        Escalite.start_logging()
+        assert Escalite.get_all_logs()[ALERT_ID] == "fixed"
+
+    def test_unsampled_request_buffers_entries(self):
+        from escalite.escalite import _request_logs
+
+        Escalite.start_logging(SamplingPolicy(rate=0, buffer_size=2))
+        Escalite.add_to_log("a", 1, tag="api_logs")
+        Escalite.add_to_log("b", 2, tag="api_logs", level="warning")
+        Escalite.add_to_log("c", 3)
+        logs = _request_logs.get()
+        assert logs.sections["api_logs"] == {}
+        assert [entry[0] for entry in logs.buffer] == ["b", "c"]
+        assert logs.log_level == "warning"
+
+        # the buffered entries are only captured once the logs are read
+        assert Escalite.end_logging()["api_logs"] == {}
+        data = Escalite.get_all_logs()
+        assert "a" not in data["api_logs"]
+        assert data["api_logs"]["b"]["value"] == 2
+        assert data["c"]["value"] == 3
+        assert data["log_level"] == "warning"
+        assert data["unsampled_dropped"] == 1
+
+    def test_unsampled_request_is_captured_from_keep_level(self):
+        from escalite.escalite import _request_logs
+
+        Escalite.start_logging(SamplingPolicy(rate=0, keep_level="error"))
+        Escalite.add_to_log("a", 1, tag="api_logs")
+        Escalite.add_to_log("b", 2, tag="error_logs", level="error")
+        Escalite.add_to_log("c", 3, tag="api_logs")
+        logs = _request_logs.get()
+        assert logs.buffer is None
+        assert set(logs.sections["api_logs"]) == {"a", "c", "log_level"}
+        assert logs.log_level == "info"
+        data = Escalite.get_all_logs()
+        assert data["error_logs"]["b"]["log_level"] == "error"
+        assert "unsampled_dropped" not in data
+
+    def test_unsampled_request_is_not_escalated_below_level(self, mocker):
+        mocker.patch.object(Escalite, "notifiers", [mocker.Mock()])
+        capture = mocker.spy(Escalite, "_capture_buffer")
+        Escalite.start_logging(SamplingPolicy(rate=0))
+        Escalite.add_to_log("a", 1, tag="api_logs", level="warning")
+        Escalite.escalate(from_level="error")
+        capture.assert_not_called()
+        Escalite.notifiers[0].notify.assert_not_called()
+
+    def test_unsampled_request_is_not_replayed_on_happy_path(self, mocker):
+        from escalite.escalite import _request_logs
+
+        mocker.patch.object(Escalite, "notifiers", [mocker.Mock()])
+        capture = mocker.spy(Escalite, "_capture_buffer")
+        Escalite.start_logging(SamplingPolicy(rate=0))
+        Escalite.add_to_log("request_path", "/orders", tag="api_logs")
+        with Escalite.service_span("db"):
+            pass
+        logs = Escalite.end_logging()
+        assert logs["log_level"] == "info"
+        Escalite.escalate(from_level="error")
+        capture.assert_not_called()
+        assert _request_logs.get().buffer is not None
+        Escalite.notifiers[0].notify.assert_not_called()
+
+        # reading the logs captures the buffered entries
+        logs = Escalite.get_all_logs()
+        assert logs["api_logs"]["request_path"]["value"] == "/orders"
+        capture.assert_called_once()
+
+    def test_unsampled_request_is_captured_for_escalation_rules(self, configs, mocker):
+        notify = mocker.patch(
+            "escalite.notifiers.notifier_factory.NotifierFactory.notify"
+        )
+        rules = [{"type": "code", "codes": [503], "tag": "api_logs"}]
+        Escalite.set_notifiers_from_configs({**configs, "rules": rules})
+        try:
+            Escalite.start_logging(SamplingPolicy(rate=0))
+            Escalite.add_to_log("path", "/orders", tag="api_logs")
+            Escalite.add_to_log("status", 503, tag="api_logs", code=503)
+            Escalite.end_logging()
+            Escalite.escalate()
+            data = notify.call_args[0][2]
+            assert data["triggered_rules"] == ["code"]
+            assert data["api_logs"]["path"]["value"] == "/orders"
+        finally:
+            Escalite.set_notifiers_from_configs(configs)
+
+    def test_set_notifiers_from_configs_sampling(
+        self, configs, fresh_notifier_registry, monkeypatch
+    ):
+        monkeypatch.setattr(Escalite, "sampling_policy", None)
+        monkeypatch.setattr(Escalite, "_sampling_settings", None)
+        Escalite.set_notifiers_from_configs(
+            {**configs, "sampling": {"rate": 0.1, "keep_level": "warning"}}
+        )
+        policy = Escalite.sampling_policy
+        assert policy.rate == 0.1
+        assert policy.keep_level == "warning"
+        Escalite.set_notifiers_from_configs(
+            {**configs, "sampling": {"rate": 0.1, "keep_level": "warning"}}
+        )
+        assert Escalite.sampling_policy is policy
+        Escalite.set_notifiers_from_configs(configs)
+        assert Escalite.sampling_policy is None
+
+    def test_log_limits_cap_entries_and_truncate_values(
+        self, configs, fresh_notifier_registry, monkeypatch
+    ):
+        monkeypatch.setattr(Escalite, "log_limits", None)
+        monkeypatch.setattr(Escalite, "_limits_settings", None)
+        Escalite.set_notifiers_from_configs(
+            {
+                **configs,
+                "limits": {
+                    "max_entries": 3,
+                    "max_entries_per_tag": 2,
+                    "max_value_bytes": 5,
+                },
+            }
+        )
+        Escalite.start_logging()
+        Escalite.add_to_log("a", "response body", tag="api_logs")
+        Escalite.add_to_log("b", 2, tag="api_logs")
+        Escalite.add_to_log("c", 3, tag="api_logs", level="error")
+        # a dropped entry still raises the level
+        assert Escalite.get_log_level() == "error"
+        Escalite.add_to_log("b", 20, tag="api_logs")
+        Escalite.add_to_log("d", 4)
+        Escalite.add_to_log("e", 5, tag="service_logs")
+        logs = Escalite.get_all_logs()
+        assert logs["api_logs"]["a"]["value"] == "respo...[truncated 8 bytes]"
+        assert logs["api_logs"]["b"]["value"] == 20
+        assert "c" not in logs["api_logs"]
+        assert logs["d"]["value"] == 4
+        assert "e" not in logs["service_logs"]
+        assert logs["api_logs"]["log_level"] == "error"
+        assert logs["log_overflow"] == {"dropped_entries": 2, "truncated_values": 1}
+
+        Escalite.set_notifiers_from_configs(configs)
+        assert Escalite.log_limits is None
+
+    def test_log_limits_truncate_extras(self, configs, monkeypatch):
+        monkeypatch.setattr(Escalite, "log_limits", None)
+        monkeypatch.setattr(Escalite, "_limits_settings", None)
+        Escalite.set_notifiers_from_configs(
+            {**configs, "limits": {"max_value_bytes": 100}}
+        )
+        Escalite.start_logging()
+        Escalite.start_service_log("db", "querying")
+        Escalite.stop_service_log(
+            "db", "failed", level="error", error_trace="x" * 10_000
+        )
+        Escalite.add_to_log("payload", {"rows": list(range(10_000))})
+        logs = Escalite.get_all_logs()
+        trace = logs["service_logs"]["db"]["error_trace"]
+        assert trace == "x" * 100 + "...[truncated 9900 bytes]"
+        assert logs["payload"]["value"].endswith("...[truncated dict]")
+        assert logs["log_overflow"] == {"dropped_entries": 0, "truncated_values": 2}
+
     def test_update_log_level(self):
         Escalite.start_logging()
         Escalite.update_log_level("debug", force=True)
@@ -208,7 +453,7 @@ class TestEscalite:
 
     def test_logging_context_starts_and_ends_logging(self, caplog, configs, mocker):
         escalite = Escalite()
-        caplog.set_level(logging.INFO, logger="escalite.escalite")
+        caplog.set_level(logging.DEBUG, logger="escalite.escalite")
         mocker.patch.object(escalite, "escalate", return_value=None)
         with escalite.logging_context(configs=configs):
             logs = Escalite.get_all_logs()
@@ -221,11 +466,28 @@ class TestEscalite:
         assert logs.get("end_time") is not None
         assert any("Logs collected:" in record.message for record in caplog.records)
 
+    def test_logging_context_does_not_capture_unsampled_requests(
+        self, caplog, configs, mocker
+    ):
+        escalite = Escalite()
+        caplog.set_level(logging.DEBUG, logger="escalite.escalite")
+        mocker.patch.object(escalite, "escalate", return_value=None)
+        mocker.patch.object(
+            escalite,
+            "start_logging",
+            lambda: Escalite.start_logging(SamplingPolicy(rate=0)),
+        )
+        capture = mocker.spy(Escalite, "_capture_buffer")
+        with escalite.logging_context(configs=configs):
+            Escalite.add_to_log("key", "value", tag="api_logs")
+        capture.assert_not_called()
+        assert any("Logs collected:" in record.message for record in caplog.records)
+
     def test_logging_context_handles_exceptions_gracefully(
         self, caplog, configs, mocker
     ):
         escalite = Escalite()
-        caplog.set_level(logging.INFO, logger="escalite.escalite")
+        caplog.set_level(logging.DEBUG, logger="escalite.escalite")
         mocker.patch.object(escalite, "escalate", return_value=None)
         with pytest.raises(ValueError):
             with escalite.logging_context(configs=configs):
@@ -262,6 +524,52 @@ class TestEscalite:
         # Ensure escalate was called with the correct log level
         assert escalite.escalate.call_count == 4
 
+    def test_escalated_logs_are_versioned(self, mocker):
+        notify = mocker.patch(
+            "escalite.notifiers.notifier_factory.NotifierFactory.notify"
+        )
+        mocker.patch.object(Escalite, "notifiers", [mocker.Mock()])
+        Escalite.start_logging()
+        Escalite.add_to_log("status", 500, tag="api_logs", level="error")
+        Escalite.escalate()
+        Escalite.escalate()
+        Escalite.add_to_log("status", 503, tag="api_logs", level="error")
+        Escalite.escalate()
+        first, again, changed = (call[0][2] for call in notify.call_args_list)
+        assert first.version == again.version
+        assert changed.version != first.version
+        assert changed["api_logs"]["status"]["value"] == 503
+
+    def test_builtin_notifiers_format_an_escalation_once(
+        self, mocker, fresh_notifier_registry
+    ):
+        from escalite.formatters.dict_table_formatter import default_table_formatter
+
+        mocker.patch("escalite.notifiers.slack_notifier.HttpTransport.for_config")
+        mocker.patch("escalite.notifiers.telegram_notifier.HttpTransport.for_config")
+        mocker.patch("escalite.notifiers.email_notifier.SMTPConnectionPool.for_config")
+        format_ = mocker.spy(default_table_formatter, "format")
+        Escalite.set_notifiers_from_configs(
+            {
+                "notifiers": [
+                    {"type": "slack", "config": {"webhook_url": "https://hooks"}},
+                    {"type": "telegram", "config": {"bot_token": "x", "chat_id": "y"}},
+                    {
+                        "type": "email",
+                        "config": {
+                            "smtp_server": "smtp.example.com",
+                            "sender_email": "from@example.com",
+                            "recipient_emails": "to@example.com",
+                        },
+                    },
+                ]
+            }
+        )
+        Escalite.start_logging()
+        Escalite.add_to_log("status", 500, tag="api_logs", level="error")
+        Escalite.escalate()
+        assert format_.call_count == 1
+
     def test_escalate_with_message(self, mocker):
         escalite = Escalite()
         mocker.patch.object(escalite, "escalate", return_value=None)
@@ -381,7 +689,7 @@ class TestEscalite:
         # Check they are unique
         assert alert_id1 != alert_id2
 
-    def test_route_logging_decorator(self, monkeypatch):
+    def test_route_logging_decorator(self, monkeypatch, fresh_notifier_registry):
         called = {}
 
         # Mock notifier and escalate
@@ -415,3 +723,480 @@ class TestEscalite:
         assert logs["test_key"]["value"] == "test_value"
         assert called.get("notified") is True
         assert "log_level" in called["log_data"]
+
+    def test_escalate_queues_on_dispatcher(self, mocker):
+        dispatcher = mocker.Mock()
+        notify = mocker.patch(
+            "escalite.notifiers.notifier_factory.NotifierFactory.notify"
+        )
+        mocker.patch.object(Escalite, "notifiers", ["notifier"])
+        Escalite.set_dispatcher(dispatcher)
+        try:
+            Escalite.start_logging()
+            Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+            Escalite.end_logging()
+            Escalite.escalate(message="msg")
+        finally:
+            Escalite.set_dispatcher(None)
+
+        dispatcher.submit.assert_called_once()
+        args = dispatcher.submit.call_args[0]
+        assert args[0] == ["notifier"]
+        assert args[1] == "msg"
+        assert args[2]["api_logs"]["key"]["value"] == "value"
+        notify.assert_not_called()
+
+    @pytest.fixture
+    def outbox(self, tmp_path):
+        from escalite.outbox.sqlite_outbox import SqliteOutbox
+
+        outbox = SqliteOutbox(str(tmp_path / "outbox.db"))
+        Escalite.set_outbox(outbox)
+        yield outbox
+        Escalite.set_outbox(None)
+        outbox.close()
+
+    def test_escalate_acks_delivered_escalation_in_outbox(self, mocker, outbox):
+        mocker.patch.object(Escalite, "notifiers", [mocker.Mock()])
+        Escalite.start_logging()
+        Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+        Escalite.escalate(message="msg")
+        assert len(outbox) == 0
+
+    def test_escalate_keeps_failed_escalation_in_outbox(self, mocker, outbox):
+        notifier = mocker.Mock()
+        notifier.notify.side_effect = ConnectionError("down")
+        mocker.patch.object(Escalite, "notifiers", [notifier])
+        Escalite.start_logging()
+        Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+        with pytest.raises(ConnectionError):
+            Escalite.escalate(message="msg")
+        entries = outbox.entries()
+        assert [entry.message for entry in entries] == ["msg"]
+        assert entries[0].attempts == 1
+
+        notifier.notify.side_effect = None
+        assert outbox.replay([notifier]) == 1
+        assert len(outbox) == 0
+
+    def test_outbox_replays_only_to_failed_notifiers(self, mocker, outbox):
+        slack, email = mocker.Mock(), mocker.Mock()
+        email.notify.side_effect = ConnectionError("down")
+        mocker.patch.object(Escalite, "notifiers", [slack, email])
+        mocker.patch.object(Escalite, "notify_options", {"parallel": True})
+        Escalite.start_logging()
+        Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+        Escalite.escalate(message="msg")
+        assert len(outbox) == 1
+
+        email.notify.side_effect = None
+        assert outbox.replay([slack, email]) == 1
+        assert slack.notify.call_count == 1
+        assert email.notify.call_count == 2
+        assert len(outbox) == 0
+
+    def test_outbox_keeps_escalation_until_retries_fail(self, mocker, outbox):
+        from escalite.notifiers.notifier_factory import NotifierFactory
+
+        transport = mocker.patch(
+            "escalite.notifiers.slack_notifier.HttpTransport.for_config"
+        )
+        transport.return_value.post.side_effect = ConnectionError("down")
+        [notifier] = NotifierFactory.create_notifiers(
+            {
+                "notifiers": [
+                    {
+                        "type": "slack",
+                        "config": {
+                            "webhook_url": "https://hooks.slack.com/...",
+                            "retry": {"max_attempts": 3, "backoff_base": 0.001},
+                        },
+                    }
+                ]
+            }
+        )
+        mocker.patch.object(Escalite, "notifiers", [notifier])
+        settled = threading.Event()
+        settle = Escalite._settle_outbox
+        mocker.patch.object(
+            Escalite,
+            "_settle_outbox",
+            side_effect=lambda *args: (settle(*args), settled.set()),
+        )
+        Escalite.start_logging()
+        Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+        Escalite.escalate(message="msg")
+        assert settled.wait(2)
+        assert transport.return_value.post.call_count == 3
+        entries = outbox.entries()
+        assert [entry.message for entry in entries] == ["msg"]
+        assert entries[0].attempts == 1
+        assert "ConnectionError" in entries[0].last_error
+
+    def test_aescalate_keeps_failed_escalation_in_outbox(self, mocker, outbox):
+        notifier = mocker.Mock()
+        notifier.anotify = mocker.AsyncMock(side_effect=ConnectionError("down"))
+        mocker.patch.object(Escalite, "notifiers", [notifier])
+        Escalite.start_logging()
+        Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+        asyncio.run(Escalite.aescalate(message="msg"))
+        entries = outbox.entries()
+        assert len(entries) == 1
+        assert "ConnectionError" in entries[0].last_error
+
+    def test_dispatched_escalation_is_acked_after_delivery(self, mocker, outbox):
+        from escalite.dispatchers.background_dispatcher import BackgroundDispatcher
+
+        dispatcher = BackgroundDispatcher()
+        mocker.patch.object(Escalite, "notifiers", [mocker.Mock()])
+        Escalite.set_dispatcher(dispatcher)
+        try:
+            Escalite.start_logging()
+            Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+            Escalite.escalate(message="msg")
+            assert Escalite.shutdown(timeout=2) is True
+        finally:
+            Escalite.set_dispatcher(None)
+        assert len(outbox) == 0
+
+    def test_dropped_escalation_stays_in_outbox_for_replay(self, mocker, outbox):
+        from escalite.dispatchers.background_dispatcher import BackgroundDispatcher
+
+        gate = threading.Event()
+        blocked = mocker.Mock()
+        blocked.notify.side_effect = lambda message, data: gate.wait(2)
+        dispatcher = BackgroundDispatcher(queue_size=1, overflow="drop_newest")
+        mocker.patch.object(Escalite, "notifiers", [blocked])
+        Escalite.set_dispatcher(dispatcher)
+        warning = mocker.patch("escalite.escalite.logger.warning")
+        try:
+            for _ in range(5):
+                Escalite.start_logging()
+                Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+                Escalite.escalate(message="msg")
+            assert dispatcher.dropped == 3
+            assert warning.call_count == 3
+            gate.set()
+            assert Escalite.shutdown(timeout=2) is True
+        finally:
+            Escalite.set_dispatcher(None)
+        entries = outbox.entries()
+        assert len(entries) == 3
+        assert all("EscalationDropped" in entry.last_error for entry in entries)
+        assert not outbox._in_flight
+
+        notifier = mocker.Mock()
+        assert outbox.replay([notifier]) == 3
+        assert len(outbox) == 0
+
+    def test_flush_and_shutdown_without_dispatcher(self):
+        Escalite.set_dispatcher(None)
+        assert Escalite.flush(timeout=0.1) is True
+        assert Escalite.shutdown(timeout=0.1) is True
+
+    def test_shutdown_stops_dispatcher(self, mocker):
+        dispatcher = mocker.Mock()
+        dispatcher.shutdown.return_value = True
+        Escalite.set_dispatcher(dispatcher)
+        assert Escalite.shutdown(timeout=1) is True
+        dispatcher.shutdown.assert_called_once_with(1)
+        assert Escalite.dispatcher is None
+
+    def test_alogging_context_starts_and_ends_logging(self, caplog, configs, mocker):
+        escalite = Escalite()
+        caplog.set_level(logging.DEBUG, logger="escalite.escalite")
+        aescalate = mocker.patch.object(
+            escalite, "aescalate", new=mocker.AsyncMock(return_value=None)
+        )
+
+        async def run():
+            async with escalite.alogging_context(configs=configs):
+                Escalite.add_to_log("key", "value", tag="api_logs")
+            return Escalite.get_all_logs()
+
+        logs = asyncio.run(run())
+        assert logs["api_logs"]["key"]["value"] == "value"
+        assert "time_elapsed" in logs
+        aescalate.assert_awaited_once_with(from_level="info")
+        assert any("Logs collected:" in record.message for record in caplog.records)
+
+    def test_route_logging_decorator_async(self, monkeypatch, fresh_notifier_registry):
+        called = {}
+
+        class DummyNotifier:
+            async def anotify(self, message, data):
+                called["notified"] = True
+                called["log_data"] = data
+
+        monkeypatch.setattr(
+            "escalite.notifiers.notifier_factory.NotifierFactory.create_notifiers",
+            lambda cfg: [DummyNotifier()],
+        )
+
+        @Escalite.route_logging(configs={"notifiers": []}, log_level="info")
+        async def sample_route():
+            Escalite.add_to_log("test_key", "test_value")
+            return "ok"
+
+        async def run():
+            result = await sample_route()
+            return result, Escalite.get_all_logs()
+
+        result, logs = asyncio.run(run())
+        assert result == "ok"
+        assert logs["test_key"]["value"] == "test_value"
+        assert called.get("notified") is True
+        assert called["log_data"]["test_key"]["value"] == "test_value"
+
+    def test_aescalate_skips_below_level(self, mocker):
+        anotify = mocker.patch(
+            "escalite.notifiers.notifier_factory.NotifierFactory.anotify",
+            new=mocker.AsyncMock(),
+        )
+
+        async def run():
+            Escalite.start_logging()
+            Escalite.end_logging()
+            await Escalite.aescalate(from_level="error")
+
+        asyncio.run(run())
+        anotify.assert_not_awaited()
+
+    def test_set_notifiers_from_configs_parallel_options(self, configs):
+        Escalite.set_notifiers_from_configs(
+            {**configs, "parallel_notify": True, "notify_timeout": 3}
+        )
+        assert Escalite.notify_options == {"parallel": True, "timeout": 3}
+        Escalite.set_notifiers_from_configs({**configs, "notify_timeout": 3})
+        assert Escalite.notify_options == {"timeout": 3}
+        Escalite.set_notifiers_from_configs(configs)
+        assert Escalite.notify_options == {}
+
+    def test_aescalate_applies_notify_timeout(self, mocker):
+        from escalite.notifiers.notifier_factory import NotifierFactory
+
+        anotify = mocker.patch.object(
+            NotifierFactory, "anotify", new=mocker.AsyncMock(return_value=None)
+        )
+        mocker.patch.object(Escalite, "notifiers", [mocker.Mock()])
+        mocker.patch.object(Escalite, "notify_options", {"timeout": 3})
+        Escalite.start_logging()
+        Escalite.add_to_log("key", "value", tag="api_logs", level="error")
+        asyncio.run(Escalite.aescalate(message="msg"))
+        assert anotify.await_args.kwargs["timeout"] == 3
+
+    def test_set_notifiers_from_configs_reuses_instances(
+        self, configs, fresh_notifier_registry
+    ):
+        Escalite.set_notifiers_from_configs(configs)
+        first = Escalite.notifiers
+        Escalite.set_notifiers_from_configs(configs)
+        assert Escalite.notifiers is first
+        Escalite.set_notifiers_from_configs(copy.deepcopy(configs))
+        assert Escalite.notifiers is first
+
+    def test_reload_notifiers_rebuilds_instances(
+        self, configs, fresh_notifier_registry
+    ):
+        Escalite.set_notifiers_from_configs(configs)
+        first = Escalite.notifiers
+        Escalite.reload_notifiers(configs)
+        assert Escalite.notifiers is not first
+        assert len(Escalite.notifiers) == len(first)
+
+        Escalite.reload_notifiers()
+        assert len(fresh_notifier_registry) == 0
+
+    def test_escalate_suppresses_duplicates(self, configs, mocker):
+        notify = mocker.patch(
+            "escalite.notifiers.notifier_factory.NotifierFactory.notify"
+        )
+        Escalite.set_notifiers_from_configs({**configs, "dedup": {"ttl": 60}})
+        cache = Escalite.suppression_cache
+        try:
+            for _ in range(3):
+                Escalite.start_logging()
+                Escalite.add_service_log("payments", "failed", level="error", code=500)
+                Escalite.end_logging()
+                Escalite.escalate()
+            assert notify.call_count == 1
+
+            # the window expired, the next alert reports the suppressed repeats
+            Escalite.set_notifiers_from_configs({**configs, "dedup": {"ttl": 60}})
+            assert Escalite.suppression_cache is cache
+            cache._entries[next(iter(cache._entries))][0] = 0
+            Escalite.start_logging()
+            Escalite.add_service_log("payments", "failed", level="error", code=500)
+            Escalite.end_logging()
+            Escalite.escalate()
+            assert notify.call_count == 2
+            assert notify.call_args[0][2]["suppressed_count"] == 2
+            assert "suppressed_count" not in Escalite.get_all_logs()
+        finally:
+            Escalite.set_notifiers_from_configs(configs)
+        assert Escalite.suppression_cache is None
+
+    def test_repeated_add_refreshes_timing(self):
+        Escalite.start_logging()
+        Escalite.add_service_log("payments", "started")
+        Escalite.add_service_log("payments", "retrying")
+        first = Escalite.get_all_logs()["service_logs"]["payments"]
+        time.sleep(0.002)
+        Escalite.add_service_log("payments", "completed")
+        second = Escalite.get_all_logs()["service_logs"]["payments"]
+        Escalite.end_logging()
+        assert second["start_time"] == first["start_time"]
+        assert second["end_time"] > first["end_time"]
+        assert second["time_elapsed"] >= 0.002
+        assert second["time_elapsed"] == pytest.approx(
+            second["end_time"] - second["start_time"], abs=1e-6
+        )
+
+    def test_service_span_context_manager(self):
+        Escalite.start_logging()
+        with Escalite.service_span("payments", url="/charge"):
+            time.sleep(0.001)
+        entry = Escalite.get_all_logs()["service_logs"]["payments"]
+        Escalite.end_logging()
+        assert entry["message"] == "payments completed"
+        assert entry["url"] == "/charge"
+        assert entry["time_elapsed"] >= 0.001
+
+    def test_service_span_records_errors(self):
+        Escalite.start_logging()
+        with pytest.raises(ValueError):
+            with Escalite.service_span("payments"):
+                raise ValueError("declined")
+        logs = Escalite.get_all_logs()
+        Escalite.end_logging()
+        entry = logs["service_logs"]["payments"]
+        assert entry["log_level"] == "error"
+        assert "ValueError: declined" in entry["error_trace"]
+        assert logs["log_level"] == "error"
+
+    def test_service_span_decorator(self):
+        @Escalite.service_span("sync_call")
+        def sync_call(x):
+            return x * 2
+
+        @Escalite.service_span("async_call")
+        async def async_call(x):
+            await asyncio.sleep(0)
+            return x + 1
+
+        Escalite.start_logging()
+        assert sync_call(2) == 4
+        assert asyncio.run(async_call(2)) == 3
+        logs = Escalite.get_all_logs()["service_logs"]
+        Escalite.end_logging()
+        assert sync_call.__name__ == "sync_call"
+        assert logs["sync_call"]["time_elapsed"] is not None
+        assert logs["async_call"]["time_elapsed"] is not None
+
+    def test_service_span_without_logging_is_noop(self):
+        def run():
+            with Escalite.service_span("payments"):
+                pass
+            return Escalite.get_all_logs()
+
+        assert contextvars.Context().run(run) == {}
+
+    def test_end_logging_records_metrics(self, configs):
+        Escalite.set_notifiers_from_configs({**configs, "metrics": True})
+        metrics = Escalite.metrics
+        try:
+            Escalite.set_notifiers_from_configs({**configs, "metrics": True})
+            assert Escalite.metrics is metrics
+            Escalite.set_notifiers_from_configs(configs)
+            assert Escalite.metrics is metrics
+            Escalite.start_logging()
+            Escalite.add_to_log("request_path", "/orders", tag="api_logs")
+            with Escalite.service_span("db"):
+                pass
+            Escalite.end_logging()
+            assert metrics.request_stats("/orders")["count"] == 1
+            assert metrics.service_stats("db")["count"] == 1
+        finally:
+            Escalite.set_notifiers_from_configs({**configs, "metrics": False})
+        assert Escalite.metrics is None
+
+    def test_escalation_rules_from_configs(self, configs, mocker):
+        notify = mocker.patch(
+            "escalite.notifiers.notifier_factory.NotifierFactory.notify"
+        )
+        rules = [
+            {"type": "service_latency", "service": "db", "over_ms": 1},
+            {"type": "code", "codes": [503], "tag": "api_logs", "name": "down"},
+        ]
+        Escalite.set_notifiers_from_configs({**configs, "rules": rules})
+        rule_set = Escalite.escalation_rules
+        try:
+            Escalite.set_notifiers_from_configs({**configs, "rules": rules})
+            assert Escalite.escalation_rules is rule_set
+
+            Escalite.start_logging()
+            Escalite.add_to_log("status", 200, tag="api_logs", code=200)
+            Escalite.start_service_log("db", "query")
+            Escalite.stop_service_log("db", "done")
+            Escalite.end_logging()
+            Escalite.escalate()
+            assert notify.call_count == 0
+
+            Escalite.start_logging()
+            Escalite.start_service_log("db", "query")
+            time.sleep(0.002)
+            Escalite.stop_service_log("db", "done")
+            Escalite.add_to_log("status", 503, tag="api_logs", code=503)
+            logs = Escalite.end_logging()
+            assert logs["log_level"] == "info"
+            assert logs["triggered_rules"] == ["service_latency", "down"]
+            Escalite.escalate()
+            assert notify.call_count == 1
+            assert notify.call_args[0][2]["triggered_rules"] == [
+                "service_latency",
+                "down",
+            ]
+        finally:
+            Escalite.set_notifiers_from_configs(configs)
+        assert Escalite.escalation_rules is None
+
+    def test_escalate_with_aggregate_policy(self, configs, mocker):
+        notify = mocker.patch(
+            "escalite.notifiers.notifier_factory.NotifierFactory.notify"
+        )
+        aggregate = {"error_rate": 0.6, "recover_rate": 0.5, "min_requests": 2}
+        Escalite.set_notifiers_from_configs({**configs, "aggregate": aggregate})
+        policy = Escalite.aggregate_policy
+        try:
+            Escalite.set_notifiers_from_configs({**configs, "aggregate": aggregate})
+            assert Escalite.aggregate_policy is policy
+            for level in ("error", "error", "error", "info", "info", "info"):
+                Escalite.start_logging()
+                Escalite.add_service_log("payments", "called", level=level)
+                Escalite.end_logging()
+                Escalite.escalate(from_level="critical")
+            assert notify.call_count == 2
+            (fired, _), (recovered, _) = notify.call_args_list
+            assert fired[1].startswith("*: error rate 100.0%")
+            assert fired[2]["aggregate_alerts"][0]["state"] == "firing"
+            assert recovered[1].startswith("* recovered: error rate 50.0%")
+        finally:
+            Escalite.set_notifiers_from_configs(configs)
+        assert Escalite.aggregate_policy is None
+
+    def test_escalation_level_reported_for_rules(self, configs, mocker):
+        notify = mocker.patch(
+            "escalite.notifiers.notifier_factory.NotifierFactory.notify"
+        )
+        rules = [{"type": "code", "codes": [503], "level": "critical"}]
+        Escalite.set_notifiers_from_configs({**configs, "rules": rules})
+        try:
+            Escalite.start_logging()
+            Escalite.add_to_log("status", 503, tag="api_logs", code=503)
+            Escalite.end_logging()
+            Escalite.escalate()
+            data = notify.call_args[0][2]
+            assert data["log_level"] == "info"
+            assert data["escalation_level"] == "critical"
+        finally:
+            Escalite.set_notifiers_from_configs(configs)
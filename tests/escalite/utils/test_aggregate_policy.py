@@ -0,0 +1,131 @@
+import pytest
+
+from escalite.models.log_entry import LogEntry
+from escalite.models.request_log import RequestLog
+from escalite.utils.aggregate_policy import AggregatePolicy, SlidingWindow
+
+
+def make_logs(level="info", elapsed=0.1, services=None):
+    logs = RequestLog()
+    logs.log_level = level
+    logs.time_elapsed = elapsed
+    for name, service_level in (services or {}).items():
+        logs.sections["service_logs"][name] = LogEntry(log_level=service_level)
+    return logs
+
+
+def test_sliding_window_expires_buckets():
+    window = SlidingWindow(window=10, buckets=5)
+    window.add(True, now=0)
+    window.add(False, now=3)
+    window.add(False, now=9.9)
+    assert window.totals(now=9.9) == (3, 1)
+    # the bucket of t=0 has left the window
+    assert window.totals(now=10.5) == (2, 0)
+    window.add(True, now=14)
+    assert window.totals(now=14) == (2, 1)
+    assert window.totals(now=100) == (0, 0)
+
+
+def test_alerts_once_and_recovers_with_hysteresis():
+    policy = AggregatePolicy(error_rate=0.5, recover_rate=0.2, min_requests=4)
+    alerts = [policy.observe(make_logs("error"), now=1) for _ in range(3)]
+    assert alerts == [[], [], []]
+
+    alert = policy.observe(make_logs("error"), now=1)
+    assert alert == [
+        {
+            "group": "*",
+            "state": "firing",
+            "error_rate": 1.0,
+            "errors": 4,
+            "requests": 4,
+            "window": 60,
+        }
+    ]
+    assert policy.firing() == ["*"]
+
+    # below the alert rate but above the recovery rate: no new alerts
+    for _ in range(15):
+        assert policy.observe(make_logs("info"), now=2) == []
+
+    alert = policy.observe(make_logs("info"), now=2)
+    assert alert[0]["state"] == "recovered"
+    assert alert[0]["error_rate"] == 0.2
+    assert policy.firing() == []
+
+
+def test_recovers_when_failures_leave_the_window():
+    policy = AggregatePolicy(error_rate=0.5, min_requests=2, window=10, buckets=10)
+    policy.observe(make_logs("error"), now=0)
+    assert policy.observe(make_logs("error"), now=0)[0]["state"] == "firing"
+    policy.observe(make_logs("info"), now=20)
+    alert = policy.observe(make_logs("info"), now=20)
+    assert alert[0]["state"] == "recovered"
+    assert alert[0]["errors"] == 0
+
+
+def test_slow_requests_count_as_failures():
+    policy = AggregatePolicy(error_rate=0.5, min_requests=2, slow_ms=200)
+    policy.observe(make_logs(elapsed=0.5), now=0)
+    assert policy.observe(make_logs(elapsed=0.5), now=0)[0]["state"] == "firing"
+
+
+def test_group_by_service():
+    policy = AggregatePolicy(error_rate=0.5, min_requests=2, group_by="service")
+    logs = make_logs(services={"db": "error", "cache": "info"})
+    assert policy.observe(logs, now=0) == []
+    alerts = policy.observe(logs, now=0)
+    assert [alert["group"] for alert in alerts] == ["db"]
+
+
+def test_group_by_tag():
+    policy = AggregatePolicy(error_rate=0.5, min_requests=1, group_by="tag")
+    logs = make_logs(services={"db": "error"})
+    logs.sections["api_logs"]["status"] = LogEntry(log_level="info")
+    alerts = policy.observe(logs, now=0)
+    assert [alert["group"] for alert in alerts] == ["service_logs"]
+
+
+def test_describe():
+    message = AggregatePolicy.describe(
+        [
+            {
+                "group": "db",
+                "state": "firing",
+                "error_rate": 0.25,
+                "errors": 5,
+                "requests": 20,
+                "window": 60,
+            },
+            {
+                "group": "cache",
+                "state": "recovered",
+                "error_rate": 0.0,
+                "errors": 0,
+                "requests": 20,
+                "window": 60,
+            },
+        ]
+    )
+    assert message == (
+        "db: error rate 25.0% (5 of 20 requests in the last 60s); "
+        "cache recovered: error rate 0.0% (0 of 20 requests in the last 60s)"
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"error_rate": 0},
+        {"error_rate": 0.1, "recover_rate": 0.2},
+        {"group_by": "endpoint"},
+        {"error_level": "fatal"},
+        {"min_requests": 0},
+        {"window": 0},
+        {"buckets": 0},
+    ],
+)
+def test_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        AggregatePolicy(**kwargs)
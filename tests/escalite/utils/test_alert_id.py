@@ -0,0 +1,63 @@
+import gc
+import os
+import time
+import uuid
+import weakref
+
+import pytest
+
+from escalite.utils.alert_id import (
+    CounterIdGenerator,
+    get_alert_id_generator,
+    ulid_id,
+    uuid4_id,
+)
+
+
+def test_uuid4_id_is_a_valid_uuid():
+    assert uuid.UUID(uuid4_id()).version == 4
+
+
+def test_ulid_id_format_and_order():
+    first = ulid_id()
+    time.sleep(0.002)
+    second = ulid_id()
+    assert len(first) == 26
+    assert set(first) <= set("0123456789ABCDEFGHJKMNPQRSTVWXYZ")
+    assert first[:10] < second[:10]
+
+
+def test_counter_ids_are_unique_and_share_a_prefix():
+    generator = CounterIdGenerator()
+    ids = [generator() for _ in range(3)]
+    assert ids == [f"{generator.prefix}-{i}" for i in (1, 2, 3)]
+    assert CounterIdGenerator().prefix != generator.prefix
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_counter_prefix_changes_after_fork():
+    generator = CounterIdGenerator()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_fd, generator().encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    child_id = os.read(read_fd, 64).decode()
+    os.close(read_fd)
+    os.close(write_fd)
+    assert not child_id.startswith(generator.prefix)
+
+
+def test_counter_generator_can_be_collected():
+    generator = weakref.ref(CounterIdGenerator())
+    gc.collect()
+    assert generator() is None
+
+
+def test_get_alert_id_generator():
+    assert get_alert_id_generator("uuid4") is uuid4_id
+    custom = lambda: "custom"  # noqa: E731
+    assert get_alert_id_generator(custom) is custom
+    with pytest.raises(ValueError):
+        get_alert_id_generator("unknown")
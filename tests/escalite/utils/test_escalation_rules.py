@@ -0,0 +1,141 @@
+import pytest
+
+from escalite.models.log_entry import LogEntry
+from escalite.models.request_log import RequestLog
+from escalite.utils.escalation_rules import (
+    CodeRule,
+    ErrorCountRule,
+    RequestLatencyRule,
+    RuleSet,
+    ServiceLatencyRule,
+    build_rule,
+)
+
+
+def make_entry(level="info", elapsed=None):
+    entry = LogEntry(log_level=level)
+    entry.time_elapsed = elapsed
+    return entry
+
+
+def test_build_rule_from_config():
+    rule = build_rule({"type": "service_latency", "service": "db", "over_ms": 5})
+    assert isinstance(rule, ServiceLatencyRule)
+    assert rule.name == "service_latency"
+    assert rule.service == "db"
+    assert rule.level == "error"
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"type": "unknown"},
+        {"over_ms": 5},
+        {"type": "code", "codes": [500], "level": "fatal"},
+        {"type": "error_count", "over": 1, "min_level": "fatal"},
+    ],
+)
+def test_invalid_rule_configs(config):
+    with pytest.raises(ValueError):
+        build_rule(config)
+
+
+def test_duplicate_rule_names():
+    with pytest.raises(ValueError, match="code"):
+        RuleSet([CodeRule([500]), CodeRule([503])])
+
+
+def test_service_latency_rules():
+    rules = RuleSet(
+        [
+            ServiceLatencyRule(100, service="db", name="slow_db"),
+            ServiceLatencyRule(500, name="slow_service", level="warning"),
+        ]
+    )
+    logs = RequestLog()
+    rules.on_entry(logs, "service_logs", "db", make_entry(elapsed=0.05), None, None)
+    rules.on_entry(logs, "service_logs", "cache", make_entry(elapsed=0.2), None, None)
+    assert logs.triggered_rules is None
+
+    rules.on_entry(logs, "service_logs", "db", make_entry(elapsed=0.2), None, "info")
+    assert logs.triggered_rules == ["slow_db"]
+    assert logs.rule_level == 40
+
+    rules.on_entry(logs, "service_logs", "db", make_entry(elapsed=0.6), None, "info")
+    assert logs.triggered_rules == ["slow_db", "slow_service"]
+    assert logs.rule_level == 40
+
+
+def test_service_latency_ignores_other_tags():
+    rules = RuleSet([ServiceLatencyRule(1)])
+    logs = RequestLog()
+    rules.on_entry(logs, "api_logs", "db", make_entry(elapsed=1.0), None, None)
+    assert logs.triggered_rules is None
+
+
+def test_code_rules():
+    rules = RuleSet(
+        [
+            CodeRule([500, 503], name="server_error"),
+            CodeRule([429], tag="api_logs", name="throttled", level="warning"),
+        ]
+    )
+    logs = RequestLog()
+    rules.on_entry(logs, "service_logs", "db", make_entry(), 200, None)
+    rules.on_entry(logs, "service_logs", "db", make_entry(), 429, None)
+    assert logs.triggered_rules is None
+    rules.on_entry(logs, "api_logs", "status", make_entry(), 429, None)
+    assert logs.triggered_rules == ["throttled"]
+    assert logs.rule_level == 30
+    rules.on_entry(logs, None, "status", make_entry(), 503, None)
+    assert logs.triggered_rules == ["throttled", "server_error"]
+    assert logs.rule_level == 40
+
+
+def test_error_count_counts_each_entry_once():
+    rules = RuleSet(
+        [
+            ErrorCountRule(2, name="errors"),
+            ErrorCountRule(0, min_level="critical", tag="api_logs", name="critical"),
+        ]
+    )
+    logs = RequestLog()
+    rules.on_entry(logs, "service_logs", "a", make_entry("error"), None, None)
+    rules.on_entry(logs, "service_logs", "a", make_entry("error"), None, "error")
+    rules.on_entry(logs, "service_logs", "b", make_entry("warning"), None, None)
+    rules.on_entry(logs, "service_logs", "b", make_entry("error"), None, "warning")
+    assert logs.triggered_rules is None
+    assert logs.rule_counts == [2, 0]
+
+    rules.on_entry(logs, "service_logs", "c", make_entry("critical"), None, None)
+    assert logs.triggered_rules == ["errors"]
+    rules.on_entry(logs, "api_logs", "d", make_entry("critical"), None, None)
+    assert logs.triggered_rules == ["errors", "critical"]
+
+
+def test_watches_entries_that_can_meet_rules():
+    rules = RuleSet(
+        [
+            ServiceLatencyRule(over_ms=100, service="db"),
+            CodeRule(codes=[503]),
+            ErrorCountRule(over=1, min_level="warning"),
+        ]
+    )
+    assert rules.watches("service_logs", "db", None, "info")
+    assert not rules.watches("service_logs", "cache", None, "info")
+    assert rules.watches("api_logs", "status", 503, "info")
+    assert rules.watches("api_logs", "status", 200, "warning")
+    assert not rules.watches("api_logs", "status", 200, "info")
+
+
+def test_request_latency_rule():
+    rules = RuleSet([RequestLatencyRule(1000, name="slo")])
+    logs = RequestLog()
+    rules.on_end(logs)
+    logs.time_elapsed = 0.5
+    rules.on_end(logs)
+    assert logs.triggered_rules is None
+    logs.time_elapsed = 1.5
+    rules.on_end(logs)
+    assert logs.get("triggered_rules") == ["slo"]
+    assert logs.to_dict()["triggered_rules"] == ["slo"]
@@ -0,0 +1,43 @@
+from escalite.utils.fingerprint import fingerprint
+
+
+def make_log(alert_id, value, code=500, error_trace="Traceback"):
+    return {
+        "alert_id": alert_id,
+        "log_level": "error",
+        "start_time": 1.0,
+        "api_logs": {"request_path": {"value": value, "log_level": "info"}},
+        "service_logs": {
+            "payments": {
+                "message": f"call {alert_id} failed",
+                "code": code,
+                "error_trace": error_trace,
+                "log_level": "error",
+                "start_time": 2.0,
+            },
+            "log_level": "error",
+        },
+        "error_logs": {},
+    }
+
+
+def test_same_failure_has_same_fingerprint():
+    assert fingerprint(make_log("a1", "/pay/1")) == fingerprint(
+        make_log("a2", "/pay/2")
+    )
+
+
+def test_different_code_changes_fingerprint():
+    assert fingerprint(make_log("a1", "/pay")) != fingerprint(
+        make_log("a1", "/pay", code=503)
+    )
+
+
+def test_different_error_trace_changes_fingerprint():
+    assert fingerprint(make_log("a1", "/pay")) != fingerprint(
+        make_log("a1", "/pay", error_trace="Other")
+    )
+
+
+def test_fingerprint_of_empty_logs():
+    assert fingerprint({}) == fingerprint({"log_level": "info"})
@@ -0,0 +1,79 @@
+import pytest
+
+from escalite.models.request_log import RequestLog
+from escalite.utils.log_limits import LogLimits
+
+
+def test_truncate_keeps_short_and_non_string_values():
+    logs = RequestLog()
+    limits = LogLimits(max_value_bytes=8)
+    value = {"a": 1}
+    assert limits.truncate(logs, "short") == "short"
+    assert limits.truncate(logs, value) is value
+    assert limits.truncate(logs, None) is None
+    assert limits.truncate(logs, 10**20) == 10**20
+    assert logs.truncated_values == 0
+
+
+def test_truncate_containers():
+    logs = RequestLog()
+    limits = LogLimits(max_value_bytes=8)
+    assert limits.truncate(logs, {"body": "x" * 100}) == ("{'body':...[truncated dict]")
+    assert limits.truncate(logs, [[1, 2], (3,)] * 10**5) == (
+        "[[1, 2],...[truncated list]"
+    )
+    assert logs.truncated_values == 2
+
+    nested = []
+    nested.append(nested)
+    assert limits.truncate(logs, nested).endswith("...[truncated list]")
+
+
+def test_truncate_extras():
+    logs = RequestLog()
+    limits = LogLimits(max_value_bytes=4)
+    extras = {"code": 500, "short": "abc"}
+    assert limits.truncate_extras(logs, extras) is extras
+    assert limits.truncate_extras(logs, None) is None
+
+    extras = {"code": 500, "error_trace": "Traceback"}
+    truncated = limits.truncate_extras(logs, extras)
+    assert truncated == {"code": 500, "error_trace": "Trac...[truncated 5 bytes]"}
+    assert extras["error_trace"] == "Traceback"
+    assert logs.truncated_values == 1
+
+
+def test_truncate_strings_and_bytes():
+    logs = RequestLog()
+    limits = LogLimits(max_value_bytes=4)
+    assert limits.truncate(logs, "abcdefgh") == "abcd...[truncated 4 bytes]"
+    assert limits.truncate(logs, b"abcdefgh") == b"abcd...[truncated 4 bytes]"
+    # multi-byte characters are never cut in half
+    assert limits.truncate(logs, "ééé") == "éé...[truncated 2 bytes]"
+    assert logs.truncated_values == 3
+
+
+def test_admit_counts_entries_and_drops():
+    logs = RequestLog()
+    limits = LogLimits(max_entries=3, max_entries_per_tag=1)
+    section = {"log_level": "info"}
+    assert limits.admit(logs, section)
+    section["a"] = object()
+    assert not limits.admit(logs, section)
+    assert limits.admit(logs, None)
+    assert limits.admit(logs, {})
+    assert not limits.admit(logs, None)
+    assert logs.entries == 3
+    assert logs.dropped_entries == 2
+
+
+def test_no_limits_by_default():
+    logs = RequestLog()
+    limits = LogLimits()
+    assert all(limits.admit(logs, {"a": 1}) for _ in range(100))
+    assert limits.truncate(logs, "x" * 10000) == "x" * 10000
+
+
+def test_negative_limits_are_rejected():
+    with pytest.raises(ValueError):
+        LogLimits(max_entries=-1)
@@ -0,0 +1,28 @@
+import pytest
+
+from escalite.utils.sampling_policy import SamplingPolicy
+
+
+def test_rate_one_samples_everything():
+    policy = SamplingPolicy()
+    assert all(policy.sample() for _ in range(100))
+
+
+def test_rate_zero_samples_nothing():
+    policy = SamplingPolicy(rate=0)
+    assert not any(policy.sample() for _ in range(100))
+
+
+def test_rate_uses_random(mocker):
+    mocker.patch("escalite.utils.sampling_policy.random.random", return_value=0.3)
+    assert SamplingPolicy(rate=0.5).sample()
+    assert not SamplingPolicy(rate=0.2).sample()
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"rate": 1.5}, {"rate": -0.1}, {"keep_level": "fatal"}, {"buffer_size": -1}],
+)
+def test_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        SamplingPolicy(**kwargs)
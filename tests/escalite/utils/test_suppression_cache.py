@@ -0,0 +1,48 @@
+import pytest
+
+from escalite.utils.suppression_cache import SuppressionCache
+
+
+def test_first_alert_is_delivered():
+    cache = SuppressionCache(ttl=10)
+    assert cache.check("fp", now=0) == 0
+
+
+def test_repeats_within_ttl_are_suppressed_and_counted():
+    cache = SuppressionCache(ttl=10)
+    cache.check("fp", now=0)
+    assert cache.check("fp", now=1) is None
+    assert cache.check("fp", now=2) is None
+    assert cache.suppressed_count("fp") == 2
+
+
+def test_suppressed_count_is_reported_after_window():
+    cache = SuppressionCache(ttl=10)
+    cache.check("fp", now=0)
+    cache.check("fp", now=1)
+    cache.check("fp", now=2)
+    assert cache.check("fp", now=11) == 2
+    assert cache.check("fp", now=12) is None
+    assert cache.check("fp", now=22) == 1
+
+
+def test_fingerprints_are_independent():
+    cache = SuppressionCache(ttl=10)
+    assert cache.check("a", now=0) == 0
+    assert cache.check("b", now=0) == 0
+
+
+def test_least_recent_fingerprints_are_evicted():
+    cache = SuppressionCache(ttl=10, max_size=2)
+    cache.check("a", now=0)
+    cache.check("b", now=0)
+    cache.check("c", now=0)
+    assert len(cache) == 2
+    assert cache.check("a", now=1) == 0
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        SuppressionCache(ttl=0)
+    with pytest.raises(ValueError):
+        SuppressionCache(max_size=0)